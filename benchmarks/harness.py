@@ -0,0 +1,168 @@
+# =============================================================================
+# BENCHMARK HARNESS - timing, peak memory and JSON results
+# =============================================================================
+#
+# A small asv-style harness with no dependencies beyond the standard library
+# and NumPy. A benchmark is a setup function registered with @benchmark: it
+# receives one combination of parameters, builds its synthetic input
+# (untimed) and returns (kernel, n_elements). The harness then measures
+#   - latency percentiles over repeated calls of kernel(),
+#   - throughput in elements per second (median latency),
+#   - peak Python/NumPy heap allocation of one call (tracemalloc).
+
+import gc
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+REGISTRY = []
+
+
+class Skip(Exception):
+    """Raised by a setup function for parameter combinations it cannot run"""
+
+
+def benchmark(name, params, unit='elements'):
+    """Register a benchmark setup function over a grid of parameters
+
+    `params` maps parameter name -> list of values; every combination is run.
+    """
+    def register(setup):
+        REGISTRY.append({'name': name, 'params': params, 'unit': unit, 'setup': setup})
+        return setup
+    return register
+
+
+def _measure(kernel, min_time, min_repeats, max_repeats):
+    """Wall-clock latencies (seconds) of repeated kernel() calls"""
+    kernel()  # warm-up (caches, lazy imports, page faults)
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_repeats:
+        t0 = time.perf_counter()
+        kernel()
+        latencies.append(time.perf_counter() - t0)
+        if len(latencies) >= min_repeats and time.perf_counter() - started >= min_time:
+            break
+    return np.array(latencies)
+
+
+def _peak_memory(kernel):
+    """Peak traced allocation (bytes) during one kernel() call"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kernel()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _override(name, values, grid, shared):
+    if not grid or name not in grid:
+        return values
+    if shared is not None and values != shared.get(name):
+        return values
+    return grid[name]
+
+
+def run(select=None, grid=None, shared=None, min_time=0.5, min_repeats=3, max_repeats=100,
+        memory=True, log=print):
+    """Run registered benchmarks and return a list of result records
+
+    `select` keeps benchmarks whose name contains any of the given strings.
+    `grid` overrides parameter lists by name (e.g. {'n': [1000, 10000]});
+    with `shared`, only lists declared as the shared grid's list are
+    overridden, and benchmarks with their own sizes keep them.
+    """
+    results = []
+    for bench in REGISTRY:
+        if select and not any(s in bench['name'] for s in select):
+            continue
+        params = {k: _override(k, v, grid, shared) for k, v in bench['params'].items()}
+        for values in itertools.product(*params.values()):
+            case = dict(zip(params, values))
+            label = bench['name'] + '[' + ','.join(f'{k}={v}' for k, v in case.items()) + ']'
+            try:
+                kernel, n_elements = bench['setup'](**case)
+                latencies = _measure(kernel, min_time, min_repeats, max_repeats)
+                peak = _peak_memory(kernel) if memory else None
+            except Skip as reason:
+                log(f"{label:<55} skipped ({reason})")
+                continue
+            except MemoryError:
+                log(f"{label:<55} skipped (MemoryError)")
+                continue
+
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            record = {
+                'name': bench['name'],
+                'params': case,
+                'unit': bench['unit'],
+                'n_elements': int(n_elements),
+                'repeats': len(latencies),
+                'latency_s': {'min': float(latencies.min()), 'p50': float(p50),
+                              'p90': float(p90), 'p99': float(p99)},
+                'throughput_per_s': float(n_elements / p50) if p50 > 0 else None,
+                'peak_memory_bytes': peak,
+            }
+            results.append(record)
+            memory_text = f"{peak / 2**20:9.1f} MiB" if peak is not None else ""
+            log(f"{label:<55} p50 {p50 * 1e3:10.3f} ms  "
+                f"{record['throughput_per_s']:12.3e} {bench['unit']}/s {memory_text}")
+            del kernel
+            gc.collect()
+    return results
+
+
+def environment():
+    """Machine and library versions stored alongside the results"""
+    import scipy
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def save(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+
+def _key(record):
+    return record['name'], tuple(sorted(record['params'].items()))
+
+
+def compare(baseline_path, results, threshold=1.2, log=print):
+    """Compare p50 latencies with a saved run; returns the regressed cases
+
+    A case regresses when it is more than `threshold` times slower than the
+    baseline.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {_key(r): r for r in json.load(f)['results']}
+
+    regressions = []
+    log(f"\n{'Benchmark':<55} {'Baseline':>12} {'Current':>12} {'Ratio':>7}")
+    log("-" * 90)
+    for record in results:
+        old = baseline.get(_key(record))
+        if old is None:
+            continue
+        ratio = record['latency_s']['p50'] / old['latency_s']['p50']
+        flag = "  REGRESSION" if ratio > threshold else ""
+        label = record['name'] + str(record['params'])
+        log(f"{label:<55} {old['latency_s']['p50'] * 1e3:10.3f}ms "
+            f"{record['latency_s']['p50'] * 1e3:10.3f}ms {ratio:7.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(record)
+    return regressions
@@ -0,0 +1,417 @@
+# =============================================================================
+# COOKBOOK BENCHMARKS - Does each statistical kernel scale with our data?
+# =============================================================================
+#
+# Usage (from the repository root; fully offline, synthetic data only):
+#
+#   python benchmarks/run_benchmarks.py                      # quick grid
+#   python benchmarks/run_benchmarks.py --full               # n up to 1e8, k up to 1e5, 10k features
+#   python benchmarks/run_benchmarks.py -k ks_2samp -k chi2  # only matching benchmarks
+#   python benchmarks/run_benchmarks.py --output bench.json
+#   python benchmarks/run_benchmarks.py --compare bench.json # flag >1.2x slowdowns
+#
+# Parameters:
+#   n         samples per input array (1e3 ... 1e8)
+#   k         categories / histogram bins (2 ... 1e5)
+#   features  columns in a drift check (1 ... 10k)
+
+import argparse
+import os
+import sys
+
+import numpy as np
+from scipy.stats import ks_2samp, chi2_contingency
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [ROOT, HERE]
+
+from harness import REGISTRY, Skip, benchmark, compare, run, save
+from distribution_testing import (SequentialMeanTest, anderson_ksamp, detect_data_drift,
+                                  discrete_ks_2samp, exact_multinomial_test, js_divergence,
+                                  kl_divergence, kruskal_wallis, make_rng, psi, screened_drift_report,
+                                  segment_drift_report, weighted_ks_2samp)
+from distribution_testing.combinatorics import log_binomial
+from distribution_testing.distances import ks_distances
+from distribution_testing.profiles import build_profile, population_stability
+from distribution_testing.evaluation import (at_thresholds, calibration_metrics, delong_covariance,
+                                             multiclass_metrics, prepare_scores, resample_weights,
+                                             roc_table, weighted_calibration, weighted_metrics)
+
+QUICK_GRID = {
+    'n': [10**3, 10**4, 10**5, 10**6],
+    'k': [2, 10, 100, 10**3, 10**4],
+    'features': [1, 10, 100],
+}
+FULL_GRID = {
+    'n': [10**3, 10**4, 10**5, 10**6, 10**7, 10**8],
+    'k': [2, 10, 100, 10**3, 10**4, 10**5],
+    'features': [1, 10, 100, 10**3, 10**4],
+}
+
+# Precision of the data for benchmarks with a `dtype=` option (precision.py)
+DTYPES = ['float64', 'float32']
+
+# Cases whose inputs and working set would exceed this are skipped
+MAX_BYTES = 4 * 2**30
+
+
+def require(n_bytes):
+    if n_bytes > MAX_BYTES:
+        raise Skip(f"needs ~{n_bytes / 2**30:.1f} GiB")
+
+
+def _binary_scores(n, seed=0):
+    rng = make_rng(seed)
+    y_true = rng.random(n) < 0.3
+    y_score = 1 / (1 + np.exp(-rng.normal(y_true * 1.5, 1.0)))
+    return y_true, y_score
+
+
+def _distribution(k, seed=0):
+    counts = make_rng(seed).random(k) + 0.01
+    return counts / counts.sum()
+
+
+# =============================================================================
+# HYPOTHESIS TESTS
+# =============================================================================
+
+@benchmark('ks_2samp', {'n': FULL_GRID['n'], 'dtype': DTYPES}, unit='samples')
+def bench_ks_2samp(n, dtype):
+    require(2 * n * np.dtype(dtype).itemsize * 4)
+    rng = make_rng(1)
+    x = rng.normal(0, 1, n).astype(dtype)
+    y = rng.normal(0.1, 1, n).astype(dtype)
+    return (lambda: ks_2samp(x, y)), 2 * n
+
+
+@benchmark('ks_distances', {'n': FULL_GRID['n']}, unit='samples')
+def bench_ks_distances(n):
+    # KS test + Wasserstein-1 + energy distance from one merged ECDF
+    require(2 * n * 8 * 6)
+    rng = make_rng(1)
+    x, y = rng.normal(0, 1, n), rng.normal(0.1, 1, n)
+    return (lambda: ks_distances(x, y)), 2 * n
+
+
+@benchmark('discrete_ks_2samp', {'n': FULL_GRID['n']}, unit='samples')
+def bench_discrete_ks_2samp(n, distinct=10**3):
+    # Prices rounded to cents: `distinct` values, massive ties, no sort
+    require(2 * n * 8 * 4)
+    rng = make_rng(1)
+    x = rng.integers(0, distinct, n) / 100
+    y = rng.integers(0, distinct + 10, n) / 100
+    return (lambda: discrete_ks_2samp(x, y)), 2 * n
+
+
+@benchmark('exact_multinomial_test', {'observations': [10, 20, 40], 'categories': [4, 6]},
+           unit='observations')
+def bench_exact_multinomial_test(observations, categories):
+    # Pruned enumeration up to MAX_COMPOSITIONS tables (n=40 over 6 is ~1.2e6), Monte-Carlo above
+    p = np.full(categories, 1 / categories)
+    observed = make_rng(17).multinomial(observations, p)
+    return (lambda: exact_multinomial_test(observed, p)), observations
+
+
+@benchmark('log_binomial', {'n': QUICK_GRID['n']}, unit='coefficients')
+def bench_log_binomial(n):
+    # n lookups of log C(N, r) with N < 1e4 in the shared log-factorial table
+    rng = make_rng(18)
+    totals = rng.integers(0, 10**4, n)
+    picks = rng.integers(0, totals + 1)
+    return (lambda: log_binomial(totals, picks)), n
+
+
+@benchmark('weighted_ks_2samp', {'k': FULL_GRID['k']}, unit='distinct values')
+def bench_weighted_ks_2samp(k, events=10**9):
+    # (value, count) pairs standing for `events` rows per sample, never expanded
+    rng = make_rng(11)
+    values = np.sort(rng.normal(0, 1, k))
+    counts1 = rng.multinomial(events, _distribution(k, 12))
+    counts2 = rng.multinomial(events, _distribution(k, 13))
+    return (lambda: weighted_ks_2samp((values, counts1), (values, counts2))), k
+
+
+@benchmark('chi2_contingency', {'k': FULL_GRID['k']}, unit='cells')
+def bench_chi2_contingency(k):
+    rng = make_rng(2)
+    table = rng.integers(50, 500, size=(2, k))
+    return (lambda: chi2_contingency(table)), 2 * k
+
+
+@benchmark('sketch_ks_2samp', {'n': FULL_GRID['n']}, unit='samples')
+def bench_sketch_ks_2samp(n, chunk=10**6):
+    from distribution_testing.sketches import KLLSketch, sketch_ks_2samp
+    require(2 * min(n, chunk) * 8 * 4)
+    rng = make_rng(1)
+
+    def kernel():
+        # Sketch both samples chunk by chunk, as from a file or stream
+        s1, s2 = KLLSketch(), KLLSketch()
+        for start in range(0, n, chunk):
+            size = min(chunk, n - start)
+            s1.update(rng.normal(0, 1, size))
+            s2.update(rng.normal(0.1, 1, size))
+        return sketch_ks_2samp(s1, s2)
+    return kernel, 2 * n
+
+
+@benchmark('sequential_mean_update', {'n': QUICK_GRID['n']}, unit='samples')
+def bench_sequential_mean_update(n):
+    # One daily batch of n observations per arm into an always-valid test
+    rng = make_rng(16)
+    control, treatment = rng.normal(100, 20, n), rng.normal(101, 20, n)
+    test = SequentialMeanTest(tau=5)
+    return (lambda: test.update(control, treatment)), 2 * n
+
+
+# Permutation tests do n_resamples x n work, so they get their own small sizes
+@benchmark('permutation_ks_2samp', {'n': [10**2, 10**3, 10**4]}, unit='permuted samples')
+def bench_permutation_ks(n):
+    from distribution_testing import permutation_ks_2samp
+    require(1000 * 2 * n * 8 * 4)
+    rng = make_rng(3)
+    x = rng.normal(0, 1, n)
+    y = rng.normal(0, 1, n)
+    kernel = lambda: permutation_ks_2samp(x, y, n_resamples=999, sequential=False)
+    return kernel, 2 * n * 999
+
+
+@benchmark('kruskal_wallis', {'n': FULL_GRID['n'], 'groups': [2, 200]}, unit='samples')
+def bench_kruskal_wallis(n, groups):
+    require(n * 8 * 8)
+    rng = make_rng(9)
+    values, labels = rng.normal(0, 1, n), rng.integers(0, groups, n)
+    return (lambda: kruskal_wallis(values, labels)), n
+
+
+@benchmark('anderson_ksamp', {'n': FULL_GRID['n'], 'groups': [2, 200]}, unit='samples')
+def bench_anderson_ksamp(n, groups):
+    # Work grows with groups x distinct values
+    if n * groups > 10**9:
+        raise Skip("groups x n over 1e9")
+    require(n * 8 * 10)
+    rng = make_rng(9)
+    values, labels = rng.normal(0, 1, n), rng.integers(0, groups, n)
+    return (lambda: anderson_ksamp(values, labels)), n
+
+
+# =============================================================================
+# DIVERGENCES
+# =============================================================================
+
+@benchmark('kl_divergence', {'k': FULL_GRID['k']}, unit='bins')
+def bench_kl_divergence(k):
+    p, q = _distribution(k, 4), _distribution(k, 5)
+    return (lambda: kl_divergence(p, q)), k
+
+
+@benchmark('js_divergence', {'k': FULL_GRID['k']}, unit='bins')
+def bench_js_divergence(k):
+    p, q = _distribution(k, 4), _distribution(k, 5)
+    return (lambda: js_divergence(p, q)), k
+
+
+@benchmark('psi', {'k': FULL_GRID['k']}, unit='bins')
+def bench_psi(k):
+    p, q = _distribution(k, 4), _distribution(k, 5)
+    return (lambda: psi(p, q)), k
+
+
+@benchmark('population_stability', {'features': [1, 10, 100, 10**3], 'windows': [1, 10, 100]},
+           unit='feature windows')
+def bench_population_stability(features, windows, n_rows=1000):
+    # PSI matrix of every feature in every window, against cached reference bins
+    require(features * windows * n_rows * 8 * 3)
+    rng = make_rng(15)
+    names = [f'f{i}' for i in range(features)]
+    profile = build_profile({name: rng.normal(0, 1, n_rows) for name in names},
+                            ['continuous'] * features)
+    batch = [{name: rng.normal(0.05 * w, 1, n_rows) for name in names} for w in range(windows)]
+    return (lambda: population_stability(profile, batch)), features * windows
+
+
+# =============================================================================
+# DRIFT DETECTION
+# =============================================================================
+
+@benchmark('detect_data_drift', {'features': FULL_GRID['features']}, unit='feature columns')
+def bench_detect_data_drift(features, n_rows=1000):
+    require(2 * n_rows * features * 8 * 2)
+    rng = make_rng(6)
+    train = rng.normal(0, 1, (n_rows, features))
+    current = rng.normal(0.05, 1, (n_rows, features))
+    types = ['continuous' if i % 2 == 0 else 'categorical' for i in range(features)]
+    # Categorical columns hold small integer codes
+    train[:, 1::2] = rng.integers(0, 5, (n_rows, features // 2))
+    current[:, 1::2] = rng.integers(0, 5, (n_rows, features // 2))
+    names = [f'f{i}' for i in range(features)]
+    return (lambda: detect_data_drift(train, current, names, types)), features
+
+
+@benchmark('segment_drift_report', {'segments': [10, 100, 1000]}, unit='rows')
+def bench_segment_drift_report(segments, n_rows=10**5, features=4):
+    rng = make_rng(10)
+    train = rng.normal(0, 1, (n_rows, features))
+    current = rng.normal(0.05, 1, (n_rows, features))
+    train[:, 1::2] = rng.integers(0, 5, (n_rows, features // 2))
+    current[:, 1::2] = rng.integers(0, 5, (n_rows, features // 2))
+    types = ['continuous' if i % 2 == 0 else 'categorical' for i in range(features)]
+    names = [f'f{i}' for i in range(features)]
+    train_keys, current_keys = rng.integers(0, segments, n_rows), rng.integers(0, segments, n_rows)
+    kernel = lambda: segment_drift_report(train, current, train_keys, current_keys, names, types)
+    return kernel, 2 * n_rows
+
+
+@benchmark('screened_drift_report', {'features': FULL_GRID['features']}, unit='features')
+def bench_screened_drift_report(features, n_rows=10**4, drifted=0.01):
+    # 1% of the features drift; the rest are screened out by their JS distance
+    require(2 * features * n_rows * 8 * 2)
+    rng = make_rng(14)
+    names = [f'f{i}' for i in range(features)]
+    profile = build_profile({name: rng.normal(0, 1, n_rows) for name in names},
+                            ['continuous'] * features)
+    n_drifted = max(1, int(features * drifted))
+    current = {name: rng.normal(0.5 if i < n_drifted else 0, 1, n_rows) for i, name in enumerate(names)}
+    return (lambda: screened_drift_report(profile, current)), features
+
+
+# =============================================================================
+# BINARY CLASSIFICATION METRICS
+# =============================================================================
+
+@benchmark('roc_auc_score', {'n': FULL_GRID['n']}, unit='samples')
+def bench_roc_auc_score(n):
+    from sklearn.metrics import roc_auc_score
+    require(n * 8 * 6)
+    y_true, y_score = _binary_scores(n)
+    return (lambda: roc_auc_score(y_true, y_score)), n
+
+
+@benchmark('roc_curve', {'n': FULL_GRID['n']}, unit='samples')
+def bench_roc_curve(n):
+    from sklearn.metrics import roc_curve
+    require(n * 8 * 6)
+    y_true, y_score = _binary_scores(n)
+    return (lambda: roc_curve(y_true, y_score)), n
+
+
+@benchmark('precision_recall_curve', {'n': FULL_GRID['n']}, unit='samples')
+def bench_precision_recall_curve(n):
+    from sklearn.metrics import precision_recall_curve
+    require(n * 8 * 6)
+    y_true, y_score = _binary_scores(n)
+    return (lambda: precision_recall_curve(y_true, y_score)), n
+
+
+@benchmark('f1_score', {'n': FULL_GRID['n']}, unit='samples')
+def bench_f1_score(n):
+    from sklearn.metrics import f1_score
+    require(n * 8 * 4)
+    y_true, y_score = _binary_scores(n)
+    y_pred = y_score >= 0.5
+    return (lambda: f1_score(y_true, y_pred)), n
+
+
+@benchmark('bootstrap_weighted_metrics', {'n': FULL_GRID['n'], 'dtype': DTYPES},
+           unit='sample-replicates')
+def bench_bootstrap(n, dtype, n_boot=100):
+    # Weights, positive and negative weights in `dtype`; group counts and sums in float64
+    require(n * n_boot * (3 * np.dtype(dtype).itemsize + 5 * 8))
+    y_true, y_score = _binary_scores(n)
+    prepared = prepare_scores(y_true, y_score, dtype)
+    rng = make_rng(7)
+    kernel = lambda: weighted_metrics(prepared, resample_weights(n, n_boot, rng, dtype=dtype), 0.5)
+    return kernel, n * n_boot
+
+
+@benchmark('calibration_metrics', {'n': FULL_GRID['n']}, unit='samples')
+def bench_calibration_metrics(n):
+    # Bin index (int64) plus one float64 weight array per bincount
+    require(n * 8 * 6)
+    y_true, y_score = _binary_scores(n)
+    return (lambda: calibration_metrics(y_true, y_score)), n
+
+
+@benchmark('bootstrap_weighted_calibration', {'n': FULL_GRID['n']}, unit='sample-replicates')
+def bench_bootstrap_calibration(n, n_boot=100):
+    # Weights and one weighted copy per sum, reduced per bin
+    require(n * n_boot * 2 * 8)
+    y_true, y_score = _binary_scores(n)
+    prepared = prepare_scores(y_true, y_score)
+    weights = resample_weights(n, n_boot, make_rng(7))
+    return (lambda: weighted_calibration(prepared, weights)), n * n_boot
+
+
+@benchmark('multiclass_metrics', {'n': [10**3, 10**4, 10**5], 'classes': [10, 100, 1000]},
+           unit='scores')
+def bench_multiclass_metrics(n, classes):
+    # Probability matrix plus blocks bounded by MAX_BLOCK_ELEMENTS (default averages: no micro)
+    if n * classes > 10**8:
+        raise Skip("n x classes over 1e8")
+    require(n * classes * 4 * 2)
+    rng = make_rng(19)
+    y_true = rng.integers(0, classes, n)
+    y_proba = rng.random((n, classes), dtype=np.float32)
+    kernel = lambda: multiclass_metrics(y_true, y_proba)
+    return kernel, n * classes
+
+
+@benchmark('delong_covariance', {'n': FULL_GRID['n']}, unit='samples')
+def bench_delong(n):
+    require(n * 8 * 12)
+    y_true, y_score = _binary_scores(n)
+    scores = np.vstack([y_score, y_score + make_rng(8).normal(0, 0.1, n)])
+    return (lambda: delong_covariance(y_true, scores)), 2 * n
+
+
+@benchmark('operating_points', {'n': FULL_GRID['n']}, unit='queries')
+def bench_operating_points(n, n_queries=10**4):
+    require(n * 8 * 8)
+    y_true, y_score = _binary_scores(n)
+    table = roc_table(y_true, y_score)
+    queries = np.linspace(0, 1, n_queries)
+    return (lambda: at_thresholds(table, queries)), n_queries
+
+
+def main(argv=None):
+    global MAX_BYTES
+    parser = argparse.ArgumentParser(description="Benchmark the cookbook's statistical kernels")
+    parser.add_argument('-k', '--select', action='append',
+                        help="only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument('--full', action='store_true', help="run the full parameter grid")
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (default 1.2)")
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help="minimum seconds of repeated timing per case")
+    parser.add_argument('--max-gib', type=float, default=MAX_BYTES / 2**30,
+                        help="skip cases needing more memory than this")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc peak memory")
+    parser.add_argument('--list', action='store_true', help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in REGISTRY:
+            print(f"{bench['name']:<30} {bench['params']}")
+        return 0
+
+    MAX_BYTES = args.max_gib * 2**30
+    results = run(select=args.select, grid=None if args.full else QUICK_GRID, shared=FULL_GRID,
+                  min_time=args.min_time, memory=not args.no_memory)
+
+    if args.output:
+        save(results, args.output)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        regressions = compare(args.compare, results, threshold=args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.2f}x")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""Statistical distribution testing cookbook
+
+Computation only: importing the package pulls in NumPy and SciPy, never
+matplotlib or seaborn. Plots are drawn on request (``plot=True``) through
+``distribution_testing.plotting``, which imports matplotlib on first use.
+"""
+
+from .cache import DriftCache
+from .chi2 import perform_chi2_test
+from .discrete import discrete_counts, discrete_ks_2samp
+from .distances import ks_distances, sketch_distances
+from .divergence import js_divergence, kl_divergence, psi
+from .drift import compare_feature, detect_data_drift, drift_report, print_drift_report
+from .ks import ecdf, perform_ks_test
+from .ksample import anderson_ksamp, chi2_ksample, kruskal_wallis
+from .multinomial import exact_multinomial_test
+from .permutation import (permutation_chi2_contingency, permutation_ks_2samp,
+                          permutation_mannwhitneyu, permutation_test, permutation_ttest)
+from .random_streams import make_rng, spawn_rngs, spawn_seeds
+from .screening import print_screening, screened_drift_report
+from .sequential import SequentialMeanTest, SequentialProportionTest
+from .segments import detect_segment_drift, segment_drift_report
+from .sketches import KLLSketch, sketch_ks_2samp
+from .weighted import compare_weighted_feature, weighted_chi2, weighted_js_divergence, weighted_ks_2samp
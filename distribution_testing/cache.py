@@ -0,0 +1,147 @@
+# =============================================================================
+# DRIFT RESULT CACHE - Skip tests on data that has not changed
+# =============================================================================
+#
+# Retries and overlapping dashboards re-run the same drift comparisons. The
+# cache stores one test result per feature, keyed by
+#   - a content hash of the reference and current column buffers
+#     (xxhash XXH3-128 when installed, BLAKE2b otherwise),
+#   - the feature type (which selects KS or Chi-square),
+#   - CACHE_VERSION, bumped whenever a test implementation changes.
+# alpha is NOT part of the key: the statistic and p-value are stored and the
+# drift flag is re-derived, so one entry serves every significance level.
+# Because entries are per feature, a window where only some columns changed
+# recomputes just those columns.
+#
+# Entries live in a SQLite file (safe for concurrent schedulers). The least
+# recently used entries are evicted once the store exceeds `max_bytes`.
+#
+#   cache = DriftCache('drift_cache.sqlite')
+#   detect_data_drift(train, current, names, types, cache=cache)
+
+import hashlib
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from .instrumentation import count, timed
+
+CACHE_VERSION = 1
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _hasher():
+    if xxhash is not None:
+        return 'xxh3', xxhash.xxh3_128()
+    return 'b2b', hashlib.blake2b(digest_size=16)
+
+
+@timed('cache.digest')
+def content_digest(*arrays):
+    """Hex digest of the dtype, shape and bytes of each array"""
+    name, h = _hasher()
+    for values in arrays:
+        values = np.asarray(values)
+        if values.dtype == object:
+            values = values.astype(str)
+        values = np.ascontiguousarray(values)
+        h.update(f"{values.dtype.str}{values.shape}".encode())
+        h.update(memoryview(values).cast('B'))
+    return f"{name}:{h.hexdigest()}"
+
+
+class DriftCache:
+    """On-disk LRU store of per-feature drift test results"""
+
+    def __init__(self, path, max_bytes=64 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("CREATE TABLE IF NOT EXISTS results ("
+                         "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                         "size INTEGER NOT NULL, accessed REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._db.commit()
+
+    @staticmethod
+    def key(f_type, train_digest, current_digest):
+        return f"v{CACHE_VERSION}|{f_type}|{train_digest}|{current_digest}"
+
+    def feature_key(self, train_feature, current_feature, f_type):
+        """Cache key for comparing two raw samples of one feature"""
+        return self.key(f_type, content_digest(train_feature), content_digest(current_feature))
+
+    def get(self, key):
+        """Stored result for `key` (marked as recently used) or None"""
+        row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            count('cache.misses')
+            return None
+        self.hits += 1
+        count('cache.hits')
+        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        value = json.dumps(result)
+        self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                         (key, value, len(key) + len(value), time.time()))
+        self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the store fits again
+        excess = total - self.max_bytes
+        rows = self._db.execute("SELECT key, size FROM results ORDER BY accessed")
+        stale = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def size(self):
+        """(number of entries, stored bytes)"""
+        return self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+
+    def clear(self):
+        self._db.execute("DELETE FROM results")
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def cached_result(cache, key, alpha, compute):
+    """Test result for `key` from the cache, or computed by compute() and stored
+
+    The stored entry holds everything but `drift` (test, statistic,
+    p-value and e.g. a sketch error bound); `drift` is derived
+    from `alpha` on every lookup.
+    """
+    stored = cache.get(key)
+    if stored is None:
+        result = compute()
+        stored = {k: v for k, v in result.items() if k != 'drift'}
+        cache.put(key, stored)
+    return {**stored, 'drift': bool(stored['p_value'] < alpha)}
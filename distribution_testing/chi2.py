@@ -0,0 +1,45 @@
+# =============================================================================
+# CHI-SQUARE TEST - Did the CATEGORY frequencies change?
+# =============================================================================
+
+import numpy as np
+from scipy.stats import chi2_contingency
+
+from .instrumentation import timed
+from .plotting import plot_chi2_test
+
+
+def perform_chi2_test(observed1, observed2, categories=None, title="", alpha=0.05,
+                      plot=False, verbose=False):
+    """Perform Chi-square test for categorical data"""
+
+    # Create contingency table
+    contingency_table = np.array([observed1, observed2])
+
+    # Perform Chi-square test
+    with timed('chi2.chi2_contingency'):
+        chi2_stat, p_value, dof, expected = chi2_contingency(contingency_table)
+
+    if plot:
+        if categories is None:
+            categories = [str(i) for i in range(len(observed1))]
+        with timed('chi2.plot'):
+            plot_chi2_test(observed1, observed2, categories, title, chi2_stat, p_value, expected)
+
+    if verbose:
+        print(f"{title}")
+        print(f"Contingency Table:")
+        print(f"Group 1: {observed1}")
+        print(f"Group 2: {observed2}")
+        print(f"Chi-square Statistic: {chi2_stat:.4f}")
+        print(f"P-value: {p_value:.4f}")
+        print(f"Degrees of freedom: {dof}")
+        print("Expected frequencies:")
+        print(expected)
+        if p_value < alpha:
+            print("Conclusion: Category distributions are SIGNIFICANTLY different (reject H0)")
+        else:
+            print("Conclusion: No significant evidence that category distributions differ (fail to reject H0)")
+        print("-" * 60)
+
+    return chi2_stat, p_value
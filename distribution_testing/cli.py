@@ -0,0 +1,294 @@
+# =============================================================================
+# COMMAND LINE - Drift check between two data files
+# =============================================================================
+#
+#   python -m distribution_testing drift ref.csv cur.csv --schema schema.json
+#   python -m distribution_testing drift ref.parquet cur.parquet --schema schema.json \
+#       --output report.json
+#
+# schema.json names the features to compare and their type:
+#
+#   {"alpha": 0.05,
+#    "features": {"age": "continuous", "income": "continuous", "region": "categorical"}}
+#
+# Both files are streamed in row chunks, a group of `--max-columns` features
+# at a time. Categorical features only keep running category counts;
+# continuous features keep the values of the current column group (the exact
+# KS test needs them), so peak memory is about
+#   rows x max_columns x 8 bytes  +  chunk_rows x max_columns values.
+# With `--ks sketch` continuous features are folded into KLL sketches
+# instead (sketches.py), and memory no longer grows with the number of rows.
+# `--dtype float32` keeps the continuous values in 4 bytes each.
+#
+# Exit codes: 0 no drift, 1 drift in at least one feature, 2 error.
+
+import argparse
+import csv
+import json
+import sys
+import traceback
+
+import numpy as np
+
+from . import instrumentation
+from .cache import DriftCache, cached_result, content_digest
+from .drift import (category_counts, compare_category_counts, compare_feature,
+                    merge_category_counts, print_drift_report)
+from .precision import FLOAT_DTYPES, resolve_dtype
+from .random_streams import DEFAULT_SEED
+from .readers import CHUNK_ROWS, iter_column_chunks
+from .sketches import DEFAULT_K, KLLSketch
+
+EXIT_OK, EXIT_DRIFT, EXIT_ERROR = 0, 1, 2
+FEATURE_TYPES = ('continuous', 'categorical')
+REPORT_FIELDS = ['feature', 'type', 'test', 'statistic', 'p_value', 'drift', 'error_bound',
+                 'wasserstein', 'energy', 'wasserstein_error', 'n_reference', 'n_current']
+
+
+def load_schema(path):
+    """(feature names, feature types, alpha or None) from a schema JSON file"""
+    with open(path, encoding='utf-8') as f:
+        schema = json.load(f)
+    features = schema.get('features') if isinstance(schema, dict) else None
+    if not isinstance(features, dict) or not features:
+        raise ValueError(f"{path}: expected {{\"features\": {{\"name\": \"continuous\" | \"categorical\", ...}}}}")
+    unknown = {t for t in features.values() if t not in FEATURE_TYPES}
+    if unknown:
+        raise ValueError(f"{path}: unknown feature type(s) {sorted(unknown)}; use {FEATURE_TYPES}")
+    return list(features), list(features.values()), schema.get('alpha')
+
+
+def _accumulate(path, names, types, chunk_rows, schema_columns, ks_method, sketch_k, dtype=None):
+    """Stream one file: running counts for categorical, value chunks or sketches for continuous"""
+    dtype = resolve_dtype(dtype)
+    categorical = [t == 'categorical' for t in types]
+    counts = {name: (np.empty(0), np.empty(0, dtype=np.int64))
+              for name, is_cat in zip(names, categorical) if is_cat}
+    values = {name: [] for name, is_cat in zip(names, categorical) if not is_cat}
+    sketches = {}
+    if ks_method == 'sketch':
+        sketches = {name: KLLSketch(sketch_k) for name in values}
+        values = {}
+    for chunk in iter_column_chunks(path, names, categorical, chunk_rows, schema_columns):
+        for name in counts:
+            counts[name] = merge_category_counts(counts[name], category_counts(chunk[name]))
+        for name in values:
+            values[name].append(chunk[name].astype(dtype, copy=False))
+        for name in sketches:
+            sketches[name].update(chunk[name])
+    return {**counts, **sketches, **{name: np.concatenate(parts or [np.empty(0, dtype)])
+                                     for name, parts in values.items()}}
+
+
+def _size(value):
+    if isinstance(value, tuple):
+        return int(value[1].sum())
+    return value.n if isinstance(value, KLLSketch) else len(value)
+
+
+def _digest(value):
+    if isinstance(value, tuple):
+        return content_digest(*value)
+    return content_digest(*value.levels) if isinstance(value, KLLSketch) else content_digest(value)
+
+
+def _compare(ref, cur, f_type, alpha, ks_method, dtype, distances=False):
+    if f_type == 'categorical':
+        return compare_category_counts(ref, cur, alpha)
+    return compare_feature(ref, cur, f_type, alpha, ks_method, dtype=dtype, distances=distances)
+
+
+def file_drift_report(reference, current, feature_names, feature_types, alpha=0.05,
+                      chunk_rows=CHUNK_ROWS, max_columns=32, cache=None, ks_method='exact',
+                      sketch_k=DEFAULT_K, dtype=None, distances=False):
+    """Per-feature drift results for two files, streamed in column groups
+
+    With a `cache`, results are keyed by the content of the accumulated
+    columns (category counts or values), so unchanged features of a re-read
+    file skip their test. `dtype` is the precision of the continuous values;
+    distances=True adds Wasserstein-1 / energy distances of continuous ones.
+    """
+    report = []
+    for start in range(0, len(feature_names), max_columns):
+        names = feature_names[start:start + max_columns]
+        types = feature_types[start:start + max_columns]
+        ref = _accumulate(reference, names, types, chunk_rows, feature_names, ks_method, sketch_k, dtype)
+        cur = _accumulate(current, names, types, chunk_rows, feature_names, ks_method, sketch_k, dtype)
+        for name, f_type in zip(names, types):
+            n_ref, n_cur = _size(ref[name]), _size(cur[name])
+            if n_ref == 0 or n_cur == 0:
+                raise ValueError(f"feature '{name}' has no values in "
+                                 f"{reference if n_ref == 0 else current}")
+            compare = lambda: _compare(ref[name], cur[name], f_type, alpha, ks_method, dtype, distances)
+            if cache is None:
+                result = compare()
+            else:
+                test = f_type if f_type == 'categorical' else f"{f_type}/{ks_method}"
+                if dtype is not None and f_type == 'continuous':
+                    test += f"/{resolve_dtype(dtype).name}"
+                if distances and f_type == 'continuous':
+                    test += "/distances"
+                key = cache.key(test, _digest(ref[name]), _digest(cur[name]))
+                result = cached_result(cache, key, alpha, compare)
+            report.append({'feature': name, 'type': f_type, **result,
+                           'n_reference': n_ref, 'n_current': n_cur})
+        del ref, cur
+    return report
+
+
+def write_report(report, path, fmt=None, **meta):
+    """Write the report as JSON (with `meta` and an overall flag) or CSV"""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'json')
+    if fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(report)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**meta, 'drift': any(row['drift'] for row in report),
+                       'features': report}, f, indent=2)
+
+
+def drift_command(args):
+    if args.profile:
+        instrumentation.enable(memory=args.profile_memory)
+    names, types, schema_alpha = load_schema(args.schema)
+    alpha = args.alpha if args.alpha is not None else (schema_alpha or 0.05)
+    cache = DriftCache(args.cache) if args.cache else None
+    try:
+        report = file_drift_report(args.reference, args.current, names, types, alpha,
+                                   chunk_rows=args.chunk_rows, max_columns=args.max_columns,
+                                   cache=cache, ks_method=args.ks, sketch_k=args.sketch_k,
+                                   dtype=args.dtype, distances=args.distances)
+    finally:
+        if cache is not None:
+            cache.close()
+    if args.output:
+        write_report(report, args.output, args.format,
+                     reference=args.reference, current=args.current, alpha=alpha)
+    if not args.quiet:
+        print_drift_report(report)
+    if args.profile:
+        instrumentation.write(args.profile)
+        if not args.quiet:
+            print()
+            instrumentation.print_report()
+    return EXIT_DRIFT if any(row['drift'] for row in report) else EXIT_OK
+
+
+def serve_command(args):
+    import asyncio
+    from .service import DriftService, check_bind_address, serve
+
+    check_bind_address(args.host, args.unix)
+    service = DriftService(workers=args.workers, batch_window=args.batch_window,
+                           max_batch=args.max_batch, dtype=args.dtype)
+    if args.reference:
+        if not args.schema:
+            raise ValueError("--reference needs --schema")
+        names, types, _ = load_schema(args.schema)
+        for spec in args.reference:
+            ref_name, sep, path = spec.partition('=')
+            if not sep:
+                raise ValueError(f"--reference {spec}: expected NAME=PATH")
+            columns = _accumulate(path, names, types, args.chunk_rows, names, 'exact', DEFAULT_K,
+                                  args.dtype)
+            service.add_reference(ref_name, {name: columns[name] for name in names}, types)
+            print(f"loaded reference '{ref_name}' from {path}")
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix,
+                          ready=lambda where: print(f"drift service listening on {where}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+def validate_command(args):
+    from .validation import print_validation, validate_precision
+
+    rows = validate_precision(args.dtype, n=args.n, n_boot=args.n_boot, seed=args.seed)
+    print_validation(rows, args.dtype)
+    return EXIT_OK if all(row['ok'] for row in rows) else EXIT_DRIFT
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m distribution_testing',
+                                     description="Statistical distribution testing")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    drift = commands.add_parser('drift', help="KS / Chi-square drift check between two files",
+                                description="Compare a reference and a current data file "
+                                            "(.csv, .npy or .parquet). Exit code 0: no drift, "
+                                            "1: drift, 2: error.")
+    drift.add_argument('reference', help="reference (training) data file")
+    drift.add_argument('current', help="current (production) data file")
+    drift.add_argument('--schema', required=True, help="JSON file with the features and their types")
+    drift.add_argument('--alpha', type=float, help="significance level (default: schema or 0.05)")
+    drift.add_argument('--output', help="write the report to this .json or .csv file")
+    drift.add_argument('--format', choices=('json', 'csv'), help="report format (default: from --output)")
+    drift.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                       help=f"rows read per chunk (default {CHUNK_ROWS})")
+    drift.add_argument('--max-columns', type=int, default=32,
+                       help="features held in memory per pass over the files (default 32)")
+    drift.add_argument('--ks', choices=('exact', 'sketch', 'discrete'), default='exact',
+                       help="exact KS on all values, approximate KS on KLL sketches "
+                            "(memory independent of the number of rows), or tie-aware KS "
+                            "on value counts for low-cardinality columns")
+    drift.add_argument('--distances', action='store_true',
+                       help="also report Wasserstein-1 and energy distances of continuous features")
+    drift.add_argument('--sketch-k', type=int, default=DEFAULT_K,
+                       help=f"KLL sketch size; error shrinks as 1/k (default {DEFAULT_K})")
+    drift.add_argument('--dtype', choices=FLOAT_DTYPES,
+                       help="precision of the continuous values (default float64)")
+    drift.add_argument('--cache', help="SQLite file caching per-feature results between runs")
+    drift.add_argument('--profile', metavar='PATH',
+                       help="time the kernels and write the metrics (.prom: Prometheus text, else JSON)")
+    drift.add_argument('--profile-memory', action='store_true',
+                       help="with --profile, also record tracemalloc peak memory per kernel")
+    drift.add_argument('-q', '--quiet', action='store_true', help="do not print the drift table")
+    drift.set_defaults(func=drift_command)
+
+    serve = commands.add_parser('serve', help="local HTTP drift service",
+                                description="Keep reference profiles in memory and answer "
+                                            "POST /drift/<reference> requests (see service.py).")
+    serve.add_argument('--reference', action='append', metavar='NAME=PATH',
+                       help="load a reference data file at startup (repeatable)")
+    serve.add_argument('--schema', help="JSON schema of the reference files")
+    serve.add_argument('--host', default='127.0.0.1', help="loopback bind address (default 127.0.0.1)")
+    serve.add_argument('--port', type=int, default=8765, help="port (default 8765)")
+    serve.add_argument('--unix', help="listen on this Unix socket instead of TCP")
+    serve.add_argument('--workers', type=int, help="worker processes (default: CPU count; 0 = threads)")
+    serve.add_argument('--batch-window', type=float, default=0.002,
+                       help="seconds to collect concurrent requests into one batch (default 0.002)")
+    serve.add_argument('--max-batch', type=int, default=64, help="windows per batch (default 64)")
+    serve.add_argument('--dtype', choices=FLOAT_DTYPES,
+                       help="precision of the reference profiles (default float64)")
+    serve.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help=argparse.SUPPRESS)
+    serve.set_defaults(func=serve_command)
+
+    validate = commands.add_parser('validate', help="check reduced-precision results against float64",
+                                   description="Run the kernels in float64 and in --dtype on synthetic "
+                                               "data and compare with the stated tolerances "
+                                               "(see validation.py). Exit code 1 if any check fails.")
+    validate.add_argument('--dtype', choices=FLOAT_DTYPES, default='float32',
+                          help="precision to validate (default float32)")
+    validate.add_argument('-n', type=int, default=100_000, help="samples per input (default 100000)")
+    validate.add_argument('--n-boot', type=int, default=20, help="bootstrap replicates (default 20)")
+    validate.add_argument('--seed', type=int, default=DEFAULT_SEED, help="random seed")
+    validate.set_defaults(func=validate_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError, ImportError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return EXIT_ERROR
+    except Exception:
+        # A bug, not a bad input: show the traceback, but never exit with 1
+        # (drift), which is what an uncaught exception would give
+        traceback.print_exc()
+        return EXIT_ERROR
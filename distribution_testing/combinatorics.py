@@ -0,0 +1,114 @@
+# =============================================================================
+# COMBINATORICS - Counting tables of counts, exactly and in log space
+# =============================================================================
+#
+# Exact tests sum over tables of counts; each needs a binomial or multinomial
+# coefficient, and there can be millions of them:
+#
+#   stars and bars   n identical items into k slots: C(n + k - 1, k - 1)
+#                    (combinatorics/example.md: 27 into 4 -> C(30, 3) = 4060)
+#   multinomial      n! / (a_1! ... a_k!) orderings of a table a_1 .. a_k
+#
+# LOG SPACE. log C(n, r) = lf[n] - lf[r] - lf[n - r] with lf[m] = log(m!)
+# from ONE cumulative gammaln table, shared by every caller and grown by
+# doubling on demand: a lookup is three array reads, vectorized over arrays
+# of n and r, with no factorial recomputed. Use these for probabilities.
+#
+# EXACT BIG INTEGERS. stars_and_bars() and multinomial_coefficient() return
+# Python ints (no overflow, no rounding), memoized in an LRU cache: exact
+# tests ask for the same few coefficients over and over.
+#
+# ENUMERATION. compositions(n, k) yields every table a_1 + ... + a_k = n in
+# lexicographic order, lazily: the state is the current table (O(k)), never
+# the list of C(n + k - 1, k - 1) tables.
+
+import math
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import gammaln
+
+# Entries of log(m!) kept in the shared table at first use
+INITIAL_TABLE = 1024
+CACHE_SIZE = 65_536
+
+_log_factorials = gammaln(np.arange(INITIAL_TABLE) + 1.0)
+_log_factorials.flags.writeable = False
+
+
+def log_factorials(n):
+    """Read-only array of log(m!) for m = 0 .. n (a view of the shared table)"""
+    global _log_factorials
+    if n >= len(_log_factorials):
+        size = max(2 * len(_log_factorials), n + 1)
+        _log_factorials = gammaln(np.arange(size) + 1.0)
+        _log_factorials.flags.writeable = False
+    return _log_factorials[:n + 1]
+
+
+def log_binomial(n, r):
+    """log C(n, r), elementwise over integer arrays; -inf where r < 0 or r > n"""
+    n, r = np.asarray(n, dtype=np.int64), np.asarray(r, dtype=np.int64)
+    valid = (r >= 0) & (r <= n)
+    table = log_factorials(int(np.max(n, initial=0)))
+    n, r = np.where(valid, n, 0), np.where(valid, r, 0)
+    return np.where(valid, table[n] - table[r] - table[n - r], -np.inf)
+
+
+def log_multinomial(counts, axis=-1):
+    """log(n! / (a_1! ... a_k!)) of tables of counts along `axis`"""
+    counts = np.asarray(counts, dtype=np.int64)
+    totals = counts.sum(axis=axis)
+    table = log_factorials(int(np.max(totals, initial=0)))
+    return table[totals] - table[counts].sum(axis=axis)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def stars_and_bars(n, k):
+    """Number of tables of k counts >= 0 summing to n: C(n + k - 1, k - 1), exactly"""
+    if k == 0:
+        return int(n == 0)
+    return math.comb(n + k - 1, k - 1)
+
+
+def log_stars_and_bars(n, k):
+    """log of stars_and_bars(n, k), elementwise"""
+    n, k = np.asarray(n, dtype=np.int64), np.asarray(k, dtype=np.int64)
+    # k = 0 slots: one (empty) table of n = 0, none otherwise
+    return np.where(k == 0, np.where(n == 0, 0.0, -np.inf), log_binomial(n + k - 1, k - 1))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _multinomial(counts):
+    total, coefficient = 0, 1
+    for a in counts:
+        total += a
+        coefficient *= math.comb(total, a)
+    return coefficient
+
+
+def multinomial_coefficient(counts):
+    """n! / (a_1! ... a_k!) as an exact integer (order of the counts does not matter)"""
+    return _multinomial(tuple(sorted(int(a) for a in counts)))
+
+
+def compositions(n, k):
+    """Yield every tuple of k counts >= 0 summing to n, in lexicographic order"""
+    if k == 0:
+        if n == 0:
+            yield ()
+        return
+    table = [0] * (k - 1) + [n]
+    while True:
+        yield tuple(table)
+        # Next table: the rightmost non-zero count gives one to its left
+        # neighbour, and the rest of it moves to the last slot
+        j = k - 1
+        while j > 0 and table[j] == 0:
+            j -= 1
+        if j == 0:
+            return
+        rest = table[j] - 1
+        table[j] = 0
+        table[j - 1] += 1
+        table[k - 1] = rest
@@ -0,0 +1,247 @@
+# =============================================================================
+# DISCRETE KS - Tie-aware KS for rounded prices and integer durations
+# =============================================================================
+#
+# ks_2samp sorts every raw element, even when a 1e8-row column holds only
+# 1e3 distinct values, and its p-values assume a CONTINUOUS distribution:
+# with heavy ties they are conservative (too large). Here:
+#
+# COUNTS WITHOUT SORTING (discrete_counts)
+#   A strided subsample first estimates the cardinality: columns with more
+#   than `max_distinct` values are not discrete (None). Otherwise
+#   - integer columns, and floats on a decimal grid (integer durations,
+#     prices rounded to cents: the smallest 10**d, d <= MAX_DECIMALS, that
+#     makes the subsample integral, checked on the whole column), are counted
+#     with ONE np.bincount of round(x * 10**d) - min,
+#   - anything else falls back to np.unique (a sort).
+#   The KS statistic then comes from the cumulative counts over the union of
+#   the distinct values, as in weighted.py.
+#
+# P-VALUES CONDITIONAL ON THE TIES
+#   Under H0 every split of the pooled sample into n1 + n2 rows is equally
+#   likely. Both ECDFs can only differ at the END of a block of tied values,
+#   so the null distribution of D only looks at those points:
+#   - 'exact': probability that a random lattice path from (0, 0) to
+#     (n1, n2) touches |i/n1 - j/n2| >= D at the end of a tie block. Paths
+#     are counted block by block (a block of m tied rows is one convolution
+#     with the binomial coefficients C(m, a)), only inside the band the
+#     boundary leaves. That band can be as wide as the smaller sample (under
+#     drift, where D is large), so the work is O(distinct values x rows):
+#     the Python loop runs once per distinct value instead of once per row,
+#     but each step still convolves O(n) paths. Without ties this is
+#     ks_2samp's exact two-sided p-value.
+#   - 'asymp': the continuous approximation of ks_2samp(method='asymp'),
+#     conservative (too large) with ties.
+#   - 'permutation' (opt-in only): the sample-1 counts of a random split
+#     follow a multivariate hypergeometric distribution over the distinct
+#     values, so each resample costs O(distinct values), not O(rows).
+#   method='auto' is ks_2samp on the ranks when nothing is tied, 'exact'
+#   with at most EXACT_MAX_BLOCKS distinct values and at most EXACT_MAX_WORK
+#   distinct values x rows of the smaller sample (a few tenths of a second
+#   at worst), and 'asymp' otherwise: above EXACT_MAX_BLOCKS the ties are
+#   too light to move the p-value much, above EXACT_MAX_WORK the samples are
+#   large enough for the asymptotic distribution.
+
+import numpy as np
+from scipy.signal import fftconvolve
+from scipy.stats import ks_2samp, kstwo
+
+from .combinatorics import log_factorials
+from .instrumentation import count, timed
+from .random_streams import DEFAULT_SEED, make_rng
+
+MAX_DISTINCT = 10_000
+# method='auto' is exact up to this many distinct values, and up to this
+# many distinct values x rows of the smaller sample
+EXACT_MAX_BLOCKS = 256
+EXACT_MAX_WORK = 10**7
+SUBSAMPLE = 2**16
+MAX_DECIMALS = 6
+# A bincount may span GRID_RANGE times as many slots as distinct values allowed
+GRID_RANGE = 4
+PERMUTATION_BLOCK = 1_000
+# Tie blocks up to this many rows are convolved directly, larger ones by FFT
+DIRECT_CONVOLVE = 64
+
+
+def _grid_counts(values, scale, max_range):
+    """Counts of values that are integers / scale with a range below max_range, else None"""
+    if values.dtype.kind in 'iub':
+        low, high = int(values.min()), int(values.max())
+        if high - low >= max_range:
+            return None
+        codes = values.astype(np.int64) - low
+    else:
+        scaled = values * scale if scale != 1 else values
+        low, high = np.floor(scaled.min()), np.floor(scaled.max())
+        if not np.isfinite(high - low) or high - low >= max_range:
+            return None
+        scaled = np.round(scaled)
+        if not np.array_equal(scaled / scale if scale != 1 else scaled, values):
+            return None
+        low, high = int(low), int(high)
+        codes = scaled.astype(np.int64) - low
+    counts = np.bincount(codes, minlength=high - low + 1)
+    present = np.flatnonzero(counts)
+    distinct = present + low
+    distinct = distinct / scale if scale != 1 else distinct
+    return distinct.astype(values.dtype), counts[present]
+
+
+def _decimal_scale(sample):
+    """Smallest 10**d (d <= MAX_DECIMALS) that makes every sampled value an integer"""
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10.0 ** decimals
+        if np.array_equal(np.round(sample * scale) / scale, sample):
+            return scale
+    return None
+
+
+@timed('discrete.counts')
+def discrete_counts(values, max_distinct=MAX_DISTINCT):
+    """(distinct values, counts) of a low-cardinality column without a full sort, else None"""
+    values = np.asarray(values).ravel()
+    if values.dtype.kind not in 'iubf' or len(values) == 0:
+        return None
+    sample = values[::max(1, len(values) // SUBSAMPLE)]
+    if len(np.unique(sample)) > max_distinct:
+        return None
+
+    scale = 1 if values.dtype.kind in 'iub' else _decimal_scale(sample)
+    if scale is not None:
+        result = _grid_counts(values, scale, GRID_RANGE * max_distinct)
+        if result is not None:
+            return result if len(result[0]) <= max_distinct else None
+    # Off any decimal grid (or too spread out for one bincount): count by sorting
+    distinct, counts = np.unique(values, return_counts=True)
+    return (distinct, counts) if len(distinct) <= max_distinct else None
+
+
+def _aligned(counted1, counted2):
+    values1, counts1 = counted1
+    values2, counts2 = counted2
+    points = np.union1d(values1, values2)
+    aligned1, aligned2 = np.zeros(len(points)), np.zeros(len(points))
+    aligned1[np.searchsorted(points, values1)] = counts1
+    aligned2[np.searchsorted(points, values2)] = counts2
+    return aligned1, aligned2
+
+
+def _statistic(counts1, counts2):
+    cdf1 = np.cumsum(counts1) / counts1.sum()
+    cdf2 = np.cumsum(counts2) / counts2.sum()
+    return float(np.max(np.abs(cdf1 - cdf2)))
+
+
+@timed('discrete.exact_p')
+def exact_tied_p_value(statistic, counts1, counts2):
+    """P(D >= statistic) over all splits of the pooled tied sample (lattice paths)"""
+    if counts1.sum() > counts2.sum():
+        counts1, counts2 = counts2, counts1
+    n1, n2 = int(counts1.sum()), int(counts2.sum())
+    n = n1 + n2
+    log_factorial = log_factorials(n)
+    log_splits = log_factorial[n] - log_factorial[n1] - log_factorial[n2]
+    threshold = statistic - 1e-12
+    # Weighting every path by p**i (1 - p)**(k - i) centres the stored values
+    # where the probability is, so FFT round-off in the far tails stays tiny
+    log_p, log_q = np.log(n1 / n), np.log(n2 / n)
+
+    # paths[i - low]: number of lattice paths to (i, k - i) that have not
+    # touched the boundary, times p**i (1 - p)**(k - i) / exp(log_scale). A
+    # block of m tied rows moves a path to (i + a, k + m - i - a) in C(m, a)
+    # ways: a convolution with the binomial(m, p) probabilities.
+    paths, low, log_scale, k = np.ones(1), 0, 0.0, 0
+    absorbed = 0.0
+    # The last block ends at (n1, n2), where both ECDFs are 1
+    for end in np.cumsum((counts1 + counts2).astype(np.int64))[:-1]:
+        m = int(end) - k
+        a = np.arange(m + 1)
+        ways = np.exp(log_factorial[m] - log_factorial[:m + 1] - log_factorial[m::-1]
+                      + a * log_p + (m - a) * log_q)
+        if m < DIRECT_CONVOLVE:
+            paths = np.convolve(paths, ways)
+        else:
+            paths = np.maximum(fftconvolve(paths, ways), 0.0)
+        k += m
+        first, last = max(low, k - n2), min(low + len(paths) - 1, n1)
+        paths, low = paths[first - low:last - low + 1], first
+        i = np.arange(low, low + len(paths))
+        hit = np.abs(i / n1 - (k - i) / n2) >= threshold
+        if hit.any():
+            # Absorbed paths: every completion to (n1, n2) counts
+            rest1 = n1 - i[hit]
+            with np.errstate(divide='ignore'):
+                log_hits = (np.log(paths[hit]) + log_scale - i[hit] * log_p - (k - i[hit]) * log_q
+                            + log_factorial[n - k] - log_factorial[rest1] - log_factorial[n - k - rest1])
+            absorbed += np.exp(log_hits - log_splits).sum()
+            # The boundary cuts both ends of the band: the survivors are contiguous
+            survivors = np.flatnonzero(~hit)
+            if len(survivors) == 0:
+                break
+            paths, low = paths[survivors[0]:survivors[-1] + 1], low + survivors[0]
+        top = paths.max()
+        if top == 0:
+            break
+        paths /= top
+        log_scale += np.log(top)
+    count('discrete.exact_blocks', len(counts1))
+    return float(min(1.0, absorbed))
+
+
+@timed('discrete.permutation_p')
+def permutation_tied_p_value(statistic, counts1, counts2, n_resamples=9999, seed=DEFAULT_SEED):
+    """Permutation p-value of D, drawing sample-1 counts from the multivariate hypergeometric"""
+    rng = make_rng(seed)
+    pooled = (counts1 + counts2).astype(np.int64)
+    n1, n2 = int(counts1.sum()), int(counts2.sum())
+    pooled_cdf = np.cumsum(pooled)
+    hits = 0
+    for start in range(0, n_resamples, PERMUTATION_BLOCK):
+        size = min(PERMUTATION_BLOCK, n_resamples - start)
+        draws = rng.multivariate_hypergeometric(pooled, n1, size=size)
+        cdf1 = np.cumsum(draws, axis=1)
+        d = np.abs(cdf1 / n1 - (pooled_cdf - cdf1) / n2).max(axis=1)
+        hits += int(np.count_nonzero(d >= statistic - 1e-12))
+    return (hits + 1) / (n_resamples + 1)
+
+
+def _as_counts(sample, max_distinct):
+    if isinstance(sample, tuple):
+        return sample
+    return discrete_counts(sample, max_distinct)
+
+
+@timed('discrete.ks_2samp')
+def discrete_ks_2samp(sample1, sample2, method='auto', n_resamples=9999, seed=DEFAULT_SEED,
+                      max_distinct=MAX_DISTINCT):
+    """Two-sample KS test for tied / discrete data; returns (statistic, p_value)
+
+    Samples are raw arrays or (distinct values, counts) pairs. Raises
+    ValueError when a raw sample has more than `max_distinct` distinct values
+    (use ks_2samp for those). `n_resamples` and `seed` only apply to
+    method='permutation', which is never chosen by 'auto'.
+    """
+    counted = [_as_counts(s, max_distinct) for s in (sample1, sample2)]
+    if any(c is None for c in counted):
+        raise ValueError(f"sample has more than {max_distinct} distinct values; use ks_2samp")
+    counts1, counts2 = _aligned(*counted)
+    statistic = _statistic(counts1, counts2)
+    n1, n2 = counts1.sum(), counts2.sum()
+
+    if method == 'auto':
+        if np.all(counts1 + counts2 == 1):
+            # No ties: ks_2samp on the ranks is exact for small samples, asymptotic otherwise
+            p_value = ks_2samp(np.flatnonzero(counts1), np.flatnonzero(counts2))[1]
+            return statistic, float(p_value)
+        work = len(counts1) * min(n1, n2)
+        method = 'exact' if len(counts1) <= EXACT_MAX_BLOCKS and work <= EXACT_MAX_WORK else 'asymp'
+    if method == 'exact':
+        p_value = exact_tied_p_value(statistic, counts1, counts2)
+    elif method == 'permutation':
+        p_value = permutation_tied_p_value(statistic, counts1, counts2, n_resamples, seed)
+    elif method == 'asymp':
+        p_value = float(kstwo.sf(statistic, np.round(n1 * n2 / (n1 + n2))))
+    else:
+        raise ValueError(f"Unknown method: {method!r}; use 'auto', 'exact', 'permutation' or 'asymp'")
+    return statistic, p_value
@@ -0,0 +1,103 @@
+# =============================================================================
+# DISTANCES - How FAR did the distribution move, in data units?
+# =============================================================================
+#
+# KS says whether a feature drifted; it does not say by how much in the
+# feature's own units. Both distances below are integrals of the gap between
+# the two ECDFs, i.e. of the same merged-ECDF arrays KS takes its maximum of:
+#
+#   KS              max |F1 - F2|
+#   Wasserstein-1   integral |F1 - F2| dx       (as scipy wasserstein_distance)
+#   energy          sqrt(2 * integral (F1 - F2)**2 dx)   (as scipy energy_distance)
+#
+# ks_distances() sorts each sample once, merges the two sorted runs with one
+# stable argsort (a linear merge of two runs), and gets all three from the
+# step CDFs at the distinct merged values: one O(n log n) pass instead of
+# ks_2samp plus a separate, re-sorting wasserstein_distance. The p-value
+# follows ks_2samp's 'auto' mode: exact (ks_2samp on the sorted arrays, cheap
+# at that size) up to EXACT_MAX_N rows, asymptotic above.
+#
+# Streaming modes have no raw samples: sketch_distances() integrates the two
+# KLL sketch CDFs instead. Each sketch CDF is within its rank error of the
+# true CDF at any point, so on the span of the retained items the integrals
+# are off by at most (rank_error_1 + rank_error_2) * span for Wasserstein
+# (`wasserstein_error`). Tails beyond the retained items are not covered.
+
+import numpy as np
+from scipy.stats import ks_2samp, kstwo
+
+from .instrumentation import timed
+
+# ks_2samp computes exact p-values when both samples have at most this many rows
+EXACT_MAX_N = 10_000
+
+
+def cdf_distances(points, cdf1, cdf2):
+    """Wasserstein-1 and energy distance of two step CDFs given at sorted `points`"""
+    gaps = np.abs(cdf1 - cdf2)[:-1]
+    widths = np.diff(points)
+    return {
+        'wasserstein': float(np.dot(gaps, widths)),
+        'energy': float(np.sqrt(2 * np.dot(gaps * gaps, widths))),
+    }
+
+
+def merged_ecdfs(sorted1, sorted2):
+    """(distinct merged values, ECDF of each sorted sample at those values)"""
+    n1, n2 = len(sorted1), len(sorted2)
+    values = np.concatenate([sorted1, sorted2])
+    # Two sorted runs: the stable sort only merges them
+    order = np.argsort(values, kind='stable')
+    values = values[order]
+    cum1 = np.cumsum(order < n1)
+    cum2 = np.arange(1, n1 + n2 + 1) - cum1
+    # Right limits: after the last copy of each value
+    last = np.r_[values[1:] != values[:-1], True]
+    return values[last], cum1[last] / n1, cum2[last] / n2
+
+
+@timed('distances.ks')
+def ks_distances(sample1, sample2, presorted=False):
+    """Two-sample KS test plus Wasserstein-1 and energy distance from one merged ECDF
+
+    Returns (statistic, p_value, {'wasserstein', 'energy'}); statistic and
+    p-value equal ks_2samp's.
+    """
+    sorted1 = np.asarray(sample1) if presorted else np.sort(sample1)
+    sorted2 = np.asarray(sample2) if presorted else np.sort(sample2)
+    points, cdf1, cdf2 = merged_ecdfs(sorted1, sorted2)
+    distances = cdf_distances(points, cdf1, cdf2)
+    n1, n2 = len(sorted1), len(sorted2)
+    if max(n1, n2) <= EXACT_MAX_N:
+        statistic, p_value = ks_2samp(sorted1, sorted2)[:2]
+    else:
+        statistic = np.max(np.abs(cdf1 - cdf2))
+        p_value = kstwo.sf(statistic, np.round(n1 * n2 / (n1 + n2)))
+    return float(statistic), float(p_value), distances
+
+
+def count_distances(counted1, counted2):
+    """Wasserstein-1 and energy distance of two (sorted distinct values, counts) samples"""
+    (values1, counts1), (values2, counts2) = counted1, counted2
+    points = np.union1d(values1, values2)
+    cdf1 = np.r_[0.0, np.cumsum(counts1)][np.searchsorted(values1, points, side='right')]
+    cdf2 = np.r_[0.0, np.cumsum(counts2)][np.searchsorted(values2, points, side='right')]
+    return cdf_distances(points, cdf1 / cdf1[-1], cdf2 / cdf2[-1])
+
+
+@timed('distances.sketch')
+def sketch_distances(sketch1, sketch2, delta=0.01):
+    """Approximate Wasserstein-1 and energy distance of two KLL sketches
+
+    Adds `wasserstein_error`, a bound (probability >= 1 - delta) on the
+    Wasserstein error over the span of the retained items.
+    """
+    items1, _ = sketch1._weighted()
+    items2, _ = sketch2._weighted()
+    points = np.union1d(items1, items2)
+    distances = cdf_distances(points, sketch1.cdf(points), sketch2.cdf(points))
+    rank_error = (sketch1.rank_error(delta / (2 * max(len(items1), 1))) +
+                  sketch2.rank_error(delta / (2 * max(len(items2), 1))))
+    span = float(points[-1] - points[0]) if len(points) else 0.0
+    distances['wasserstein_error'] = rank_error * span
+    return distances
@@ -0,0 +1,74 @@
+# =============================================================================
+# KL and JS DIVERGENCE - "Surprise" vs "average difference"
+# =============================================================================
+#
+# PSI (Population Stability Index), the risk-reporting favourite, is the
+# symmetrized KL on binned proportions: sum((a - e) * ln(a / e)) =
+# KL(a||e) + KL(e||a). Rule of thumb: < 0.1 stable, 0.1 - 0.25 moderate
+# shift, > 0.25 major shift.
+
+import numpy as np
+from scipy.spatial.distance import jensenshannon
+from scipy.special import rel_entr
+
+from .instrumentation import timed
+from .precision import resolve_dtype
+
+# Proportions below this are raised to it, so empty bins give a finite PSI
+PSI_EPSILON = 1e-4
+
+
+@timed('divergence.kl')
+def kl_divergence(p, q, dtype=None):
+    """Calculate KL Divergence between two distributions
+
+    With a `dtype` (e.g. np.float32) the terms are computed in that precision
+    and summed in float64.
+    """
+    if dtype is not None:
+        p, q = np.asarray(p, dtype=resolve_dtype(dtype)), np.asarray(q, dtype=resolve_dtype(dtype))
+    # Add small epsilon to avoid log(0)
+    p_safe = np.clip(p, 1e-10, 1)
+    q_safe = np.clip(q, 1e-10, 1)
+    return np.sum(p_safe * np.log(p_safe / q_safe), dtype=np.float64 if dtype is not None else None)
+
+
+@timed('divergence.js')
+def js_divergence(p, q, axis=0, dtype=None):
+    """Calculate JS Divergence between two distributions
+
+    With 2-D inputs, `axis` is the distribution axis (e.g. axis=1 for one
+    distribution per row). With a `dtype` the relative entropies are computed
+    in that precision and summed in float64.
+    """
+    if dtype is None:
+        # JS is symmetric and always between 0 and 1
+        return jensenshannon(p, q, axis=axis)
+    dtype = resolve_dtype(dtype)
+    p, q = np.asarray(p, dtype=dtype), np.asarray(q, dtype=dtype)
+    # Normalize with float64 totals, as jensenshannon does
+    p = p / p.sum(axis=axis, keepdims=True, dtype=np.float64).astype(dtype)
+    q = q / q.sum(axis=axis, keepdims=True, dtype=np.float64).astype(dtype)
+    m = (p + q) / 2
+    js = (rel_entr(p, m).sum(axis=axis, dtype=np.float64) +
+          rel_entr(q, m).sum(axis=axis, dtype=np.float64)) / 2
+    return np.sqrt(js)
+
+
+@timed('divergence.psi')
+def psi(expected, actual, axis=0, eps=PSI_EPSILON, dtype=None, contributions=False):
+    """Population Stability Index of `actual` against `expected` (counts or proportions)
+
+    Both are normalized along `axis`, so 2-D / 3-D inputs score many
+    distributions at once (broadcasting, e.g. one reference row against many
+    windows). With contributions=True also returns the per-bin terms
+    (a - e) * ln(a / e), which sum to the PSI. With a `dtype` the terms are
+    computed in that precision and summed in float64.
+    """
+    dtype = resolve_dtype(dtype)
+    e, a = np.asarray(expected, dtype=dtype), np.asarray(actual, dtype=dtype)
+    e = np.maximum(e / e.sum(axis=axis, keepdims=True, dtype=np.float64).astype(dtype), eps)
+    a = np.maximum(a / a.sum(axis=axis, keepdims=True, dtype=np.float64).astype(dtype), eps)
+    terms = (a - e) * np.log(a / e)
+    total = terms.sum(axis=axis, dtype=np.float64)
+    return (total, terms) if contributions else total
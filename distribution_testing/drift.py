@@ -0,0 +1,184 @@
+# =============================================================================
+# DATA DRIFT DETECTION - KS for continuous features, Chi-square for categorical
+# =============================================================================
+
+import numpy as np
+from scipy.stats import ks_2samp, chi2_contingency
+
+from .cache import cached_result
+from .discrete import discrete_counts, discrete_ks_2samp
+from .distances import count_distances, ks_distances, sketch_distances
+from .instrumentation import timed
+from .precision import as_values, category_codes
+from .sketches import DEFAULT_K, KLLSketch, as_sketch, sketch_ks_2samp
+
+
+@timed('drift.category_counts')
+def category_counts(feature):
+    """(sorted categories, counts) of one sample"""
+    return np.unique(feature, return_counts=True)
+
+
+@timed('drift.align_counts')
+def align_counts(train, current):
+    """Counts of two (categories, counts) pairs over the union of their categories
+
+    Categories missing from one sample get a zero count.
+    """
+    train_cats, train_counts = train
+    current_cats, current_counts = current
+
+    all_cats = np.union1d(train_cats, current_cats)
+    train_aligned = np.zeros(len(all_cats))
+    current_aligned = np.zeros(len(all_cats))
+    # Both category lists are sorted subsets of all_cats
+    train_aligned[np.searchsorted(all_cats, train_cats)] = train_counts
+    current_aligned[np.searchsorted(all_cats, current_cats)] = current_counts
+
+    return all_cats, train_aligned, current_aligned
+
+
+def aligned_category_counts(train_feature, current_feature):
+    """Counts of both samples over the union of their categories"""
+    return align_counts(category_counts(train_feature), category_counts(current_feature))
+
+
+def merge_category_counts(counts, other):
+    """Sum two (categories, counts) pairs, e.g. from successive data chunks"""
+    cats, a, b = align_counts(counts, other)
+    return cats, (a + b).astype(np.int64)
+
+
+def _result(test_name, stat, p_val, alpha, **extra):
+    return {
+        'test': test_name,
+        'statistic': float(stat),
+        'p_value': float(p_val),
+        'drift': bool(p_val < alpha),
+        **extra,
+    }
+
+
+def compare_category_counts(train, current, alpha=0.05):
+    """Chi-square drift test from (categories, counts) pairs of both samples"""
+    _, train_aligned, current_aligned = align_counts(train, current)
+    contingency = np.array([train_aligned, current_aligned])
+    with timed('drift.chi2_contingency'):
+        stat, p_val, _, _ = chi2_contingency(contingency)
+    return _result("Chi2", stat, p_val, alpha)
+
+
+@timed('drift.category_codes')
+def coded_category_counts(train_feature, current_feature):
+    """(categories, counts) pairs of both samples from one joint integer encoding"""
+    cats, (train_codes, current_codes) = category_codes(train_feature, current_feature)
+    return ((cats, np.bincount(train_codes, minlength=len(cats))),
+            (cats, np.bincount(current_codes, minlength=len(cats))))
+
+
+def _continuous(values, dtype):
+    # Sketches and already-numeric arrays pass through unless a dtype is asked for
+    if isinstance(values, KLLSketch) or (dtype is None and np.asarray(values).dtype.kind in 'fiub'):
+        return values
+    return as_values(values, dtype)
+
+
+def compare_feature(train_feature, current_feature, f_type, alpha=0.05, ks_method='exact',
+                    sketch_k=DEFAULT_K, dtype=None, distances=False):
+    """Drift test for one feature: KS if continuous, Chi-square otherwise
+
+    ks_method='sketch' runs the KS test on KLL sketches (inputs may already
+    be sketches) and adds the statistic's `error_bound` to the result.
+    ks_method='discrete' counts low-cardinality columns (integers, rounded
+    prices) without sorting and gives tie-aware p-values (discrete.py);
+    other columns get the exact KS test.
+    With a `dtype` (e.g. np.float32) continuous values are tested in that
+    precision and categories are counted through integer codes
+    (distribution_testing.precision). distances=True adds the Wasserstein-1
+    and energy distance of continuous features (distances.py), from the same
+    sorted values, counts or sketches as the KS test.
+    """
+    if f_type == 'continuous':
+        train_feature = _continuous(train_feature, dtype)
+        current_feature = _continuous(current_feature, dtype)
+        if ks_method == 'sketch':
+            sketches = as_sketch(train_feature, sketch_k), as_sketch(current_feature, sketch_k)
+            with timed('drift.sketch_ks'):
+                stat, p_val, error_bound = sketch_ks_2samp(*sketches)
+            return _result("KS (sketch)", stat, p_val, alpha, error_bound=error_bound,
+                           **(sketch_distances(*sketches) if distances else {}))
+        if ks_method == 'discrete':
+            counted = [discrete_counts(train_feature), discrete_counts(current_feature)]
+            if all(c is not None for c in counted):
+                stat, p_val = discrete_ks_2samp(*counted)
+                return _result("KS (discrete)", stat, p_val, alpha,
+                               **(count_distances(*counted) if distances else {}))
+        if distances:
+            stat, p_val, distance = ks_distances(train_feature, current_feature)
+            return _result("KS", stat, p_val, alpha, **distance)
+        # Use KS test for continuous features
+        with timed('drift.ks_2samp'):
+            stat, p_val = ks_2samp(train_feature, current_feature)
+        return _result("KS", stat, p_val, alpha)
+    # Use Chi-square test for categorical features
+    if dtype is not None:
+        return compare_category_counts(*coded_category_counts(train_feature, current_feature), alpha)
+    return compare_category_counts(category_counts(train_feature),
+                                   category_counts(current_feature), alpha)
+
+
+@timed('drift.report')
+def drift_report(train_data, current_data, feature_names, feature_types, alpha=0.05,
+                 cache=None, ks_method='exact', dtype=None, distances=False):
+    """Per-feature drift results as a list of dicts
+
+    With a `cache` (distribution_testing.cache.DriftCache), features whose
+    reference and current columns were compared before are not re-tested.
+    `dtype` and `distances` are passed to compare_feature.
+    """
+    report = []
+    for i, (feature, f_type) in enumerate(zip(feature_names, feature_types)):
+        train_feature, current_feature = train_data[:, i], current_data[:, i]
+        compare = lambda: compare_feature(train_feature, current_feature, f_type, alpha, ks_method,
+                                          dtype=dtype, distances=distances)
+        if cache is None:
+            result = compare()
+        else:
+            test = f_type if f_type != 'continuous' else f"{f_type}/{ks_method}"
+            if dtype is not None and f_type == 'continuous':
+                test += f"/{np.dtype(dtype).name}"
+            if distances and f_type == 'continuous':
+                test += "/distances"
+            key = cache.feature_key(train_feature, current_feature, test)
+            result = cached_result(cache, key, alpha, compare)
+        report.append({'feature': feature, **result})
+    return report
+
+
+def print_drift_report(report):
+    """Print a drift report as the classic drift table"""
+    print("Data Drift Analysis")
+    print("Feature".ljust(15) + "KS/Chi2 Stat".ljust(15) + "P-value".ljust(12) + "Drift Detected")
+    print("-" * 60)
+
+    for row in report:
+        print(f"{row['feature'].ljust(15)}{row['test'].ljust(15)}{row['p_value']:.4f}".ljust(32) +
+              ("\t\tYES" if row['drift'] else "\t\tNO"))
+
+    print("-" * 60)
+    if any(row['drift'] for row in report):
+        print("WARNING: Data drift detected in one or more features!")
+    else:
+        print("No significant data drift detected.")
+
+
+def detect_data_drift(train_data, current_data, feature_names, feature_types, alpha=0.05,
+                      verbose=False, cache=None, ks_method='exact', dtype=None, distances=False):
+    """
+    Detect data drift between training data and current production data
+    """
+    report = drift_report(train_data, current_data, feature_names, feature_types, alpha, cache,
+                          ks_method, dtype, distances)
+    if verbose:
+        print_drift_report(report)
+    return any(row['drift'] for row in report)
@@ -0,0 +1,7 @@
+"""Model evaluation: bootstrap intervals, DeLong AUC tests, operating points, calibration, multiclass"""
+
+from .bootstrap import bootstrap_ci, bootstrap_metrics, prepare_scores, resample_weights, weighted_metrics
+from .calibration import StreamingCalibration, calibration_metrics, weighted_calibration
+from .delong import delong_covariance, delong_multi_test, delong_roc_test
+from .multiclass import multiclass_metrics
+from .operating_points import at_fpr, at_recall, at_thresholds, roc_table, roc_table_from_curve
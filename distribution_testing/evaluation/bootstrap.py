@@ -0,0 +1,179 @@
+# =============================================================================
+# BOOTSTRAP CONFIDENCE INTERVALS - ROC AUC, PR AUC and F1
+# =============================================================================
+#
+# Instead of materializing 1000 resampled copies of (y_true, y_score) and
+# calling roc_auc_score on each, every bootstrap replicate is represented by a
+# row of resample counts (how many times each test row was drawn). The scores
+# are sorted ONCE, and all metrics are evaluated for a whole block of
+# replicates with weighted cumulative sums over the sorted order.
+#
+# dtype=np.float32 halves the scores and the (replicates x rows) weight
+# matrices. Resample counts and per tie-group counts are small integers,
+# exact in float32; class totals and the cumulative sums are float64.
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from ..instrumentation import timed
+from ..precision import resolve_dtype
+from ..random_streams import make_rng, spawn_seeds
+
+_worker_state = {}
+
+
+@timed('bootstrap.prepare_scores')
+def prepare_scores(y_true, y_score, dtype=None):
+    """Sort scores once and collapse tied scores into groups
+
+    Scores are kept in `dtype` (default float64); scores that are equal in
+    that precision form one tie group.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=resolve_dtype(dtype))
+
+    order = np.argsort(y_score, kind='mergesort')
+    sorted_scores = y_score[order]
+    sorted_labels = y_true[order]
+
+    # Start index of every run of tied scores (ascending)
+    group_starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+
+    return {
+        'scores': sorted_scores,
+        'labels': sorted_labels,
+        'group_starts': group_starts,
+    }
+
+
+def resample_weights(n, n_boot, rng, method='poisson', dtype=None):
+    """Draw bootstrap resample counts as an (n_boot, n) matrix
+
+    'multinomial' is the classic bootstrap (every replicate has exactly n rows),
+    'poisson' draws independent Poisson(1) counts, which is cheaper and is the
+    standard large-n approximation. Counts are returned as `dtype` floats.
+    """
+    dtype = resolve_dtype(dtype)
+    if method == 'poisson':
+        return rng.poisson(1.0, size=(n_boot, n)).astype(dtype)
+    if method == 'multinomial':
+        return rng.multinomial(n, np.full(n, 1.0 / n), size=n_boot).astype(dtype)
+    raise ValueError(f"Unknown resampling method: {method!r}")
+
+
+@timed('bootstrap.weighted_metrics')
+def weighted_metrics(prepared, weights, threshold=0.5):
+    """ROC AUC, PR AUC and F1 for every row of a resample weight matrix
+
+    `weights` has shape (n_boot, n) and is aligned with the SORTED scores in
+    `prepared`. Returns a dict of (n_boot,) arrays.
+    """
+    labels = prepared['labels']
+    starts = prepared['group_starts']
+
+    w_pos = weights * labels
+    w_neg = weights * ~labels
+
+    # Per tie-group weighted counts of positives and negatives, ascending score.
+    # Integers are exact in float32 below 2**24, so only larger inputs need
+    # float64 group counts.
+    group_dtype = weights.dtype if len(labels) < 2**24 else np.float64
+    pos = np.add.reduceat(w_pos, starts, axis=1, dtype=group_dtype)
+    neg = np.add.reduceat(w_neg, starts, axis=1, dtype=group_dtype)
+    total_pos = pos.sum(axis=1, dtype=np.float64)
+    total_neg = neg.sum(axis=1, dtype=np.float64)
+
+    # Rank-based (Mann-Whitney) AUC: each positive beats every lower-scored
+    # negative and ties count one half
+    neg_below = np.cumsum(neg, axis=1, dtype=np.float64) - neg
+    with np.errstate(invalid='ignore', divide='ignore'):
+        roc_auc = (pos * (neg_below + 0.5 * neg)).sum(axis=1) / (total_pos * total_neg)
+
+    # PR curve: sweep thresholds from the highest score down
+    tps = np.cumsum(pos[:, ::-1], axis=1, dtype=np.float64)
+    fps = np.cumsum(neg[:, ::-1], axis=1, dtype=np.float64)
+    predicted = tps + fps
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(predicted > 0, tps / predicted, 1.0)
+        recall = tps / total_pos[:, None]
+    # Trapezoidal area starting from (recall=0, precision=1), as auc(recall, precision)
+    precision = np.hstack([np.ones((len(weights), 1)), precision])
+    recall = np.hstack([np.zeros((len(weights), 1)), recall])
+    pr_auc = (np.diff(recall, axis=1) * (precision[:, 1:] + precision[:, :-1]) / 2).sum(axis=1)
+
+    # F1 at the chosen threshold
+    predicted_pos = prepared['scores'] >= threshold
+    tp = w_pos[:, predicted_pos].sum(axis=1, dtype=np.float64)
+    fp = w_neg[:, predicted_pos].sum(axis=1, dtype=np.float64)
+    fn = total_pos - tp
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f1 = 2 * tp / (2 * tp + fp + fn)
+
+    return {'roc_auc': roc_auc, 'pr_auc': pr_auc, 'f1': f1}
+
+
+def _init_worker(prepared):
+    _worker_state['prepared'] = prepared
+
+
+def _bootstrap_block(args):
+    """Evaluate one block of replicates with its own independent random stream"""
+    seed_seq, n_boot, method, threshold = args
+    prepared = _worker_state['prepared']
+    rng = make_rng(seed_seq)
+    weights = resample_weights(len(prepared['scores']), n_boot, rng, method,
+                               prepared['scores'].dtype)
+    return weighted_metrics(prepared, weights, threshold)
+
+
+@timed('bootstrap.metrics')
+def bootstrap_metrics(y_true, y_score, threshold=0.5, n_boot=1000, method='poisson',
+                      block_size=100, n_jobs=1, seed=42, dtype=None, prepared=None):
+    """Bootstrap replicates of ROC AUC, PR AUC and F1
+
+    Replicates are generated in blocks of `block_size`; each block draws from
+    its own random stream, so the result is identical for any `n_jobs`. With
+    n_jobs > 1 the blocks run on a process pool. `dtype` sets the precision
+    of the scores and weight matrices. Pass `prepared` (from prepare_scores)
+    to reuse scores that are already sorted.
+    """
+    if prepared is None:
+        prepared = prepare_scores(y_true, y_score, dtype)
+
+    block_sizes = [block_size] * (n_boot // block_size)
+    if n_boot % block_size:
+        block_sizes.append(n_boot % block_size)
+    seeds = spawn_seeds(seed, len(block_sizes))
+    tasks = [(s, b, method, threshold) for s, b in zip(seeds, block_sizes)]
+
+    if n_jobs == 1:
+        _init_worker(prepared)
+        try:
+            blocks = [_bootstrap_block(task) for task in tasks]
+        finally:
+            _worker_state.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(prepared,)) as executor:
+            blocks = list(executor.map(_bootstrap_block, tasks))
+
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def bootstrap_ci(y_true, y_score, threshold=0.5, confidence=0.95, dtype=None, **kwargs):
+    """Point estimates and percentile bootstrap confidence intervals
+
+    Returns {metric: (estimate, lower, upper)}.
+    """
+    prepared = prepare_scores(y_true, y_score, dtype)
+    point = weighted_metrics(prepared, np.ones((1, len(prepared['scores'])), prepared['scores'].dtype),
+                             threshold)
+    replicates = bootstrap_metrics(y_true, y_score, threshold=threshold, dtype=dtype, prepared=prepared,
+                                   **kwargs)
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for name, values in replicates.items():
+        lower, upper = np.nanpercentile(values, [tail, 100 - tail])
+        intervals[name] = (point[name][0], lower, upper)
+    return intervals
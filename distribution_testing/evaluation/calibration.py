@@ -0,0 +1,188 @@
+# =============================================================================
+# CALIBRATION - ECE, MCE, Brier score and reliability curves
+# =============================================================================
+#
+# A model is calibrated when, of the rows scored 0.8, about 80% are positive.
+# Scores are split into bins (edges in [0, 1]; bin i holds edges[i] < p <=
+# edges[i + 1], the first bin also p = 0, as sklearn's calibration_curve).
+# Every metric comes from four sums per bin, gathered in ONE pass:
+#
+#   count    rows in the bin            score    sum of p
+#   label    sum of y (positives)       squared  sum of (y - p)**2
+#
+#   reliability curve   mean p (= score / count) vs fraction positive
+#                       (= label / count) per bin; NaN for empty bins
+#   ECE                 sum over bins |label - score| / rows
+#                       (= sum of count / rows * |fraction - mean p|)
+#   MCE                 max over non-empty bins |fraction - mean p|
+#   Brier score         sum of squared / rows
+#
+# The sums are additive, so the same code serves:
+#   calibration_metrics()   raw scores: bin index by arithmetic (equal
+#                           widths) or searchsorted, then np.bincount per sum. A (models x
+#                           rows) score matrix is binned in the same pass
+#                           (index + model * n_bins), giving one row of
+#                           metrics per model.
+#   weighted_calibration()  scores already sorted by bootstrap.prepare_scores:
+#                           bins are contiguous runs of the sorted order,
+#                           summed with np.add.reduceat for every row of a
+#                           resample weight matrix at once (as
+#                           weighted_metrics).
+#   StreamingCalibration    batches of (y_true, y_score) accumulate the sums;
+#                           fixed edges, O(n_bins) state, mergeable.
+
+import numpy as np
+
+from ..instrumentation import timed
+
+SUMS = ('count', 'score', 'label', 'squared')
+
+
+def calibration_edges(n_bins=10, strategy='uniform', y_score=None, presorted=False):
+    """Bin edges: n_bins equal widths on [0, 1], or quantiles of `y_score`"""
+    if strategy == 'uniform':
+        return np.linspace(0.0, 1.0, n_bins + 1)
+    if strategy != 'quantile':
+        raise ValueError(f"Unknown strategy: {strategy!r}; use 'uniform' or 'quantile'")
+    if y_score is None:
+        raise ValueError("strategy='quantile' needs the scores")
+    y_score = np.asarray(y_score, dtype=np.float64)
+    if y_score.ndim != 1:
+        raise ValueError("strategy='quantile' needs one model's scores; pass shared edges instead")
+    if not presorted:
+        return np.percentile(y_score, np.linspace(0, 100, n_bins + 1))
+    # Linear interpolation between order statistics, as np.percentile
+    position = np.linspace(0.0, len(y_score) - 1, n_bins + 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, len(y_score) - 1)
+    return y_score[low] + (position - low) * (y_score[high] - y_score[low])
+
+
+def calibration_summary(sums, edges):
+    """Metrics and reliability curve from per-bin sums ({name: (..., n_bins) array})"""
+    count, score, label = sums['count'], sums['score'], sums['label']
+    rows = count.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_predicted = score / count
+        fraction_positive = label / count
+        gap = np.abs(fraction_positive - mean_predicted)
+        ece = np.abs(label - score).sum(axis=-1) / rows
+        brier = sums['squared'].sum(axis=-1) / rows
+    mce = np.max(np.where(count > 0, gap, -np.inf), axis=-1)
+    return {
+        'ece': ece,
+        'mce': np.where(np.isfinite(mce), mce, np.nan)[()],
+        'brier': brier,
+        'bin_edges': edges,
+        'mean_predicted': mean_predicted,
+        'fraction_positive': fraction_positive,
+        'count': count,
+    }
+
+
+def bin_index(y_score, edges):
+    """Bin of every score: the number of inner edges strictly below it"""
+    n_bins = len(edges) - 1
+    if not np.array_equal(edges, calibration_edges(n_bins)):
+        return np.searchsorted(edges[1:-1], y_score, side='left')
+    # Equal widths: arithmetic guess, corrected against the edges themselves
+    # (searchsorted over unsorted scores is several times slower)
+    index = (y_score * n_bins).astype(np.int64)
+    np.clip(index, 0, n_bins - 1, out=index)
+    index -= (index > 0) & (y_score <= edges[index])
+    index += (index < n_bins - 1) & (y_score > edges[index + 1])
+    return index
+
+
+def binned_sums(y_true, y_score, edges):
+    """Per-bin sums of one (rows,) or several (models, rows) score arrays"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n_bins = len(edges) - 1
+    models = y_score.shape[:-1]
+    index = bin_index(y_score, edges)
+    if models:
+        offsets = n_bins * np.arange(int(np.prod(models))).reshape(models + (1,))
+        index = index + offsets
+    index = index.ravel()
+    size = n_bins * int(np.prod(models))
+    labels = np.broadcast_to(y_true, y_score.shape).ravel()
+    scores = y_score.ravel()
+    sums = {
+        'count': np.bincount(index, minlength=size).astype(np.float64),
+        'score': np.bincount(index, weights=scores, minlength=size),
+        'label': np.bincount(index, weights=labels, minlength=size),
+        'squared': np.bincount(index, weights=(labels - scores) ** 2, minlength=size),
+    }
+    return {name: values.reshape(models + (n_bins,)) for name, values in sums.items()}
+
+
+@timed('calibration.metrics')
+def calibration_metrics(y_true, y_score, n_bins=10, strategy='uniform', edges=None):
+    """ECE, MCE, Brier score and reliability curve in one binning pass
+
+    `y_score` is (rows,) or (models, rows) against the same labels; with
+    several models every output gains a leading models axis. Returns
+    {'ece', 'mce', 'brier', 'bin_edges', 'mean_predicted',
+    'fraction_positive', 'count'}.
+    """
+    if edges is None:
+        edges = calibration_edges(n_bins, strategy, y_score)
+    edges = np.asarray(edges, dtype=np.float64)
+    return calibration_summary(binned_sums(y_true, y_score, edges), edges)
+
+
+@timed('calibration.weighted')
+def weighted_calibration(prepared, weights, edges=None, n_bins=10, strategy='uniform'):
+    """Calibration metrics for every row of a resample weight matrix
+
+    `prepared` comes from bootstrap.prepare_scores and `weights` (n_boot, n)
+    is aligned with its SORTED scores, as in weighted_metrics. Quantile
+    edges are read off the sorted scores (no second sort).
+    """
+    scores = prepared['scores'].astype(np.float64)
+    labels = prepared['labels']
+    if edges is None:
+        edges = calibration_edges(n_bins, strategy, scores, presorted=True)
+    edges = np.asarray(edges, dtype=np.float64)
+    # Bins are contiguous runs of the sorted scores: bin i ends after the
+    # last score <= edges[i + 1]
+    bounds = np.r_[0, np.searchsorted(scores, edges[1:-1], side='right'), len(scores)]
+
+    # reduceat needs strictly increasing starts: sum the non-empty runs only
+    filled = bounds[:-1] < bounds[1:]
+
+    weights = np.atleast_2d(weights)
+    sums = {}
+    for name, values in (('count', None), ('score', scores), ('label', labels),
+                         ('squared', (labels - scores) ** 2)):
+        weighted = weights if values is None else weights * values
+        sums[name] = np.zeros((len(weights), len(edges) - 1))
+        sums[name][:, filled] = np.add.reduceat(weighted, bounds[:-1][filled], axis=1, dtype=np.float64)
+    return calibration_summary(sums, edges)
+
+
+class StreamingCalibration:
+    """Calibration metrics of a stream of (y_true, y_score) batches on fixed edges"""
+
+    def __init__(self, n_bins=10, edges=None, models=None):
+        if edges is None:
+            edges = calibration_edges(n_bins)
+        self.edges = np.asarray(edges, dtype=np.float64)
+        shape = (len(self.edges) - 1,) if models is None else (models, len(self.edges) - 1)
+        self.sums = {name: np.zeros(shape) for name in SUMS}
+
+    @timed('calibration.streaming_update')
+    def update(self, y_true, y_score):
+        """Add a batch; y_score is (rows,) or (models, rows)"""
+        return self.merge(binned_sums(y_true, y_score, self.edges))
+
+    def merge(self, other):
+        """Add the sums of another accumulator (or a binned_sums result)"""
+        sums = other.sums if isinstance(other, StreamingCalibration) else other
+        for name in SUMS:
+            self.sums[name] = self.sums[name] + sums[name]
+        return self
+
+    def result(self):
+        return calibration_summary(self.sums, self.edges)
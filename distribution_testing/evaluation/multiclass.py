@@ -0,0 +1,185 @@
+# =============================================================================
+# MULTICLASS / MULTILABEL - One-vs-rest ROC AUC, PR AUC and F1 for all classes
+# =============================================================================
+#
+# One-vs-rest turns C classes into C binary problems: class c's column of
+# the (n_samples, n_classes) probability matrix against "label is c". Instead
+# of one Python-level binary evaluation per class, a BLOCK of columns is
+# evaluated at once:
+#
+#   the block is copied class-major (one contiguous row per class), one
+#   argsort along the rows orders every class by decreasing score, and a
+#   cumulative sum of the reordered labels gives the true positives at every
+#   cut (false positives = cut size - true positives). Tied scores are one
+#   threshold: only the last point of each tie group is a curve point. The
+#   curve points of all classes are flattened into one array, class after
+#   class, so every area is a sum of trapezoids between neighbours, added
+#   up per class with one np.add.reduceat.
+#
+#   roc_auc      trapezoids under (FPR, TPR), as roc_auc_score
+#   pr_auc       trapezoids under (recall, precision) from (0, 1), as
+#                auc(recall, precision) in precision_recall_demo.py
+#   best_f1      F1 at the best threshold of the sweep (best_threshold)
+#   f1           F1 of the predictions: the argmax class for multiclass
+#                labels, score >= threshold for multilabel indicators
+#
+# MEMORY. A block holds about MAX_BLOCK_ELEMENTS scores (block_size columns
+# of n rows), and a few (block, n) work arrays live at a time, so hundreds
+# of classes do not multiply the memory of the whole matrix.
+#
+# AVERAGES. macro is the plain mean over classes, weighted the mean weighted
+# by each class's positives (support); classes without positives (or
+# without negatives) have NaN AUCs and are left out. micro pools every
+# (sample, class) cell into ONE binary problem; that needs one sort of all
+# n x C scores, so it is only computed when asked for:
+# average=('macro', 'weighted', 'micro').
+
+import numpy as np
+
+from ..instrumentation import count, timed
+from ..precision import resolve_dtype
+
+MAX_BLOCK_ELEMENTS = 2**22
+AVERAGES = ('macro', 'weighted', 'micro')
+DEFAULT_AVERAGES = ('macro', 'weighted')
+
+
+def _previous(values, first, initial):
+    """Each curve point's predecessor in its own class (`initial` for the first point)"""
+    return np.where(first, initial, np.r_[initial, values[:-1]])
+
+
+@timed('multiclass.classes')
+def class_metrics(scores, labels):
+    """ROC AUC, PR AUC and best F1 of every row of a (classes, n) block"""
+    n_rows = len(scores)
+    # Ties are resolved by the group ends below, so the sort need not be stable
+    order = np.argsort(-scores, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    tps = np.cumsum(np.take_along_axis(labels, order, axis=1), axis=1)
+    del order
+    positives = tps[:, -1].astype(np.float64)
+    negatives = scores.shape[1] - positives
+
+    # Curve points: the last element of every run of tied scores, flattened
+    # class by class, so a point's predecessor is the previous element
+    ends = np.hstack([scores[:, 1:] != scores[:, :-1], np.ones((n_rows, 1), dtype=bool)])
+    points = ends.sum(axis=1)
+    starts = np.r_[0, np.cumsum(points)[:-1]]
+    thresholds = scores[ends]
+    tp = tps[ends].astype(np.float64)
+    cut = np.broadcast_to(np.arange(1, scores.shape[1] + 1), scores.shape)[ends]
+    del tps, ends
+    fp = cut - tp
+    first = np.zeros(len(tp), dtype=bool)
+    first[starts] = True
+    class_positives = np.repeat(positives, points)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tpr = tp / class_positives
+        fpr = fp / np.repeat(negatives, points)
+        precision = tp / cut
+        f1 = np.nan_to_num(2 * tp / (cut + class_positives))
+    roc_area = (fpr - _previous(fpr, first, 0.0)) * (tpr + _previous(tpr, first, 0.0)) / 2
+    pr_area = (tpr - _previous(tpr, first, 0.0)) * (precision + _previous(precision, first, 1.0)) / 2
+    roc_auc = np.add.reduceat(roc_area, starts)
+    pr_auc = np.add.reduceat(pr_area, starts)
+
+    # Highest F1 of each class, at the highest threshold reaching it
+    best_f1 = np.maximum.reduceat(f1, starts)
+    best = np.minimum.reduceat(np.where(f1 == np.repeat(best_f1, points), np.arange(len(f1)), len(f1)),
+                               starts)
+    return {
+        'roc_auc': np.where((positives == 0) | (negatives == 0), np.nan, roc_auc),
+        'pr_auc': np.where(positives == 0, np.nan, pr_auc),
+        'best_f1': np.where(positives == 0, np.nan, best_f1),
+        'best_threshold': thresholds[best].astype(np.float64),
+        'support': positives,
+    }
+
+
+def _indicators(y_true, classes, block):
+    """Class-major (classes in block, n) boolean labels"""
+    if y_true.ndim == 2:
+        return np.ascontiguousarray(y_true[:, block].T.astype(bool))
+    return y_true == classes[block, None]
+
+
+def _f1(tp, predicted, support):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 2 * tp / (predicted + support)
+
+
+def _averages(per_class, weights):
+    """(macro, support-weighted) mean over the classes where the metric is defined"""
+    defined = ~np.isnan(per_class)
+    if not defined.any():
+        return np.nan, np.nan
+    macro = float(per_class[defined].mean())
+    total = weights[defined].sum()
+    weighted = float(np.dot(per_class[defined], weights[defined]) / total) if total > 0 else np.nan
+    return macro, weighted
+
+
+@timed('multiclass.metrics')
+def multiclass_metrics(y_true, y_proba, threshold=0.5, average=DEFAULT_AVERAGES, block_size=None, dtype=None):
+    """One-vs-rest ROC AUC, PR AUC and F1 of an (n_samples, n_classes) score matrix
+
+    `y_true` is (n,) class indices (multiclass; F1 of the argmax prediction)
+    or an (n, n_classes) 0/1 indicator matrix (multilabel; F1 of score >=
+    `threshold`). Returns {'per_class': {metric: (n_classes,) array}} plus
+    one {metric: value} dict per requested average ('macro' and 'weighted'
+    by default; 'micro' sorts all n x C scores). Columns are evaluated
+    `block_size` at a time (default: about MAX_BLOCK_ELEMENTS scores per
+    block); scores are sorted in `dtype`.
+    """
+    for mode in average:
+        if mode not in AVERAGES:
+            raise ValueError(f"Unknown average: {mode!r}; use one of {AVERAGES}")
+    y_proba = np.asarray(y_proba, dtype=resolve_dtype(dtype))
+    y_true = np.asarray(y_true)
+    n, n_classes = y_proba.shape
+    classes = np.arange(n_classes)
+    if block_size is None:
+        block_size = max(1, MAX_BLOCK_ELEMENTS // max(n, 1))
+
+    if y_true.ndim == 1:
+        # Multiclass: F1 of the argmax prediction
+        argmax = np.argmax(y_proba, axis=1)
+        predicted = np.bincount(argmax, minlength=n_classes).astype(np.float64)
+        tp = np.bincount(argmax[argmax == y_true], minlength=n_classes).astype(np.float64)
+    else:
+        predicted, tp = np.zeros(n_classes), np.zeros(n_classes)
+    blocks = []
+    for start in range(0, n_classes, block_size):
+        block = slice(start, start + block_size)
+        # Class-major copy: each class's scores are contiguous for the sort
+        scores, labels = np.ascontiguousarray(y_proba[:, block].T), _indicators(y_true, classes, block)
+        blocks.append(class_metrics(scores, labels))
+        if y_true.ndim == 2:
+            hits = scores >= threshold
+            predicted[block] = hits.sum(axis=1)
+            tp[block] = (hits & labels).sum(axis=1)
+    count('multiclass.blocks', len(blocks))
+
+    per_class = {name: np.concatenate([b[name] for b in blocks]) for name in blocks[0]}
+    support = per_class['support']
+    per_class['f1'] = _f1(tp, predicted, support)
+
+    result = {'per_class': per_class}
+    for name in ('roc_auc', 'pr_auc', 'f1', 'best_f1'):
+        macro, weighted = _averages(per_class[name], support)
+        if 'macro' in average:
+            result.setdefault('macro', {})[name] = macro
+        if 'weighted' in average:
+            result.setdefault('weighted', {})[name] = weighted
+    if 'micro' in average:
+        pooled_labels = y_true.astype(bool) if y_true.ndim == 2 else y_true[:, None] == classes
+        pooled = class_metrics(y_proba.reshape(1, -1), pooled_labels.reshape(1, -1))
+        result['micro'] = {
+            'roc_auc': float(pooled['roc_auc'][0]),
+            'pr_auc': float(pooled['pr_auc'][0]),
+            'f1': float(_f1(tp.sum(), predicted.sum(), support.sum())),
+            'best_f1': float(pooled['best_f1'][0]),
+        }
+    return result
@@ -0,0 +1,103 @@
+# =============================================================================
+# OPERATING POINTS - FPR, TPR, precision and recall at chosen thresholds
+# =============================================================================
+#
+# roc_curve returns `thresholds` in DECREASING order, with fpr and tpr
+# non-decreasing along the same axis. All three are therefore sorted, so any
+# batch of m queries can be answered with np.searchsorted in O(m log n)
+# instead of one np.argmin(np.abs(thresholds - t)) scan per query.
+
+import numpy as np
+
+from ..instrumentation import timed
+from ..precision import resolve_dtype
+
+
+@timed('operating_points.roc_table')
+def roc_table(y_true, y_score, dtype=None):
+    """Full-resolution ROC table (every distinct score is a threshold)
+
+    Same points as sklearn's roc_curve(..., drop_intermediate=False). Scores
+    are sorted in `dtype` (default float64); rates are float64.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=resolve_dtype(dtype))
+
+    order = np.argsort(-y_score, kind='mergesort')
+    sorted_scores = y_score[order]
+    # Last index of every run of tied scores, highest score first
+    ends = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tps = np.cumsum(y_true[order])[ends]
+    fps = ends + 1 - tps
+
+    n_pos = int(tps[-1])
+    n_neg = int(fps[-1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fpr = np.r_[0.0, fps / n_neg]
+        tpr = np.r_[0.0, tps / n_pos]
+    thresholds = np.r_[np.inf, sorted_scores[ends]]
+    return roc_table_from_curve(fpr, tpr, thresholds, n_pos, n_neg)
+
+
+def roc_table_from_curve(fpr, tpr, thresholds, n_pos, n_neg):
+    """ROC table from an existing roc_curve result
+
+    Use roc_curve(..., drop_intermediate=False): with dropped points, a
+    threshold lookup lands on the nearest KEPT threshold above it.
+    """
+    fpr = np.asarray(fpr, dtype=float)
+    tpr = np.asarray(tpr, dtype=float)
+    tps = tpr * n_pos
+    fps = fpr * n_neg
+    predicted = tps + fps
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Nothing predicted positive counts as precision 1, as in precision_recall_curve
+        precision = np.where(predicted > 0, tps / predicted, 1.0)
+
+    thresholds = np.asarray(thresholds, dtype=float)
+    return {
+        'fpr': fpr,
+        'tpr': tpr,
+        'thresholds': thresholds,
+        # Negated once here, so every lookup searches an increasing array
+        'negated_thresholds': -thresholds,
+        'precision': precision,
+        'n_pos': n_pos,
+        'n_neg': n_neg,
+    }
+
+
+def _points(table, idx):
+    return {
+        'threshold': table['thresholds'][idx],
+        'fpr': table['fpr'][idx],
+        'tpr': table['tpr'][idx],
+        'precision': table['precision'][idx],
+        'recall': table['tpr'][idx],
+    }
+
+
+@timed('operating_points.lookup')
+def at_thresholds(table, query):
+    """Operating points of the rule `y_score >= t` for every t in `query`
+
+    The point for t is the last (lowest) ROC threshold that is still >= t.
+    """
+    query = np.atleast_1d(np.asarray(query, dtype=float))
+    # -thresholds is increasing; count how many thresholds are >= t
+    idx = np.searchsorted(table['negated_thresholds'], -query, side='right') - 1
+    return _points(table, np.clip(idx, 0, None))
+
+
+def at_fpr(table, target_fpr):
+    """Best (highest TPR) operating point with FPR <= each target"""
+    target_fpr = np.atleast_1d(np.asarray(target_fpr, dtype=float))
+    idx = np.searchsorted(table['fpr'], target_fpr, side='right') - 1
+    return _points(table, np.clip(idx, 0, None))
+
+
+def at_recall(table, target_recall):
+    """Highest-threshold operating point reaching recall >= each target"""
+    target_recall = np.atleast_1d(np.asarray(target_recall, dtype=float))
+    idx = np.searchsorted(table['tpr'], target_recall, side='left')
+    return _points(table, np.clip(idx, 0, len(table['tpr']) - 1))
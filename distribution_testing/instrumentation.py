@@ -0,0 +1,227 @@
+# =============================================================================
+# INSTRUMENTATION - Where does a slow drift job spend its time?
+# =============================================================================
+#
+# Timers and counters around the statistical kernels (np.unique, category
+# alignment, ks_2samp, chi2_contingency, plotting, ...):
+#
+#   @timed('drift.ks_2samp')              # decorator
+#   def compare(...): ...
+#
+#   with timed('ks.plot'):                # context manager
+#       plot_ks_test(...)
+#
+#   count('cache.hits')
+#
+# Everything is OFF by default. A disabled decorator costs one flag check
+# per call and a disabled `with timed(...)` one small object, so the hooks
+# can stay in production code. Enable with
+#
+#   instrumentation.enable()                  # timers and counters
+#   instrumentation.enable(memory=True)       # + tracemalloc peak per section
+#
+# or the environment: DISTRIBUTION_TESTING_PROFILE=1 (or =memory). If
+# DISTRIBUTION_TESTING_METRICS_FILE is set, the metrics are written there at
+# exit: Prometheus text format for *.prom, JSON otherwise (e.g. for the
+# node_exporter textfile collector).
+#
+# Per section the registry keeps count, total / max seconds and, with
+# memory=True, the largest tracemalloc peak above the memory in use when the
+# section started. Sections may nest; memory peaks are exact in one thread.
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_state = threading.local()
+_lock = threading.Lock()
+_enabled = False
+_memory = False
+_sections = {}
+_counters = {}
+
+
+def _record(name, seconds, peak_bytes):
+    with _lock:
+        section = _sections.get(name)
+        if section is None:
+            section = _sections[name] = {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                                         'peak_bytes': None}
+        section['count'] += 1
+        section['total_seconds'] += seconds
+        section['max_seconds'] = max(section['max_seconds'], seconds)
+        if peak_bytes is not None:
+            section['peak_bytes'] = max(section['peak_bytes'] or 0, peak_bytes)
+
+
+class timed:
+    """Time a section: `with timed(name):` or `@timed(name)`
+
+    Use a fresh `timed(name)` per `with` block (as written above); the
+    decorator creates one per call.
+    """
+
+    __slots__ = ('name', 'start', 'frame')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if not _enabled:
+            return self
+        self.frame = None
+        if _memory and tracemalloc.is_tracing():
+            stack = _memory_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Keep the enclosing section's peak before resetting it
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self.frame = [current, 0]
+            stack.append(self.frame)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is None:
+            return False
+        seconds = time.perf_counter() - self.start
+        self.start = None
+        peak_bytes = None
+        if self.frame is not None:
+            stack = _memory_stack()
+            peak = max(tracemalloc.get_traced_memory()[1], self.frame[1])
+            stack.pop()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            peak_bytes = peak - self.frame[0]
+        _record(self.name, seconds, peak_bytes)
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def _memory_stack():
+    if not hasattr(_state, 'stack'):
+        _state.stack = []
+    return _state.stack
+
+
+def count(name, n=1):
+    """Add `n` to a counter (no-op when disabled)"""
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def enable(memory=False):
+    """Turn the timers and counters on; memory=True also traces allocations"""
+    global _enabled, _memory
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget all recorded sections and counters"""
+    with _lock:
+        _sections.clear()
+        _counters.clear()
+
+
+def snapshot():
+    """Recorded sections (slowest total first) and counters as plain dicts"""
+    with _lock:
+        sections = {name: dict(s) for name, s in _sections.items()}
+        counters = dict(_counters)
+    for s in sections.values():
+        s['mean_seconds'] = s['total_seconds'] / s['count']
+    ordered = dict(sorted(sections.items(), key=lambda item: -item[1]['total_seconds']))
+    return {'sections': ordered, 'counters': counters}
+
+
+def prometheus_text(prefix='distribution_testing'):
+    """Metrics in the Prometheus text exposition format"""
+    snap = snapshot()
+    lines = [
+        f"# HELP {prefix}_section_seconds Wall-clock time spent in instrumented sections.",
+        f"# TYPE {prefix}_section_seconds summary",
+    ]
+    for name, s in snap['sections'].items():
+        lines.append(f'{prefix}_section_seconds_sum{{section="{name}"}} {s["total_seconds"]:.9g}')
+        lines.append(f'{prefix}_section_seconds_count{{section="{name}"}} {s["count"]}')
+    lines += [f"# HELP {prefix}_section_max_seconds Slowest single call of each section.",
+              f"# TYPE {prefix}_section_max_seconds gauge"]
+    for name, s in snap['sections'].items():
+        lines.append(f'{prefix}_section_max_seconds{{section="{name}"}} {s["max_seconds"]:.9g}')
+    peaks = {name: s['peak_bytes'] for name, s in snap['sections'].items() if s['peak_bytes'] is not None}
+    if peaks:
+        lines += [f"# HELP {prefix}_section_peak_bytes Largest tracemalloc peak of each section.",
+                  f"# TYPE {prefix}_section_peak_bytes gauge"]
+        lines += [f'{prefix}_section_peak_bytes{{section="{name}"}} {peak}' for name, peak in peaks.items()]
+    if snap['counters']:
+        lines += [f"# HELP {prefix}_events_total Instrumentation counters.",
+                  f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {value}'
+                  for name, value in snap['counters'].items()]
+    return "\n".join(lines) + "\n"
+
+
+def write(path):
+    """Write the metrics to `path`: Prometheus text for *.prom, JSON otherwise"""
+    # Write then rename, so a collector never reads a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        if path.endswith('.prom'):
+            f.write(prometheus_text())
+        else:
+            json.dump(snapshot(), f, indent=2)
+    os.replace(tmp, path)
+
+
+def print_report(file=None):
+    """Print the sections as a table, slowest total first"""
+    snap = snapshot()
+    print(f"{'Section':<28}{'Calls':>8}{'Total s':>11}{'Mean ms':>11}{'Max ms':>11}{'Peak MiB':>10}",
+          file=file)
+    print("-" * 79, file=file)
+    for name, s in snap['sections'].items():
+        peak = f"{s['peak_bytes'] / 2**20:10.1f}" if s['peak_bytes'] is not None else f"{'':>10}"
+        print(f"{name:<28}{s['count']:>8}{s['total_seconds']:>11.4f}"
+              f"{s['mean_seconds'] * 1e3:>11.3f}{s['max_seconds'] * 1e3:>11.3f}{peak}", file=file)
+    for name, value in snap['counters'].items():
+        print(f"{name:<28}{value:>8}", file=file)
+
+
+_env = os.environ.get('DISTRIBUTION_TESTING_PROFILE', '').lower()
+if _env and _env not in ('0', 'false', 'no'):
+    enable(memory=(_env == 'memory'))
+if os.environ.get('DISTRIBUTION_TESTING_METRICS_FILE'):
+    atexit.register(write, os.environ['DISTRIBUTION_TESTING_METRICS_FILE'])
@@ -0,0 +1,75 @@
+# =============================================================================
+# KOLMOGOROV-SMIRNOV TEST - Did the PATTERN (continuous distribution) change?
+# =============================================================================
+
+import numpy as np
+from scipy.stats import ks_2samp
+
+from .discrete import discrete_counts, discrete_ks_2samp
+from .distances import count_distances, ks_distances, sketch_distances
+from .instrumentation import timed
+from .plotting import plot_ks_test
+from .sketches import DEFAULT_K, KLLSketch, as_sketch, sketch_ks_2samp
+
+
+def ecdf(data):
+    """Compute ECDF"""
+    x = np.sort(data)
+    y = np.arange(1, len(data)+1) / len(data)
+    return x, y
+
+
+def perform_ks_test(dist1, dist2, title="", alpha=0.05, plot=False, verbose=False,
+                    method='exact', sketch_k=DEFAULT_K, distances=False):
+    """Perform KS test; optionally print the result and plot the distributions
+
+    method='sketch' (implied when either input is a KLLSketch) compares KLL
+    sketches instead of sorting both samples; see sketches.py for the error
+    bound. method='discrete' counts tied / low-cardinality samples without
+    sorting and gives tie-aware p-values (see discrete.py); samples with too
+    many distinct values fall back to the exact test.
+
+    distances=True also returns {'wasserstein', 'energy'} (distances.py),
+    taken from the same sorted samples, counts or sketches as the test:
+    (statistic, p_value, distances).
+    """
+    if method == 'sketch' or isinstance(dist1, KLLSketch) or isinstance(dist2, KLLSketch):
+        if plot:
+            raise ValueError("plot=True needs the raw samples, not sketches")
+        sketch1, sketch2 = as_sketch(dist1, sketch_k), as_sketch(dist2, sketch_k)
+        with timed('ks.sketch_ks'):
+            ks_statistic, p_value, error_bound = sketch_ks_2samp(sketch1, sketch2)
+        distance = sketch_distances(sketch1, sketch2) if distances else None
+    else:
+        counted = [discrete_counts(dist1), discrete_counts(dist2)] if method == 'discrete' else [None]
+        if all(c is not None for c in counted):
+            ks_statistic, p_value = discrete_ks_2samp(*counted)
+            distance = count_distances(*counted) if distances else None
+        elif distances:
+            ks_statistic, p_value, distance = ks_distances(dist1, dist2)
+        else:
+            with timed('ks.ks_2samp'):
+                ks_statistic, p_value = ks_2samp(dist1, dist2)
+            distance = None
+        error_bound = None
+
+    if plot:
+        with timed('ks.plot'):
+            plot_ks_test(dist1, dist2, title, ks_statistic, p_value)
+
+    if verbose:
+        print(f"{title}")
+        print(f"KS Statistic: {ks_statistic:.4f}" +
+              (f" (sketch, +/- {error_bound:.4f})" if error_bound is not None else ""))
+        print(f"P-value: {p_value:.4f}")
+        if distance is not None:
+            print(f"Wasserstein-1: {distance['wasserstein']:.4f}   Energy distance: {distance['energy']:.4f}")
+        if p_value < alpha:
+            print("Conclusion: Distributions are SIGNIFICANTLY different (reject H0)")
+        else:
+            print("Conclusion: No significant evidence that distributions differ (fail to reject H0)")
+        print("-" * 60)
+
+    if distances:
+        return ks_statistic, p_value, distance
+    return ks_statistic, p_value
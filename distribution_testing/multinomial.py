@@ -0,0 +1,142 @@
+# =============================================================================
+# EXACT MULTINOMIAL TEST - Goodness of fit without the chi-square approximation
+# =============================================================================
+#
+# Chi-square p-values assume expected counts of about 5 or more. For small n
+# the exact multinomial test sums the probability, under the expected
+# proportions p, of every table of counts that is at least as extreme as
+# the observed one:
+#   statistic='prob'  tables no more likely than the observed one
+#   statistic='chi2'  tables with Pearson's X**2 at least the observed one
+#
+# How many tables? A table is a composition a_1 + ... + a_k = n, and by stars
+# and bars (combinatorics.py) there are C(n + k - 1, k - 1) of them:
+# 4060 for n = 27 over k = 4, but ~1e13 for n = 100 over k = 10.
+#
+# SEARCH WITH PRUNING. Tables are built one category at a time (depth-first
+# with an explicit stack of at most k (n + 1) pending prefixes, so any k
+# works; the last free category is vectorized). A prefix a_1 .. a_j
+# has a closed-form MARGINAL probability: the multinomial with categories
+# j+1 .. k lumped into one. Every table below the prefix is then known to
+# count without visiting it when
+#   'prob'  the prefix's marginal probability is already <= P(observed):
+#           no completion can be more likely than its whole subtree,
+#   'chi2'  the prefix's partial X**2 is already >= the observed X**2:
+#           the remaining terms only add to it,
+# and the whole subtree adds its marginal probability in O(1).
+#
+# When there are more than `max_compositions` tables, the p-value is
+# estimated by Monte-Carlo instead: `n_resamples` multinomial draws, with
+# the (hits + 1) / (draws + 1) estimate.
+
+import numpy as np
+
+from .combinatorics import log_factorials, stars_and_bars
+from .instrumentation import count, timed
+from .random_streams import DEFAULT_SEED, make_rng
+
+MAX_COMPOSITIONS = 2_000_000
+MONTE_CARLO_BLOCK = 10_000
+# Relative tolerance for tables exactly as extreme as the observed one
+TIE_TOLERANCE = 1e-7
+
+
+def _pearson(counts, expected):
+    return np.sum((counts - expected) ** 2 / expected, axis=-1)
+
+
+def _log_pmf(counts, n, log_p, log_factorial):
+    return log_factorial[n] - log_factorial[counts].sum(axis=-1) + (counts * log_p).sum(axis=-1)
+
+
+def _exact(n, log_p, expected, log_factorial, statistic, observed_stat):
+    k = len(log_p)
+    # log of the probability mass of categories j .. k-1, lumped together
+    tail = np.log(np.maximum(np.cumsum(np.exp(log_p)[::-1])[::-1], np.finfo(float).tiny))
+    tail = np.append(tail, -np.inf)
+    if statistic == 'prob':
+        limit = observed_stat + np.log1p(TIE_TOLERANCE)
+    else:
+        limit = observed_stat * (1 - TIE_TOLERANCE)
+    total = 0.0
+    visited = 0
+    # Depth-first over prefixes with an explicit stack (k can exceed the
+    # recursion limit): categories j .. k-1 share the remaining r counts
+    stack = [(0, n, 0.0, 0.0)]
+    while stack:
+        j, r, log_marginal, partial = stack.pop()
+        visited += 1
+        a = np.arange(r + 1)
+        rest = r - a
+        log_child = (log_marginal - r * tail[j] + log_factorial[r] - log_factorial[a] - log_factorial[rest]
+                     + a * log_p[j] + np.where(rest > 0, rest * tail[j + 1], 0.0))
+        child = partial + (a - expected[j]) ** 2 / expected[j]
+        if j == k - 2:
+            # The last category takes the rest: the children are full tables
+            if statistic == 'prob':
+                total += np.exp(log_child[log_child <= limit]).sum()
+            else:
+                child += (rest - expected[k - 1]) ** 2 / expected[k - 1]
+                total += np.exp(log_child[child >= limit]).sum()
+            continue
+        done = log_child <= limit if statistic == 'prob' else child >= limit
+        total += np.exp(log_child[done]).sum()
+        for value in np.flatnonzero(~done)[::-1]:
+            stack.append((j + 1, r - value, log_child[value], child[value]))
+
+    count('multinomial.nodes', visited)
+    return float(min(1.0, total))
+
+
+def _monte_carlo(n, p, expected, log_factorial, statistic, observed_stat, n_resamples, seed):
+    rng = make_rng(seed)
+    log_p = np.log(p)
+    hits = 0
+    for start in range(0, n_resamples, MONTE_CARLO_BLOCK):
+        draws = rng.multinomial(n, p, size=min(MONTE_CARLO_BLOCK, n_resamples - start))
+        if statistic == 'prob':
+            hits += int(np.sum(_log_pmf(draws, n, log_p, log_factorial)
+                               <= observed_stat + np.log1p(TIE_TOLERANCE)))
+        else:
+            hits += int(np.sum(_pearson(draws, expected) >= observed_stat * (1 - TIE_TOLERANCE)))
+    return (hits + 1) / (n_resamples + 1)
+
+
+@timed('multinomial.test')
+def exact_multinomial_test(observed, proportions, statistic='prob', max_compositions=MAX_COMPOSITIONS,
+                           n_resamples=99_999, seed=DEFAULT_SEED):
+    """Exact multinomial goodness-of-fit test of `observed` counts against `proportions`
+
+    Exact (pruned enumeration of the compositions of n) when n has at most
+    `max_compositions` compositions into the categories, Monte-Carlo
+    otherwise. Returns {'statistic', 'p_value', 'method', 'n_compositions'}
+    (and 'n_resamples' for Monte-Carlo); the statistic is the observed
+    table's log-probability ('prob') or Pearson X**2 ('chi2').
+    """
+    if statistic not in ('prob', 'chi2'):
+        raise ValueError(f"Unknown statistic: {statistic!r}; use 'prob' or 'chi2'")
+    observed = np.asarray(observed, dtype=np.int64)
+    p = np.asarray(proportions, dtype=np.float64)
+    p = p / p.sum()
+    if np.any(observed[p == 0] > 0):
+        # A count in an impossible category
+        return {'statistic': np.inf if statistic == 'chi2' else -np.inf, 'p_value': 0.0,
+                'method': 'exact', 'n_compositions': 0}
+    observed, p = observed[p > 0], p[p > 0]
+    n, k = int(observed.sum()), len(p)
+    expected = n * p
+    log_factorial = log_factorials(n)
+    if statistic == 'prob':
+        observed_stat = float(_log_pmf(observed, n, np.log(p), log_factorial))
+    else:
+        observed_stat = float(_pearson(observed, expected))
+
+    n_compositions = stars_and_bars(n, k)
+    result = {'statistic': observed_stat, 'n_compositions': n_compositions}
+    if k < 2 or n == 0:
+        return {**result, 'p_value': 1.0, 'method': 'exact'}
+    if n_compositions <= max_compositions:
+        p_value = _exact(n, np.log(p), expected, log_factorial, statistic, observed_stat)
+        return {**result, 'p_value': p_value, 'method': 'exact'}
+    p_value = _monte_carlo(n, p, expected, log_factorial, statistic, observed_stat, n_resamples, seed)
+    return {**result, 'p_value': p_value, 'method': 'monte-carlo', 'n_resamples': n_resamples}
@@ -0,0 +1,77 @@
+# =============================================================================
+# PLOTTING - matplotlib is only imported on first use
+# =============================================================================
+#
+# Importing matplotlib (and seaborn) costs seconds and may open a GUI backend.
+# The computation modules never import it; they call these helpers only when
+# a caller asks for a plot.
+
+import numpy as np
+
+_pyplot = None
+
+
+def pyplot():
+    """matplotlib.pyplot, imported on first call"""
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib.pyplot as plt
+        _pyplot = plt
+    return _pyplot
+
+
+def plot_ks_test(dist1, dist2, title, ks_statistic, p_value):
+    """Histograms and ECDFs of two samples"""
+    from .ks import ecdf
+    plt = pyplot()
+
+    plt.figure(figsize=(10, 6))
+
+    plt.subplot(1, 2, 1)
+    plt.hist(dist1, bins=30, alpha=0.7, label='Distribution 1', density=True)
+    plt.hist(dist2, bins=30, alpha=0.7, label='Distribution 2', density=True)
+    plt.title(f'Histograms\n{title}')
+    plt.legend()
+
+    plt.subplot(1, 2, 2)
+    x1, y1 = ecdf(dist1)
+    x2, y2 = ecdf(dist2)
+    plt.plot(x1, y1, label='Distribution 1 ECDF')
+    plt.plot(x2, y2, label='Distribution 2 ECDF')
+    plt.title(f'ECDF Comparison\nKS Stat: {ks_statistic:.4f}, p-value: {p_value:.4f}')
+    plt.legend()
+
+    plt.tight_layout()
+    plt.show()
+
+
+def plot_chi2_test(observed1, observed2, categories, title, chi2_stat, p_value, expected):
+    """Category frequencies of both groups and observed vs expected for group 1"""
+    plt = pyplot()
+
+    plt.figure(figsize=(12, 5))
+
+    plt.subplot(1, 2, 1)
+    x_pos = np.arange(len(categories))
+    width = 0.35
+
+    plt.bar(x_pos - width/2, observed1, width, label='Group 1', alpha=0.7)
+    plt.bar(x_pos + width/2, observed2, width, label='Group 2', alpha=0.7)
+    plt.xlabel('Categories')
+    plt.ylabel('Frequency')
+    plt.title(f'Category Frequencies\n{title}')
+    plt.xticks(x_pos, categories)
+    plt.legend()
+
+    plt.subplot(1, 2, 2)
+    # Expected vs observed for group 1
+    plt.bar(x_pos - width/2, observed1, width, label='Observed', alpha=0.7)
+    plt.bar(x_pos + width/2, expected[0], width, label='Expected', alpha=0.7)
+    plt.xlabel('Categories')
+    plt.ylabel('Frequency')
+    plt.title(f'Observed vs Expected (Group 1)\nχ²: {chi2_stat:.4f}, p-value: {p_value:.4f}')
+    plt.xticks(x_pos, categories)
+    plt.legend()
+
+    plt.tight_layout()
+    plt.show()
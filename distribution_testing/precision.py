@@ -0,0 +1,50 @@
+# =============================================================================
+# REDUCED PRECISION - float32 data, integer category codes, float64 sums
+# =============================================================================
+#
+# Most of the time and memory of a large drift check or bootstrap goes into
+# the DATA: sorting it, copying it, holding (replicates x rows) weight
+# matrices. Passing `dtype=np.float32` to the drift, divergence and
+# evaluation functions keeps those arrays in 4 bytes per value, and
+# categorical columns become integer codes (one joint np.unique instead of
+# sorting strings per sample). Precision is spent only where it matters:
+#   - KS statistics are ratios of integer ranks, p-values come from SciPy in
+#     float64,
+#   - log sums (KL, JS) are accumulated in float64 (np.sum(..., dtype=float64)),
+#   - bootstrap class totals and cumulative sums over the sorted scores are
+#     float64; per tie-group counts stay in float32, where integers are exact
+#     below 2**24.
+# What float32 does change is the DATA: values closer than one float32 ulp
+# (~6e-8 relative) become ties. validation.py measures the effect against
+# float64 runs and states the tolerances.
+
+import numpy as np
+
+FLOAT_DTYPES = ('float32', 'float64')
+
+
+def resolve_dtype(dtype):
+    """np.dtype for a `dtype=` option (None is float64); only float32/64 are accepted"""
+    dtype = np.dtype(np.float64 if dtype is None else dtype)
+    if dtype.name not in FLOAT_DTYPES:
+        raise ValueError(f"unsupported dtype {dtype.name!r}; use one of {FLOAT_DTYPES}")
+    return dtype
+
+
+def as_values(values, dtype=None):
+    """Continuous values as a float array of `dtype` (strings are parsed)"""
+    return np.asarray(values).astype(resolve_dtype(dtype), copy=False)
+
+
+def code_dtype(n_categories):
+    """Smallest signed integer type that holds codes 0 .. n_categories - 1"""
+    return np.min_scalar_type(-max(n_categories, 1))
+
+
+def category_codes(*samples):
+    """Sorted categories of all samples and each sample as integer codes into them"""
+    lengths = [len(s) for s in samples]
+    categories, inverse = np.unique(np.concatenate([np.asarray(s) for s in samples]),
+                                    return_inverse=True)
+    inverse = inverse.astype(code_dtype(len(categories)))
+    return categories, np.split(inverse, np.cumsum(lengths)[:-1])
@@ -0,0 +1,291 @@
+# =============================================================================
+# REFERENCE PROFILES - Compare many windows against one reference at once
+# =============================================================================
+#
+# A profile is everything the drift tests need from a reference sample,
+# computed once:
+#   continuous    sorted values (KS) and histogram bin edges + counts (JS)
+#   categorical   sorted category labels and counts (Chi-square, JS)
+#
+# compare_windows() evaluates a BATCH of windows against one profile with
+# one call per feature instead of one test per window:
+#   KS     all windows sorted together by (window, value), one searchsorted
+#          of every window value into the reference, and per-window maxima
+#          with np.maximum.reduceat,
+#   Chi2   one 2-D bincount of (window, category) and the Chi-square sum
+#          (with Yates' correction for 2x2 tables, as chi2_contingency) over
+#          the whole (windows x categories) matrix,
+#   JS     jensenshannon over the (windows x bins) histogram matrix,
+#   PSI    from the same histogram matrix, with its per-bin contributions.
+# window_histograms() bins MANY features x MANY windows on the profile's
+# cached bins (one bincount per feature), and population_stability() scores
+# the whole (features x windows) PSI matrix in one vectorized call.
+# KS p-values use the asymptotic distribution (ks_2samp method='asymp').
+# A profile built with dtype=np.float32 keeps its sorted reference values in
+# float32, and windows are compared in the same precision.
+
+import numpy as np
+from scipy.stats import chi2, kstwo
+
+from .divergence import js_divergence, psi
+from .drift import category_counts
+from .instrumentation import timed
+from .precision import resolve_dtype
+
+DEFAULT_BINS = 20
+
+
+def category_labels(values):
+    """Category values as strings; integral floats lose their '.0'"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        values = values[~np.isnan(values)]
+        if np.all(values == np.round(values)):
+            values = values.astype(np.int64)
+    return values.astype(str)
+
+
+@timed('profiles.build')
+def build_profile(columns, feature_types, bins=DEFAULT_BINS, dtype=None):
+    """Reference profile from {feature: values} (categorical may be (categories, counts))"""
+    dtype = resolve_dtype(dtype)
+    features = {}
+    for (name, values), f_type in zip(columns.items(), feature_types):
+        if f_type == 'categorical':
+            cats, counts = values if isinstance(values, tuple) else category_counts(category_labels(values))
+            cats, counts = category_counts_of_labels(cats, counts)
+            features[name] = {'type': f_type, 'categories': cats, 'counts': counts}
+        else:
+            values = np.asarray(values, dtype=dtype)
+            ref_sorted = np.sort(values[~np.isnan(values)])
+            edges = np.histogram_bin_edges(ref_sorted, bins=bins).astype(dtype)
+            features[name] = {'type': f_type, 'sorted': ref_sorted, 'edges': edges,
+                              'hist': np.histogram(ref_sorted, edges)[0]}
+        if _profile_size(features[name]) == 0:
+            raise ValueError(f"reference feature '{name}' has no values")
+    return {'features': features}
+
+
+def category_counts_of_labels(cats, counts):
+    """(labels, counts) with labels as strings, merging labels that coincide"""
+    labels = category_labels(cats)
+    uniq, inverse = np.unique(labels, return_inverse=True)
+    return uniq, np.bincount(inverse, weights=counts, minlength=len(uniq)).astype(np.int64)
+
+
+def _profile_size(feature):
+    return len(feature['sorted']) if feature['type'] == 'continuous' else int(feature['counts'].sum())
+
+
+def _segments(windows):
+    """Concatenated window values, window ids and window lengths"""
+    lengths = np.array([len(w) for w in windows])
+    values = np.concatenate(windows)
+    seg = np.repeat(np.arange(len(windows)), lengths)
+    return values, seg, lengths
+
+
+def _bin_counts(values, seg, n_windows, edges):
+    """(windows x bins) histogram counts; values outside the edges go to the end bins"""
+    n_bins = len(edges) - 1
+    codes = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, n_bins - 1)
+    return np.bincount(seg * n_bins + codes, minlength=n_windows * n_bins).reshape(n_windows, n_bins)
+
+
+@timed('profiles.batch_ks')
+def batch_ks(ref_sorted, windows):
+    """Two-sample KS statistic and p-value of every window against one sorted reference"""
+    values, seg, lengths = _segments(windows)
+    order = np.lexsort((values, seg))
+    values, seg = values[order], seg[order]
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    # Window ECDF at each value (right limit) and just before it (left limit):
+    # positions of the first / last copy of each (window, value) run
+    pos = np.arange(len(values))
+    new_run = np.ones(len(values), dtype=bool)
+    new_run[1:] = (values[1:] != values[:-1]) | (seg[1:] != seg[:-1])
+    run_id = np.cumsum(new_run) - 1
+    run_first = pos[new_run]
+    run_last = np.append(run_first[1:], len(values)) - 1
+    m = lengths[seg]
+    f_left = (run_first[run_id] - starts[seg]) / m
+    f_right = (run_last[run_id] - starts[seg] + 1) / m
+
+    n = len(ref_sorted)
+    g_left = np.searchsorted(ref_sorted, values, side='left') / n
+    g_right = np.searchsorted(ref_sorted, values, side='right') / n
+
+    # Between window values the window ECDF is flat while the reference ECDF
+    # rises, so the supremum is reached at a left or right limit
+    gaps = np.maximum(np.abs(g_right - f_right), np.abs(g_left - f_left))
+    # Empty windows have no ECDF (NaN), and reduceat needs increasing starts
+    filled = lengths > 0
+    statistic, p_value = np.full(len(windows), np.nan), np.full(len(windows), np.nan)
+    if filled.any():
+        statistic[filled] = np.maximum.reduceat(gaps, starts[filled])
+        m = lengths[filled]
+        p_value[filled] = kstwo.sf(statistic[filled], np.round(n * m / (n + m)))
+    return statistic, p_value
+
+
+def _category_matrix(ref_cats, ref_counts, windows):
+    """Reference counts and (windows x categories) counts over all categories seen"""
+    return _category_table(ref_cats, ref_counts, windows)[1:]
+
+
+def _category_table(ref_cats, ref_counts, windows):
+    """(all categories, reference counts, (windows x categories) counts)"""
+    values, seg, _ = _segments(windows)
+    cats = np.union1d(ref_cats, values)
+    n_cats, n_windows = len(cats), len(windows)
+    observed = np.bincount(seg * n_cats + np.searchsorted(cats, values),
+                           minlength=n_windows * n_cats).reshape(n_windows, n_cats)
+    ref = np.zeros(n_cats)
+    ref[np.searchsorted(cats, ref_cats)] = ref_counts
+    return cats, ref, observed.astype(np.float64)
+
+
+@timed('profiles.batch_chi2')
+def batch_chi2(ref_cats, ref_counts, windows):
+    """Chi-square statistic, p-value and dof of every window against one reference
+
+    Matches chi2_contingency on the 2 x categories table of the reference and
+    each window, over the categories present in either.
+    """
+    return _chi2_rows(*_category_matrix(ref_cats, ref_counts, windows))
+
+
+def _chi2_rows(ref, observed):
+    n_windows = len(observed)
+    ref = np.broadcast_to(ref, observed.shape)
+
+    col_total = ref + observed
+    present = col_total > 0
+    n_ref, n_win = ref.sum(axis=1, keepdims=True), observed.sum(axis=1, keepdims=True)
+    total = n_ref + n_win
+    dof = present.sum(axis=1) - 1
+
+    statistic = np.zeros(n_windows)
+    yates = (dof == 1)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for row, n_row in ((ref, n_ref), (observed, n_win)):
+            expected = np.where(present, n_row * col_total / total, 1.0)
+            diff = expected - row
+            # Yates' continuity correction for 2x2 tables
+            row = np.where(yates, row + np.sign(diff) * np.minimum(0.5, np.abs(diff)), row)
+            statistic += np.where(present, (row - expected) ** 2 / expected, 0.0).sum(axis=1)
+
+    p_value = np.where(dof > 0, chi2.sf(statistic, np.maximum(dof, 1)), 1.0)
+    statistic = np.where(dof > 0, statistic, 0.0)
+    # Empty windows have no table to test
+    empty = n_win[:, 0] == 0
+    statistic[empty], p_value[empty] = np.nan, np.nan
+    return statistic, p_value, dof
+
+
+def batch_js(ref_counts, window_counts):
+    """JS divergence (distance) of each row of window_counts from ref_counts"""
+    return js_divergence(ref_counts[None, :], window_counts, axis=1)
+
+
+def batch_psi(ref_counts, window_counts, contributions=False):
+    """PSI of each row of window_counts against ref_counts (optionally with per-bin terms)"""
+    return psi(ref_counts[None, :], window_counts, axis=1, contributions=contributions)
+
+
+@timed('profiles.window_histograms')
+def window_histograms(profile, windows):
+    """Histograms of every profile feature, reference and windows, on the profile's bins
+
+    `windows` is a list of {feature: values}. Returns (names, reference,
+    counts, bins): reference is (features x bins), counts is
+    (features x windows x bins), and bins[f] labels feature f's columns
+    (histogram edges, or categories including ones new in the windows).
+    Rows are zero-padded to the widest feature; windows without a feature
+    get zero counts.
+    """
+    names = [name for name in profile['features'] if any(name in w for w in windows)]
+    rows = []
+    for name in names:
+        feature = profile['features'][name]
+        idx = [i for i, w in enumerate(windows) if name in w]
+        if feature['type'] == 'continuous':
+            values = [np.asarray(windows[i][name], dtype=feature['sorted'].dtype) for i in idx]
+            flat, seg, _ = _segments([v[~np.isnan(v)] for v in values])
+            ref, observed = feature['hist'], _bin_counts(flat, seg, len(idx), feature['edges'])
+            bins = feature['edges']
+        else:
+            bins, ref, observed = _category_table(feature['categories'], feature['counts'],
+                                                  [category_labels(windows[i][name]) for i in idx])
+        rows.append((ref, idx, observed, bins))
+
+    width = max((len(ref) for ref, _, _, _ in rows), default=0)
+    reference = np.zeros((len(rows), width))
+    counts = np.zeros((len(rows), len(windows), width))
+    for f, (ref, idx, observed, _) in enumerate(rows):
+        reference[f, :len(ref)] = ref
+        counts[f, idx, :observed.shape[1]] = observed
+    return names, reference, counts, [row[3] for row in rows]
+
+
+@timed('profiles.population_stability')
+def population_stability(profile, windows, eps=None):
+    """PSI of every feature in every window against the profile, in one call
+
+    Returns (names, psi (features x windows), contributions
+    (features x windows x bins)); see window_histograms for the bin layout.
+    Windows without a feature get NaN.
+    """
+    names, reference, counts, _ = window_histograms(profile, windows)
+    kwargs = {} if eps is None else {'eps': eps}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values, terms = psi(reference[:, None, :], counts, axis=2, contributions=True, **kwargs)
+    empty = counts.sum(axis=2) == 0
+    values[empty] = np.nan
+    terms[empty] = np.nan
+    return names, values, terms
+
+
+@timed('profiles.compare_windows')
+def compare_windows(profile, windows, alpha=0.05):
+    """Drift rows for each window: KS or Chi-square plus JS divergence and PSI per feature
+
+    `windows` is a list of {feature: values}; a window may hold any subset of
+    the profile's features, and empty values give NaN results (no drift).
+    Returns one list of rows per window.
+    """
+    alphas = np.broadcast_to(alpha, len(windows))
+    reports = [[] for _ in windows]
+    for name, feature in profile['features'].items():
+        idx = [i for i, w in enumerate(windows) if name in w]
+        if not idx:
+            continue
+        if feature['type'] == 'continuous':
+            values = [np.asarray(windows[i][name], dtype=feature['sorted'].dtype) for i in idx]
+            values = [v[~np.isnan(v)] for v in values]
+            statistic, p_value = batch_ks(feature['sorted'], values)
+            flat, seg, _ = _segments(values)
+            ref, observed = feature['hist'], _bin_counts(flat, seg, len(values), feature['edges'])
+            test = "KS"
+        else:
+            values = [category_labels(windows[i][name]) for i in idx]
+            ref, observed = _category_matrix(feature['categories'], feature['counts'], values)
+            statistic, p_value, _ = _chi2_rows(ref, observed)
+            test = "Chi2"
+        with np.errstate(invalid='ignore', divide='ignore'):
+            js, stability = batch_js(ref, observed), batch_psi(ref, observed)
+        # Empty windows: NaN statistic, p-value and divergences, never drift
+        empty = observed.sum(axis=1) == 0
+        js, stability = np.where(empty, np.nan, js), np.where(empty, np.nan, stability)
+        for j, i in enumerate(idx):
+            reports[i].append({
+                'feature': name,
+                'test': test,
+                'statistic': float(statistic[j]),
+                'p_value': float(p_value[j]),
+                'drift': bool(p_value[j] < alphas[i]),
+                'js_divergence': float(js[j]),
+                'psi': float(stability[j]),
+            })
+    return reports
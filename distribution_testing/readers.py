@@ -0,0 +1,124 @@
+# =============================================================================
+# READERS - Stream selected columns of a data file in row chunks
+# =============================================================================
+#
+# Supported inputs:
+#   .csv       header row + comma separated values, parsed by one csv.reader
+#              over a buffered file in chunks of `chunk_rows` rows (quoted
+#              fields may contain newlines)
+#   .npy       2-D array, memory-mapped; columns follow the schema order
+#   .parquet   row-group batches via pyarrow (optional dependency)
+#
+# Only the requested columns are materialized, one row chunk at a time, so
+# the memory used by a reader is about chunk_rows x len(columns) values.
+# Missing values (empty CSV fields, NaN, Parquet nulls) are dropped per column.
+
+import csv
+import itertools
+import os
+
+import numpy as np
+
+from .instrumentation import timed
+
+CHUNK_ROWS = 100_000
+
+
+def file_format(path):
+    """'csv', 'npy' or 'parquet', from the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    formats = {'.csv': 'csv', '.npy': 'npy', '.parquet': 'parquet', '.pq': 'parquet'}
+    if ext not in formats:
+        raise ValueError(f"{path}: unsupported file type '{ext}' (use .csv, .npy or .parquet)")
+    return formats[ext]
+
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("reading Parquet files needs pyarrow (pip install pyarrow)") from None
+    return pq
+
+
+def _drop_missing(values, categorical):
+    if not categorical:
+        values = np.asarray(values, dtype=np.float64)
+        return values[~np.isnan(values)]
+    if values.dtype == object:
+        values = values.astype(str)
+    if values.dtype.kind == 'U':
+        return values[values != '']
+    if values.dtype.kind == 'f':
+        return values[~np.isnan(values)]
+    return values
+
+
+def _csv_chunks(path, columns, categorical, chunk_rows):
+    with open(path, newline='', encoding='utf-8', buffering=1 << 20) as f:
+        # One reader over the whole file: a quoted field may span lines, so
+        # chunks are cut on parsed rows, never on physical lines
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise KeyError(f"{path}: columns not found: {', '.join(missing)}")
+        usecols = [header.index(c) for c in columns]
+        while True:
+            with timed('readers.csv_read'):
+                rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                return
+            # Read as text so empty fields survive; numeric columns are
+            # converted after the missing values are replaced by NaN
+            with timed('readers.csv_parse'):
+                rows = [row for row in rows if row]  # blank lines
+                try:
+                    table = [np.array([row[i] for row in rows], dtype=str) for i in usecols]
+                except IndexError:
+                    raise ValueError(f"{path}: a row before line {reader.line_num} has fewer than "
+                                     f"{max(usecols) + 1} fields") from None
+            chunk = {}
+            for j, (name, is_cat) in enumerate(zip(columns, categorical)):
+                col = table[j]
+                if not is_cat:
+                    col = np.where(col == '', 'nan', col).astype(np.float64)
+                chunk[name] = _drop_missing(col, is_cat)
+            yield chunk
+
+
+def _npy_chunks(path, columns, categorical, chunk_rows, schema_columns):
+    data = np.load(path, mmap_mode='r')
+    if data.ndim != 2 or data.shape[1] != len(schema_columns):
+        raise ValueError(f"{path}: expected a 2-D array with {len(schema_columns)} columns "
+                         f"(one per schema feature), got shape {data.shape}")
+    index = [schema_columns.index(c) for c in columns]
+    for start in range(0, data.shape[0], chunk_rows):
+        block = np.asarray(data[start:start + chunk_rows][:, index])
+        yield {name: _drop_missing(block[:, j], is_cat)
+               for j, (name, is_cat) in enumerate(zip(columns, categorical))}
+
+
+def _parquet_chunks(path, columns, categorical, chunk_rows):
+    pq = _pyarrow_parquet()
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=list(columns)):
+        chunk = {}
+        for name, is_cat in zip(columns, categorical):
+            col = batch.column(name).drop_null().to_numpy(zero_copy_only=False)
+            chunk[name] = _drop_missing(col, is_cat)
+        yield chunk
+
+
+def iter_column_chunks(path, columns, categorical, chunk_rows=CHUNK_ROWS, schema_columns=None):
+    """Yield {column: 1-D array} for successive row chunks of `path`
+
+    `categorical` flags which columns are kept as labels; the others are read
+    as float64. `schema_columns` names the columns of a headerless .npy file.
+    """
+    fmt = file_format(path)
+    if fmt == 'csv':
+        return _csv_chunks(path, columns, categorical, chunk_rows)
+    if fmt == 'npy':
+        return _npy_chunks(path, columns, categorical, chunk_rows, list(schema_columns or columns))
+    return _parquet_chunks(path, columns, categorical, chunk_rows)
@@ -0,0 +1,122 @@
+# =============================================================================
+# TIERED SCREENING - Cheap divergence screen first, exact tests only if needed
+# =============================================================================
+#
+# With tens of thousands of features per run and nearly all of them stable,
+# running ks_2samp / chi2_contingency on every column wastes most of the
+# time. screened_drift_report() works in two stages against a reference
+# profile (profiles.build_profile, built once and reused):
+#
+#   1. SCREEN  every feature is binned on the profile's cached bins (histogram
+#              edges, or categories) with one bincount
+#              (profiles.window_histograms), and the JS distances - or PSI,
+#              measure='psi' - of ALL features come from one batched call on
+#              the (features x bins) matrix. O(rows) per feature, no sort.
+#   2. TEST    only features whose screen score is at least `threshold` get
+#              the exact test (compare_feature: KS on the profile's sorted
+#              reference values; Chi-square on its category counts).
+#
+# Features below the threshold are reported with test 'screened', their
+# screen score and p_value NaN; they are never flagged as drift. The screen
+# trades sensitivity for speed: a shift too small to move the binned score
+# past the threshold goes untested, so pick the threshold from the scores of
+# known-stable runs (threshold=0 tests everything).
+#
+# The returned `accounting` says how much work the screen saved: features
+# and rows that skipped the exact test, and the time spent in each stage.
+# The same numbers go to the 'screening.*' instrumentation counters.
+
+import time
+
+import numpy as np
+
+from .divergence import js_divergence, psi
+from .drift import _result, compare_category_counts, compare_feature
+from .instrumentation import count, timed
+from .profiles import category_labels, window_histograms
+
+# Screen scores at or above which a feature is tested: JS distance (natural
+# log, as scipy's jensenshannon), or PSI. For small shifts PSI ~ 8 JS**2, so
+# both flag about the same features, well below PSI's 0.1 "moderate shift"
+DEFAULT_THRESHOLDS = {'js': 0.05, 'psi': 0.02}
+
+
+def _current_values(feature, values):
+    if feature['type'] == 'continuous':
+        values = np.asarray(values, dtype=feature['sorted'].dtype)
+        return values[~np.isnan(values)]
+    return category_labels(values)
+
+
+def screen_scores(reference, current, measure='js'):
+    """Screen score of every row of `current` against the same row of `reference`"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if measure == 'js':
+            scores = js_divergence(reference, current, axis=1)
+        elif measure == 'psi':
+            scores = psi(reference, current, axis=1)
+        else:
+            raise ValueError(f"Unknown screen measure: {measure!r}; use 'js' or 'psi'")
+    # An empty current column cannot be screened out
+    return np.where(current.sum(axis=1) > 0, scores, np.inf)
+
+
+@timed('screening.report')
+def screened_drift_report(profile, columns, threshold=None, alpha=0.05, ks_method='exact',
+                          measure='js'):
+    """Two-stage drift report of {feature: values} against a reference profile
+
+    Returns (report, accounting). Every row carries its 'screen' score (JS
+    distance, or PSI with measure='psi'); features below `threshold`
+    (default DEFAULT_THRESHOLDS[measure]) have test 'screened' and are not
+    tested.
+    """
+    threshold = DEFAULT_THRESHOLDS[measure] if threshold is None else threshold
+    start = time.perf_counter()
+    names, reference, counts, _ = window_histograms(profile, [columns])
+    scores = screen_scores(reference, counts[:, 0], measure)
+    sizes = counts[:, 0].sum(axis=1).astype(np.int64)
+    screen_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report, rows_tested = [], 0
+    for name, score, size in zip(names, scores, sizes):
+        feature = profile['features'][name]
+        score = float(score)
+        if score < threshold:
+            result = _result("screened", score, np.nan, alpha)
+            report.append({'feature': name, **result, 'screen': score})
+            continue
+        rows_tested += size
+        values = _current_values(feature, columns[name])
+        if feature['type'] == 'continuous':
+            result = compare_feature(feature['sorted'], values, 'continuous', alpha, ks_method)
+        else:
+            result = compare_category_counts((feature['categories'], feature['counts']),
+                                             np.unique(values, return_counts=True), alpha)
+        report.append({'feature': name, **result, 'screen': score})
+    test_seconds = time.perf_counter() - start
+
+    n_tested = sum(row['test'] != "screened" for row in report)
+    rows_total = int(sizes.sum())
+    accounting = {
+        'features': len(report),
+        'tested': n_tested,
+        'skipped': len(report) - n_tested,
+        'rows': rows_total,
+        'rows_skipped': int(rows_total - rows_tested),
+        'screen_seconds': screen_seconds,
+        'test_seconds': test_seconds,
+    }
+    count('screening.features_tested', n_tested)
+    count('screening.features_skipped', accounting['skipped'])
+    count('screening.rows_skipped', accounting['rows_skipped'])
+    return report, accounting
+
+
+def print_screening(accounting):
+    """Print how much exact-test work the screen skipped"""
+    share = accounting['skipped'] / max(accounting['features'], 1)
+    print(f"Screened {accounting['features']} features in {accounting['screen_seconds']:.3f}s: "
+          f"{accounting['tested']} tested ({accounting['test_seconds']:.3f}s), "
+          f"{accounting['skipped']} skipped ({share:.1%}, {accounting['rows_skipped']} rows)")
@@ -0,0 +1,164 @@
+# =============================================================================
+# SEGMENT DRIFT - Drift per segment (country x device) in one pass
+# =============================================================================
+#
+# Calling detect_data_drift once per segment filters and re-sorts the full
+# columns for every segment. segment_drift_report() codes the segment keys
+# once and then, per feature:
+#   continuous   ONE sort by (segment, value) of both samples together;
+#                within-segment ECDFs are cumulative counts minus the counts
+#                of the earlier segments, and np.maximum.reduceat takes every
+#                segment's KS statistic,
+#   categorical  ONE 2-D bincount of (segment, category) codes per sample,
+#                and the Chi-square statistics of all segments at once
+#                (with Yates' correction for 2x2 tables, as chi2_contingency).
+# KS p-values use the asymptotic distribution (ks_2samp method='asymp'), as
+# the batched tests in profiles.py. Segments present in only one of the two
+# samples cannot be tested and are left out of the report.
+
+import numpy as np
+from scipy.stats import kstwo
+
+from .instrumentation import timed
+from .precision import as_values, category_codes, code_dtype
+from .profiles import _chi2_rows
+
+
+def _key_columns(keys):
+    if isinstance(keys, (list, tuple)):
+        return [np.asarray(column) for column in keys]
+    keys = np.asarray(keys)
+    return [keys] if keys.ndim == 1 else [keys[:, j] for j in range(keys.shape[1])]
+
+
+@timed('segments.codes')
+def segment_codes(train_keys, current_keys):
+    """Segment keys and joint integer segment codes of both samples
+
+    Keys are one array, an (n, n_keys) array or a list of key columns, e.g.
+    [country, device]. Returns (keys, train_codes, current_codes), where
+    keys[code] is the segment's key (a tuple with several key columns).
+    """
+    train_columns, current_columns = _key_columns(train_keys), _key_columns(current_keys)
+    n_train = len(train_columns[0])
+    columns = [np.concatenate([t, c]) for t, c in zip(train_columns, current_columns)]
+    if len(columns) == 1:
+        keys, combined = np.unique(columns[0], return_inverse=True)
+        keys = keys.tolist()
+    else:
+        combined, radix = np.zeros(len(columns[0]), dtype=np.int64), 1
+        for column in columns:
+            cats, codes = np.unique(column, return_inverse=True)
+            if radix * len(cats) >= 2**62:
+                # Compact the mixed-radix code so far so it cannot overflow
+                _, combined = np.unique(combined, return_inverse=True)
+                radix = int(combined.max()) + 1
+            combined = combined * len(cats) + codes
+            radix *= len(cats)
+        _, first, combined = np.unique(combined, return_index=True, return_inverse=True)
+        keys = list(zip(*(column[first].tolist() for column in columns)))
+    combined = combined.astype(code_dtype(len(keys)))
+    return keys, combined[:n_train], combined[n_train:]
+
+
+@timed('segments.ks')
+def segment_ks(train_values, train_codes, current_values, current_codes, n_segments):
+    """Two-sample KS statistic and p-value of every segment (NaN if a side is empty)"""
+    values = np.concatenate([train_values, current_values])
+    seg = np.concatenate([train_codes, current_codes])
+    is_current = np.r_[np.zeros(len(train_values), dtype=bool), np.ones(len(current_values), dtype=bool)]
+    # Sort by value, then stably by segment: a radix sort for small segment codes
+    order = np.argsort(values, kind='stable')
+    order = order[np.argsort(seg[order], kind='stable')]
+    values, seg, is_current = values[order], seg[order], is_current[order]
+
+    n_train = np.bincount(train_codes, minlength=n_segments)
+    n_current = np.bincount(current_codes, minlength=n_segments)
+    # Running counts within each segment: all earlier segments come first
+    cum_current = np.cumsum(is_current) - (np.cumsum(n_current) - n_current)[seg]
+    cum_train = np.arange(1, len(values) + 1) - (np.cumsum(n_train + n_current) - n_train - n_current)[seg]
+    cum_train -= cum_current
+
+    # Both ECDFs are only compared after the last copy of each (segment, value)
+    last = np.r_[(values[1:] != values[:-1]) | (seg[1:] != seg[:-1]), True]
+    seg = seg[last]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gaps = np.abs(cum_train[last] / n_train[seg] - cum_current[last] / n_current[seg])
+    statistic = np.full(n_segments, np.nan)
+    present = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+    statistic[seg[present]] = np.maximum.reduceat(gaps, present)
+
+    testable = (n_train > 0) & (n_current > 0)
+    statistic[~testable] = np.nan
+    p_value = np.full(n_segments, np.nan)
+    n_eff = np.round(n_train[testable] * n_current[testable] / (n_train[testable] + n_current[testable]))
+    p_value[testable] = kstwo.sf(statistic[testable], n_eff)
+    return statistic, p_value
+
+
+@timed('segments.chi2')
+def segment_chi2(train_values, train_codes, current_values, current_codes, n_segments):
+    """Chi-square statistic, p-value and dof of every segment over its categories"""
+    categories, (train_cats, current_cats) = category_codes(train_values, current_values)
+    n_cats = len(categories)
+    train = np.bincount(train_codes.astype(np.int64) * n_cats + train_cats,
+                        minlength=n_segments * n_cats).reshape(n_segments, n_cats)
+    current = np.bincount(current_codes.astype(np.int64) * n_cats + current_cats,
+                          minlength=n_segments * n_cats).reshape(n_segments, n_cats)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        statistic, p_value, dof = _chi2_rows(train.astype(np.float64), current.astype(np.float64))
+    testable = (train.sum(axis=1) > 0) & (current.sum(axis=1) > 0)
+    return np.where(testable, statistic, np.nan), np.where(testable, p_value, np.nan), dof
+
+
+@timed('segments.report')
+def segment_drift_report(train_data, current_data, train_segments, current_segments,
+                         feature_names, feature_types, alpha=0.05, dtype=None):
+    """Drift results of every feature in every segment as a list of dicts
+
+    `train_segments` / `current_segments` hold the segment key(s) of each row
+    (see segment_codes). Rows are ordered by segment, then feature.
+    """
+    keys, train_codes, current_codes = segment_codes(train_segments, current_segments)
+    n_segments = len(keys)
+    n_train = np.bincount(train_codes, minlength=n_segments)
+    n_current = np.bincount(current_codes, minlength=n_segments)
+
+    results = []
+    for i, f_type in enumerate(feature_types):
+        train_feature, current_feature = train_data[:, i], current_data[:, i]
+        if f_type == 'continuous':
+            statistic, p_value = segment_ks(as_values(train_feature, dtype), train_codes,
+                                            as_values(current_feature, dtype), current_codes,
+                                            n_segments)
+            results.append(("KS", statistic, p_value))
+        else:
+            statistic, p_value, _ = segment_chi2(train_feature, train_codes, current_feature,
+                                                 current_codes, n_segments)
+            results.append(("Chi2", statistic, p_value))
+
+    report = []
+    for s in np.flatnonzero((n_train > 0) & (n_current > 0)):
+        for feature, (test, statistic, p_value) in zip(feature_names, results):
+            report.append({
+                'segment': keys[s],
+                'feature': feature,
+                'test': test,
+                'statistic': float(statistic[s]),
+                'p_value': float(p_value[s]),
+                'drift': bool(p_value[s] < alpha),
+                'n_reference': int(n_train[s]),
+                'n_current': int(n_current[s]),
+            })
+    return report
+
+
+def detect_segment_drift(train_data, current_data, train_segments, current_segments,
+                         feature_names, feature_types, alpha=0.05, dtype=None):
+    """{segment: [features with drift]} for the segments where any feature drifted"""
+    drifted = {}
+    for row in segment_drift_report(train_data, current_data, train_segments, current_segments,
+                                    feature_names, feature_types, alpha, dtype):
+        if row['drift']:
+            drifted.setdefault(row['segment'], []).append(row['feature'])
+    return drifted
@@ -0,0 +1,165 @@
+# =============================================================================
+# SEQUENTIAL A/B TESTS - Always-valid p-values: look every day, stop early
+# =============================================================================
+#
+# The t-test and Chi-square test are FIXED-HORIZON: their p-values are only
+# valid at the one sample size planned in advance. Checking them every day
+# and stopping at the first p < 0.05 inflates false positives far above 5%.
+#
+# mSPRT (mixture sequential probability ratio test; Robbins 1970, Johari et
+# al. 2017 "Always valid inference"). With the effect estimate D (treatment
+# minus control), its variance V = s_c**2 / n_c + s_t**2 / n_t, and a normal
+# mixture N(null, tau**2) over the true effect, the likelihood ratio is
+#
+#   L = sqrt(V / (V + tau**2)) * exp(tau**2 (D - null)**2 / (2 V (V + tau**2)))
+#
+# Under H0, L is a martingale, so P(L ever exceeds 1/alpha) <= alpha. Hence
+#   always-valid p-value   p = min over all looks of 1 / L (never increases),
+#   confidence sequence   D +/- sqrt(V (V + tau**2) / tau**2 *
+#                                    (2 ln(1/alpha) + ln((V + tau**2) / V)))
+#                         (intersected over looks),
+# both valid at ANY stopping time: look after every batch and stop as soon as
+# p < alpha, without inflating the false-positive rate.
+#
+# `tau` is the size of effect you expect, in the metric's units (e.g. $5 of
+# revenue, 0.01 of conversion rate): the test detects effects near tau
+# fastest. Variances are the running sample variances (normal approximation),
+# so give every arm a few dozen observations before trusting a rejection.
+#
+# State is O(1): each arm keeps (n, mean, M2) - merged batch by batch with
+# Chan's parallel update - or (trials, successes); the test keeps its running
+# p-value and confidence bounds. Nothing is stored per observation.
+
+import numpy as np
+
+from .instrumentation import timed
+
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations of a stream, updated per batch"""
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values):
+            self.merge(RunningMoments(len(values), values.mean(), np.square(values - values.mean()).sum()))
+        return self
+
+    def merge(self, other):
+        """Combine with the moments of another batch (Chan et al.)"""
+        n = self.n + other.n
+        if other.n:
+            delta = other.mean - self.mean
+            self.mean += delta * other.n / n
+            self.m2 += other.m2 + delta * delta * self.n * other.n / n
+            self.n = n
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+
+class SequentialTest:
+    """Running mSPRT of an effect estimate; subclasses supply effect() and variance()"""
+
+    def __init__(self, tau, alpha=0.05, null=0.0):
+        if tau <= 0:
+            raise ValueError("tau must be positive")
+        self.tau, self.alpha, self.null = tau, alpha, null
+        self.p_value, self.lower, self.upper, self.looks = 1.0, -np.inf, np.inf, 0
+
+    def _look(self):
+        effect, variance = self.effect(), self.variance()
+        if not np.isfinite(variance) or variance <= 0:
+            return
+        self.looks += 1
+        tau2 = self.tau ** 2
+        log_ratio = (0.5 * np.log(variance / (variance + tau2)) +
+                     tau2 * (effect - self.null) ** 2 / (2 * variance * (variance + tau2)))
+        self.p_value = min(self.p_value, float(np.exp(min(-log_ratio, 0.0))))
+        half_width = np.sqrt(variance * (variance + tau2) / tau2 *
+                             (2 * np.log(1 / self.alpha) + np.log((variance + tau2) / variance)))
+        self.lower = max(self.lower, float(effect - half_width))
+        self.upper = min(self.upper, float(effect + half_width))
+
+    def result(self):
+        """Current state: effect, always-valid p-value, confidence sequence, decision"""
+        return {
+            'n_control': self.sizes()[0],
+            'n_treatment': self.sizes()[1],
+            'effect': float(self.effect()),
+            'p_value': self.p_value,
+            'lower': self.lower,
+            'upper': self.upper,
+            'reject': self.p_value < self.alpha,
+            'looks': self.looks,
+        }
+
+
+class SequentialMeanTest(SequentialTest):
+    """Always-valid test of mean(treatment) - mean(control), fed in batches"""
+
+    def __init__(self, tau, alpha=0.05, null=0.0):
+        super().__init__(tau, alpha, null)
+        self.control, self.treatment = RunningMoments(), RunningMoments()
+
+    @timed('sequential.mean_update')
+    def update(self, control=(), treatment=()):
+        """Add a batch of observations to either arm, then look at the data"""
+        self.control.update(control)
+        self.treatment.update(treatment)
+        self._look()
+        return self.result()
+
+    def sizes(self):
+        return self.control.n, self.treatment.n
+
+    def effect(self):
+        return self.treatment.mean - self.control.mean
+
+    def variance(self):
+        if self.control.n < 2 or self.treatment.n < 2:
+            return np.nan
+        return self.control.variance / self.control.n + self.treatment.variance / self.treatment.n
+
+
+class SequentialProportionTest(SequentialTest):
+    """Always-valid test of rate(treatment) - rate(control), fed with batch counts"""
+
+    def __init__(self, tau, alpha=0.05, null=0.0):
+        super().__init__(tau, alpha, null)
+        self.trials, self.successes = np.zeros(2, dtype=np.int64), np.zeros(2, dtype=np.int64)
+
+    @timed('sequential.proportion_update')
+    def update(self, control_successes=0, control_trials=0, treatment_successes=0, treatment_trials=0):
+        """Add a batch of (successes, trials) to each arm, then look at the data"""
+        batch = np.asarray([(control_successes, treatment_successes), (control_trials, treatment_trials)])
+        counts = batch.astype(np.int64)
+        if np.any(counts != batch):
+            raise ValueError("successes and trials must be whole numbers")
+        successes, trials = counts
+        if np.any(successes < 0) or np.any(successes > trials):
+            raise ValueError("need 0 <= successes <= trials in each arm")
+        self.successes += successes
+        self.trials += trials
+        self._look()
+        return self.result()
+
+    def sizes(self):
+        return int(self.trials[0]), int(self.trials[1])
+
+    def _rates(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.successes / self.trials
+
+    def effect(self):
+        rates = self._rates()
+        return rates[1] - rates[0]
+
+    def variance(self):
+        rates = self._rates()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return float(np.sum(rates * (1 - rates) / self.trials))
@@ -0,0 +1,321 @@
+# =============================================================================
+# DRIFT SERVICE - Long-running local drift checks over HTTP
+# =============================================================================
+#
+#   python -m distribution_testing serve --schema schema.json --reference baseline=ref.csv
+#
+# Endpoints (JSON in and out; there is no authentication, so serve() refuses
+# anything but a loopback address or a Unix socket):
+#   GET  /health
+#   GET  /references                 reference names and their feature types
+#   POST /references/<name>          {"features": {"age": "continuous", ...},
+#                                     "data": {"age": [...], ...}}
+#   POST /drift/<name>               {"data": {"age": [...], ...}, "alpha": 0.05}
+#   GET  /metrics                    latency percentiles per endpoint, batch sizes
+#
+# How a drift request is served:
+#   - reference PROFILES (profiles.py) are built once and stay in memory, in
+#     the server and in every worker process (set by _init_worker),
+#   - the event loop only parses requests; the tests, and the profile of a
+#     POSTed reference, run on a ProcessPoolExecutor, so a slow test or a
+#     large reference never blocks other connections,
+#   - requests for the same reference that arrive within `batch_window`
+#     seconds, or while that reference's previous batch is running, are
+#     evaluated together in ONE compare_windows call,
+#   - every response carries its queue / compute / total latency, and
+#     /metrics summarizes the recent requests.
+
+import asyncio
+import collections
+import ipaddress
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+import numpy as np
+
+from .profiles import DEFAULT_BINS, build_profile, category_labels, compare_windows
+
+_worker_state = {}
+
+MAX_BODY_BYTES = 256 * 2**20
+LATENCY_HISTORY = 10_000
+# Forked workers would inherit the client sockets open at the first submit
+# (the pool starts its processes lazily, inside the event loop), and those
+# connections would never see EOF: start workers from a clean process
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def check_bind_address(host, unix_path=None):
+    """Refuse anything but a loopback address: the service has no authentication"""
+    if unix_path or host == 'localhost':
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(f"refusing to bind to {host!r}: the drift service has no authentication; "
+                         "use a loopback address or --unix")
+
+
+def _init_worker(profiles):
+    _worker_state['profiles'] = profiles
+
+
+def _evaluate_batch(name, windows, alphas):
+    """Worker task: one vectorized comparison of a batch of windows"""
+    t0 = time.perf_counter()
+    reports = compare_windows(_worker_state['profiles'][name], windows, alphas)
+    return reports, time.perf_counter() - t0
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _latency_summary(values):
+    if not values:
+        return {'count': 0}
+    ms = np.array(values) * 1e3
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {'count': len(ms), 'mean_ms': float(ms.mean()), 'p50_ms': float(p50),
+            'p90_ms': float(p90), 'p99_ms': float(p99), 'max_ms': float(ms.max())}
+
+
+class DriftService:
+    """Reference profiles, the worker pool, per-reference batching and metrics"""
+
+    def __init__(self, workers=None, batch_window=0.002, max_batch=64, dtype=None):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.dtype = dtype
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.profiles = {}
+        self._pool = None
+        self._pending = collections.defaultdict(list)
+        self._batchers = {}
+        self._latency = collections.defaultdict(lambda: collections.deque(maxlen=LATENCY_HISTORY))
+        self._batch_sizes = collections.deque(maxlen=LATENCY_HISTORY)
+
+    # -------------------------------------------------------------------------
+    # references and the worker pool
+    # -------------------------------------------------------------------------
+
+    def add_reference(self, name, columns, feature_types):
+        """Build and register a profile; workers are restarted to hold it"""
+        self._register(name, build_profile(columns, feature_types, dtype=self.dtype))
+
+    async def add_reference_async(self, name, columns, feature_types):
+        """add_reference with the profile (a sort of every column) built off the event loop"""
+        loop = asyncio.get_running_loop()
+        profile = await loop.run_in_executor(self._pool, build_profile, columns, feature_types,
+                                             DEFAULT_BINS, self.dtype)
+        self._register(name, profile)
+
+    def _register(self, name, profile):
+        self.profiles[name] = profile
+        self._restart_pool()
+
+    def _restart_pool(self):
+        old = self._pool
+        if self.workers > 0:
+            # Running batches finish on the old pool; new ones see every profile
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context(START_METHOD),
+                                             initializer=_init_worker, initargs=(dict(self.profiles),))
+        else:
+            _init_worker(self.profiles)
+            self._pool = None  # evaluate on the event loop's default thread pool
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    # -------------------------------------------------------------------------
+    # batching
+    # -------------------------------------------------------------------------
+
+    async def check(self, name, window, alpha=0.05):
+        """Drift rows for one window, batched with concurrent windows for `name`"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[name].append((window, alpha, future, time.perf_counter()))
+        if name not in self._batchers:
+            self._batchers[name] = asyncio.create_task(self._run_batches(name))
+        return await future
+
+    async def _run_batches(self, name):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending[name]:
+                await asyncio.sleep(self.batch_window)
+                batch = self._pending[name][:self.max_batch]
+                del self._pending[name][:len(batch)]
+                windows = [w for w, _, _, _ in batch]
+                alphas = [a for _, a, _, _ in batch]
+                started = time.perf_counter()
+                try:
+                    reports, compute = await loop.run_in_executor(
+                        self._pool, _evaluate_batch, name, windows, alphas)
+                except Exception as error:
+                    for _, _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                self._batch_sizes.append(len(batch))
+                for (_, _, future, received), report in zip(batch, reports):
+                    if not future.done():
+                        future.set_result({
+                            'features': report,
+                            'drift': any(row['drift'] for row in report),
+                            'batch_size': len(batch),
+                            'latency_ms': {'queue': (started - received) * 1e3,
+                                           'compute': compute * 1e3},
+                        })
+        finally:
+            del self._batchers[name]
+
+    # -------------------------------------------------------------------------
+    # request handling
+    # -------------------------------------------------------------------------
+
+    def _parse_window(self, name, data):
+        """{feature: array} for the features of reference `name` in `data`"""
+        if name not in self.profiles:
+            raise HTTPError(404, f"unknown reference '{name}'")
+        if not isinstance(data, dict) or not data:
+            raise HTTPError(400, "expected {\"data\": {\"feature\": [values, ...], ...}}")
+        features = self.profiles[name]['features']
+        unknown = [f for f in data if f not in features]
+        if unknown:
+            raise HTTPError(400, f"features not in reference '{name}': {', '.join(unknown)}")
+        window = {}
+        for feature, values in data.items():
+            if features[feature]['type'] == 'categorical':
+                values = category_labels(values)
+            else:
+                values = np.asarray(values, dtype=np.float64)
+                values = values[~np.isnan(values)]
+            if len(values) == 0:
+                raise HTTPError(400, f"feature '{feature}' has no values")
+            window[feature] = values
+        return window
+
+    async def dispatch(self, method, path, body):
+        """(status, payload) for one request"""
+        parts = [unquote(p) for p in path.split('?')[0].strip('/').split('/')]
+        if method == 'GET' and parts == ['health']:
+            return 200, {'status': 'ok', 'references': len(self.profiles)}
+        if method == 'GET' and parts == ['metrics']:
+            return 200, self.metrics()
+        if method == 'GET' and parts == ['references']:
+            return 200, {name: {f: spec['type'] for f, spec in profile['features'].items()}
+                         for name, profile in self.profiles.items()}
+        if len(parts) == 2 and parts[0] in ('references', 'drift'):
+            if method != 'POST':
+                raise HTTPError(405, f"use POST /{parts[0]}/<name>")
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError as error:
+                raise HTTPError(400, f"invalid JSON: {error}") from None
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "expected a JSON object")
+            if parts[0] == 'references':
+                types = payload.get('features')
+                data = payload.get('data')
+                if not isinstance(types, dict) or not isinstance(data, dict) or set(types) != set(data):
+                    raise HTTPError(400, "expected {\"features\": {name: type}, \"data\": {name: [values]}}")
+                try:
+                    await self.add_reference_async(parts[1], {f: data[f] for f in types},
+                                                   list(types.values()))
+                except ValueError as error:
+                    raise HTTPError(400, str(error)) from None
+                return 201, {'reference': parts[1], 'features': types}
+            window = self._parse_window(parts[1], payload.get('data'))
+            alpha = float(payload.get('alpha', 0.05))
+            return 200, await self.check(parts[1], window, alpha)
+        raise HTTPError(404, f"no route for {method} {path}")
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP/1.1 request (Connection: close)"""
+        started = time.perf_counter()
+        route = 'invalid'
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            method, path, _ = request_line.split(' ', 2)
+            route = f"{method} /{path.strip('/').split('/')[0].split('?')[0]}"
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            if length > MAX_BODY_BYTES:
+                raise HTTPError(413, f"request body over {MAX_BODY_BYTES} bytes")
+            body = await reader.readexactly(length) if length else b''
+            status, payload = await self.dispatch(method, path, body)
+        except HTTPError as error:
+            status, payload = error.status, {'error': str(error)}
+        except (ValueError, asyncio.IncompleteReadError) as error:
+            status, payload = 400, {'error': f"malformed request: {error}"}
+        except Exception as error:
+            status, payload = 500, {'error': f"{type(error).__name__}: {error}"}
+
+        total = time.perf_counter() - started
+        self._latency[route].append(total)
+        if isinstance(payload.get('latency_ms'), dict):
+            payload['latency_ms']['total'] = total * 1e3
+        data = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1') + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def metrics(self):
+        """Latency percentiles per endpoint and batch size statistics"""
+        sizes = np.array(self._batch_sizes) if self._batch_sizes else np.zeros(1)
+        return {
+            'requests': {route: _latency_summary(list(values))
+                         for route, values in self._latency.items()},
+            'batches': {'count': len(self._batch_sizes), 'mean_size': float(sizes.mean()),
+                        'max_size': int(sizes.max())},
+            'references': sorted(self.profiles),
+            'workers': self.workers,
+        }
+
+
+async def serve(service, host='127.0.0.1', port=8765, unix_path=None, ready=None):
+    """Run the HTTP server until cancelled (loopback addresses only; no authentication)"""
+    check_bind_address(host, unix_path)
+    if service._pool is None:
+        service._restart_pool()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+        where = unix_path
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+    if ready is not None:
+        ready(where)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
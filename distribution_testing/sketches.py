@@ -0,0 +1,185 @@
+# =============================================================================
+# QUANTILE SKETCHES - Approximate KS for samples too large to sort
+# =============================================================================
+#
+# ks_2samp sorts both full samples. A KLL sketch (Karnin, Lang & Liberty,
+# 2016) summarizes a sample of any size in O(k log(n/k)) values:
+#   - level h holds sorted items of weight 2**h,
+#   - when a level exceeds its capacity it is COMPACTED: sorted, and every
+#     other item (random odd/even offset) moves up one level with double weight,
+#   - capacities shrink geometrically (factor 2/3) towards the lower levels.
+# Sketches of different partitions, days or hosts MERGE by concatenating
+# their levels and compacting again; the result is a sketch of the union.
+#
+# ERROR BOUND. A compaction at weight w changes the estimated rank of any
+# point x by -w, 0 or +w, with mean zero. The sketch tracks the sum of w**2
+# over all its compactions (`sq_error`), so by Hoeffding's inequality, for a
+# fixed x and with probability >= 1 - delta,
+#   |F_sketch(x) - F(x)| <= sqrt(2 ln(2 / delta) * sq_error) / n  = rank_error(delta).
+# The KS statistic of two sketches is exact for the two sketch CDFs, so
+#   |D_sketch - D| <= rank_error_1 + rank_error_2,
+# where each rank error is taken at delta / (2 m) (union bound over the m
+# retained points where the sketch CDF can change). With k = 200 the CDF
+# error of one sketch is typically ~0.01 and the guaranteed bound on D is
+# ~0.03-0.06, whatever n is; the error shrinks roughly as 1/k.
+#
+# Sketch noise can only make two samples look MORE different, and with
+# huge n even D = 0.01 is "significant". The p-value is therefore computed
+# at the smallest statistic consistent with the sketches, D - error_bound,
+# so that sketch error alone never signals drift.
+
+import numpy as np
+from scipy.stats import kstwo
+
+from .instrumentation import timed
+from .random_streams import DEFAULT_SEED, make_rng
+
+DEFAULT_K = 200
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch of a stream of floats"""
+
+    def __init__(self, k=DEFAULT_K, seed=DEFAULT_SEED):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.sq_error = 0.0
+        self._rng = make_rng(seed)
+        self._sorted = None
+
+    @classmethod
+    def from_values(cls, values, k=DEFAULT_K, seed=DEFAULT_SEED):
+        sketch = cls(k, seed)
+        sketch.update(values)
+        return sketch
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    @timed('sketch.update')
+    def update(self, values):
+        """Add a batch of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        self._sorted = None
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays behind at this level
+            keep = items[:len(items) % 2]
+            pairs = items[len(items) % 2:]
+            promoted = pairs[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            self.sq_error += float(4 ** level)
+            # Adding a level shrinks the capacities below it; start over
+            level = 0
+
+    @timed('sketch.merge')
+    def merge(self, other):
+        """Fold another sketch (same k) into this one"""
+        if other.k != self.k:
+            raise ValueError(f"cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.sq_error += other.sq_error
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """Retained items sorted, with cumulative weights"""
+        if self._sorted is None:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.levels)])
+            order = np.argsort(items, kind='stable')
+            self._sorted = items[order], np.cumsum(weights[order])
+        return self._sorted
+
+    def __len__(self):
+        """Number of retained items"""
+        return sum(len(v) for v in self.levels)
+
+    def cdf(self, x):
+        """Estimated P(X <= x)"""
+        items, cum_weight = self._weighted()
+        idx = np.searchsorted(items, x, side='right')
+        cum = np.concatenate([[0.0], cum_weight])
+        return cum[idx] / cum[-1]
+
+    def quantile(self, q):
+        """Estimated q-quantile(s)"""
+        items, cum_weight = self._weighted()
+        idx = np.searchsorted(cum_weight, np.asarray(q) * cum_weight[-1], side='left')
+        return items[np.minimum(idx, len(items) - 1)]
+
+    def rank_error(self, delta=0.01):
+        """Normalized rank error bound at one point, holding with probability 1 - delta"""
+        if self.n == 0:
+            return 0.0
+        return float(np.sqrt(2 * np.log(2 / delta) * self.sq_error) / self.n)
+
+    def to_dict(self):
+        """JSON-serializable state; restore with KLLSketch.from_dict"""
+        return {
+            'k': self.k,
+            'n': self.n,
+            'sq_error': self.sq_error,
+            'levels': [v.tolist() for v in self.levels],
+            'rng': self._rng.bit_generator.state,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['k'])
+        sketch.n = state['n']
+        sketch.sq_error = state['sq_error']
+        sketch.levels = [np.asarray(v, dtype=np.float64) for v in state['levels']]
+        sketch._rng.bit_generator.state = state['rng']
+        return sketch
+
+
+@timed('sketch.ks_2samp')
+def sketch_ks_2samp(sketch1, sketch2, delta=0.01):
+    """Approximate two-sample KS test from two sketches
+
+    Returns (statistic, p_value, error_bound): |statistic - exact D| <=
+    error_bound with probability >= 1 - delta. The p-value is the asymptotic
+    two-sample KS p-value of max(statistic - error_bound, 0).
+    """
+    items1, _ = sketch1._weighted()
+    items2, _ = sketch2._weighted()
+    # Both sketch CDFs are step functions that only change at retained items
+    points = np.union1d(items1, items2)
+    statistic = float(np.max(np.abs(sketch1.cdf(points) - sketch2.cdf(points))))
+
+    error_bound = (sketch1.rank_error(delta / (2 * max(len(items1), 1))) +
+                   sketch2.rank_error(delta / (2 * max(len(items2), 1))))
+    n1, n2 = sketch1.n, sketch2.n
+    p_value = float(kstwo.sf(max(statistic - error_bound, 0.0), np.round(n1 * n2 / (n1 + n2))))
+    return statistic, p_value, error_bound
+
+
+def as_sketch(values, k=DEFAULT_K, seed=DEFAULT_SEED):
+    """`values` if it is already a sketch, else a new sketch of them"""
+    if isinstance(values, KLLSketch):
+        return values
+    return KLLSketch.from_values(values, k, seed)
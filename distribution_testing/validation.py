@@ -0,0 +1,128 @@
+# =============================================================================
+# PRECISION VALIDATION - Do float32 runs agree with float64?
+# =============================================================================
+#
+#   python -m distribution_testing validate --dtype float32 -n 100000
+#
+# Runs the drift, divergence and evaluation kernels on the same synthetic
+# data in float64 and in the reduced precision, and checks the largest
+# difference of every result against TOLERANCES:
+#
+#   ks_statistic       |D32 - D64|; float32 can only merge values closer
+#                      than one ulp into ties, which moves D by k/n for k
+#                      merged pairs at the maximum (typically 0); p-values
+#                      are float64 functions of D
+#   chi2_statistic     relative; integer category codes count exactly
+#   kl, js             relative; float32 terms, float64 sums
+#   bootstrap_*        |metric32 - metric64| per replicate, with the SAME
+#                      per-sample resample counts in both runs
+#   delong_auc         |AUC32 - AUC64|; midranks are exact ranks
+#   delong_covariance  relative to the largest covariance entry
+#   roc_tpr_at_fpr     |TPR32 - TPR64| on a grid of FPR targets
+#
+# Note: bootstrap_metrics draws resample counts per SORTED position, so when
+# float32 merges two scores into a tie the two samples may swap counts. The
+# replicates then differ one by one (by ~1/n_pos), although their
+# distribution does not; the check above avoids that by fixing the counts.
+
+import numpy as np
+
+from .drift import compare_feature
+from .divergence import js_divergence, kl_divergence
+from .evaluation import at_fpr, delong_covariance, prepare_scores, roc_table, weighted_metrics
+from .precision import resolve_dtype
+from .random_streams import DEFAULT_SEED, spawn_rngs
+
+TOLERANCES = {
+    'ks_statistic': 1e-4,
+    'chi2_statistic': 1e-9,
+    'kl_divergence': 5e-5,
+    'js_divergence': 5e-5,
+    'bootstrap_roc_auc': 1e-5,
+    'bootstrap_pr_auc': 1e-5,
+    'bootstrap_f1': 1e-4,
+    'delong_auc': 1e-6,
+    'delong_covariance': 1e-4,
+    'roc_tpr_at_fpr': 1e-4,
+}
+
+
+def _relative(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return float(np.max(np.abs(a - b)) / max(np.max(np.abs(b)), np.finfo(float).tiny))
+
+
+def _absolute(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return float(np.nanmax(np.abs(a - b)))
+
+
+def _sample(n, rngs):
+    """Synthetic drift columns, class labels and two models' scores"""
+    data = {
+        'train': rngs[0].normal(0, 1, n),
+        'current': rngs[1].normal(0.01, 1.05, n),
+        'train_cat': rngs[2].choice(['A', 'B', 'C', 'D'], n, p=[0.4, 0.3, 0.2, 0.1]),
+        'current_cat': rngs[3].choice(['A', 'B', 'C', 'D'], n, p=[0.38, 0.32, 0.2, 0.1]),
+    }
+    y_true = rngs[4].random(n) < 0.3
+    score_a = 1 / (1 + np.exp(-rngs[4].normal(y_true * 1.5, 1.0)))
+    score_b = score_a + rngs[5].normal(0, 0.1, n)
+    return data, y_true, np.vstack([score_a, score_b])
+
+
+def validate_precision(dtype=np.float32, n=100_000, n_boot=20, seed=DEFAULT_SEED):
+    """Largest float64 vs `dtype` difference of every kernel, checked against TOLERANCES
+
+    Returns a list of {'check', 'error', 'tolerance', 'ok'} rows.
+    """
+    dtype = resolve_dtype(dtype)
+    rngs = spawn_rngs(seed, 7)
+    data, y_true, scores = _sample(n, rngs)
+    errors = {}
+
+    ks64 = compare_feature(data['train'], data['current'], 'continuous')
+    ks32 = compare_feature(data['train'], data['current'], 'continuous', dtype=dtype)
+    errors['ks_statistic'] = abs(ks32['statistic'] - ks64['statistic'])
+
+    chi64 = compare_feature(data['train_cat'], data['current_cat'], 'categorical')
+    chi32 = compare_feature(data['train_cat'], data['current_cat'], 'categorical', dtype=dtype)
+    errors['chi2_statistic'] = _relative(chi32['statistic'], chi64['statistic'])
+
+    edges = np.histogram_bin_edges(data['train'], bins=50)
+    p = np.histogram(data['train'], edges)[0] / n
+    q = np.histogram(data['current'], edges)[0] / n
+    errors['kl_divergence'] = _relative(kl_divergence(p, q, dtype=dtype), kl_divergence(p, q))
+    errors['js_divergence'] = _relative(js_divergence(p, q, dtype=dtype), js_divergence(p, q))
+
+    # The same resample count per SAMPLE, laid out in each precision's sorted order
+    counts = rngs[6].poisson(1.0, size=(n_boot, n))
+    runs = []
+    for precision in (np.float64, dtype):
+        prepared = prepare_scores(y_true, scores[0], precision)
+        order = np.argsort(scores[0].astype(precision), kind='mergesort')
+        runs.append(weighted_metrics(prepared, counts[:, order].astype(precision)))
+    for name in ('roc_auc', 'pr_auc', 'f1'):
+        errors[f'bootstrap_{name}'] = _absolute(runs[1][name], runs[0][name])
+
+    aucs64, cov64 = delong_covariance(y_true, scores)
+    aucs32, cov32 = delong_covariance(y_true, scores, dtype)
+    errors['delong_auc'] = _absolute(aucs32, aucs64)
+    errors['delong_covariance'] = _relative(cov32, cov64)
+
+    targets = np.linspace(0, 1, 101)
+    errors['roc_tpr_at_fpr'] = _absolute(at_fpr(roc_table(y_true, scores[0], dtype), targets)['tpr'],
+                                         at_fpr(roc_table(y_true, scores[0]), targets)['tpr'])
+
+    return [{'check': name, 'error': error, 'tolerance': TOLERANCES[name],
+             'ok': bool(error <= TOLERANCES[name])} for name, error in errors.items()]
+
+
+def print_validation(rows, dtype=np.float32):
+    """Print the validation rows as a table"""
+    print(f"{resolve_dtype(dtype).name} vs float64")
+    print("Check".ljust(22) + "Max error".rjust(12) + "Tolerance".rjust(12) + "  OK")
+    print("-" * 50)
+    for row in rows:
+        print(f"{row['check']:<22}{row['error']:>12.2e}{row['tolerance']:>12.0e}  "
+              f"{'yes' if row['ok'] else 'NO'}")
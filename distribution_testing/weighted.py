@@ -0,0 +1,150 @@
+# =============================================================================
+# WEIGHTED / PRE-AGGREGATED SAMPLES - (value, count) pairs without np.repeat
+# =============================================================================
+#
+# Telemetry often arrives aggregated: (value, count) pairs, or category
+# counts. Expanding them with np.repeat to call ks_2samp can mean billions
+# of elements. Here a sample is a pair (values, weights), and everything
+# works on the DISTINCT values:
+#   KS          weighted ECDFs: cumulative weights at the union of the
+#               distinct values of both samples, exactly the points where
+#               ks_2samp evaluates its ECDFs,
+#   Chi-square  the weighted contingency table over the union of categories,
+#   JS / KL     weighted histograms on shared bin edges.
+# Time and memory scale with the number of distinct values.
+#
+# With integer counts the results equal ks_2samp / chi2_contingency on the
+# expanded rows (for small samples, where ks_2samp would use its exact
+# p-value, the few rows are expanded and ks_2samp is called). For sampling
+# weights that are not frequencies, pass `n_effective` (e.g. Kish's
+# (sum w)**2 / sum w**2, see effective_size): the p-values then use that
+# sample size and chi-square rows are rescaled to it. Without it, samples of
+# non-integer weights use effective_size of the (aggregated) weights in both
+# tests, never their sum, which is meaningless for normalized weights.
+
+import numpy as np
+from scipy.stats import chi2_contingency, ks_2samp, kstwo
+
+from .divergence import js_divergence, kl_divergence
+from .drift import _result, align_counts
+from .instrumentation import timed
+
+# ks_2samp computes exact p-values when both samples have at most this many rows
+EXACT_MAX_N = 10_000
+
+
+def aggregate_counts(values, weights=None):
+    """(sorted distinct values, summed weights); zero weights are dropped"""
+    values = np.asarray(values)
+    weights = np.ones(len(values)) if weights is None else np.asarray(weights)
+    distinct, inverse = np.unique(values, return_inverse=True)
+    totals = np.bincount(inverse, weights=weights, minlength=len(distinct))
+    keep = totals > 0
+    return distinct[keep], totals[keep]
+
+
+def effective_size(weights):
+    """Kish effective sample size (sum w)**2 / sum w**2 of per-row sampling weights"""
+    weights = np.asarray(weights, dtype=np.float64)
+    return weights.sum() ** 2 / np.square(weights).sum()
+
+
+def _sample(sample):
+    values, weights = sample
+    values, weights = np.asarray(values), np.asarray(weights, dtype=np.float64)
+    if len(values) > 1 and np.any(values[1:] <= values[:-1]):
+        return aggregate_counts(values, weights)
+    return values, weights
+
+
+def weighted_ecdf(sample):
+    """(distinct values, ECDF at each value) of a (values, weights) sample"""
+    values, weights = _sample(sample)
+    cumulative = np.cumsum(weights)
+    return values, cumulative / cumulative[-1]
+
+
+def _is_counts(weights):
+    return bool(np.all(weights == np.round(weights)))
+
+
+@timed('weighted.ks_2samp')
+def weighted_ks_2samp(sample1, sample2, n_effective=None):
+    """Two-sample KS test of (values, weights) samples; returns (statistic, p_value)
+
+    Integer weights are row counts: same result as ks_2samp on the expanded
+    rows. Otherwise give `n_effective` = (n1, n2) for the p-value; without
+    it, a sample of non-integer weights counts as its effective_size.
+    """
+    values1, weights1 = _sample(sample1)
+    values2, weights2 = _sample(sample2)
+    if n_effective is not None:
+        n1, n2 = n_effective
+    else:
+        n1, n2 = (w.sum() if _is_counts(w) else effective_size(w) for w in (weights1, weights2))
+    if (n_effective is None and max(n1, n2) <= EXACT_MAX_N
+            and _is_counts(weights1) and _is_counts(weights2)):
+        # Small enough for ks_2samp's exact p-value: expanding costs nothing
+        statistic, p_value = ks_2samp(np.repeat(values1, weights1.astype(np.int64)),
+                                      np.repeat(values2, weights2.astype(np.int64)))[:2]
+        return float(statistic), float(p_value)
+
+    points = np.union1d(values1, values2)
+    cdf1 = np.r_[0.0, np.cumsum(weights1)][np.searchsorted(values1, points, side='right')] / weights1.sum()
+    cdf2 = np.r_[0.0, np.cumsum(weights2)][np.searchsorted(values2, points, side='right')] / weights2.sum()
+    statistic = float(np.max(np.abs(cdf1 - cdf2)))
+    p_value = float(kstwo.sf(statistic, max(1, np.round(n1 * n2 / (n1 + n2)))))
+    return statistic, p_value
+
+
+@timed('weighted.chi2')
+def weighted_chi2(sample1, sample2, n_effective=None):
+    """Chi-square test of two (categories, weights) samples; returns (statistic, p_value, dof)
+
+    Rows are rescaled to `n_effective` = (n1, n2) when given, else a sample
+    of non-integer weights is rescaled to its effective_size.
+    """
+    sample1, sample2 = _sample(sample1), _sample(sample2)
+    if n_effective is None:
+        n_effective = [w.sum() if _is_counts(w) else effective_size(w) for _, w in (sample1, sample2)]
+    _, counts1, counts2 = align_counts(sample1, sample2)
+    counts1 = counts1 * n_effective[0] / counts1.sum()
+    counts2 = counts2 * n_effective[1] / counts2.sum()
+    statistic, p_value, dof, _ = chi2_contingency(np.array([counts1, counts2]))
+    return statistic, p_value, dof
+
+
+def weighted_histograms(sample1, sample2, bins=20):
+    """Shared bin edges (`bins` equal-width bins over both samples) and each weighted histogram"""
+    values1, weights1 = _sample(sample1)
+    values2, weights2 = _sample(sample2)
+    edges = np.histogram_bin_edges(np.r_[values1[[0, -1]], values2[[0, -1]]], bins=bins)
+    return (edges, np.histogram(values1, edges, weights=weights1)[0],
+            np.histogram(values2, edges, weights=weights2)[0])
+
+
+def weighted_js_divergence(sample1, sample2, bins=20, categorical=False):
+    """JS divergence of two (values, weights) samples (histograms, or category counts)"""
+    if categorical:
+        _, h1, h2 = align_counts(_sample(sample1), _sample(sample2))
+    else:
+        _, h1, h2 = weighted_histograms(sample1, sample2, bins)
+    return js_divergence(h1, h2)
+
+
+def weighted_kl_divergence(sample1, sample2, bins=20, categorical=False):
+    """KL divergence of sample1 from sample2, on normalized histograms or category counts"""
+    if categorical:
+        _, h1, h2 = align_counts(_sample(sample1), _sample(sample2))
+    else:
+        _, h1, h2 = weighted_histograms(sample1, sample2, bins)
+    return kl_divergence(h1 / h1.sum(), h2 / h2.sum())
+
+
+def compare_weighted_feature(train, current, f_type, alpha=0.05, n_effective=None):
+    """Drift test for one feature given as (values, weights) pairs, as compare_feature"""
+    if f_type == 'continuous':
+        stat, p_val = weighted_ks_2samp(train, current, n_effective)
+        return _result("KS", stat, p_val, alpha)
+    stat, p_val, _ = weighted_chi2(train, current, n_effective)
+    return _result("Chi2", stat, p_val, alpha)
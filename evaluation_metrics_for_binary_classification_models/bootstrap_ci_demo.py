@@ -0,0 +1,32 @@
+# Bootstrap confidence intervals for ROC AUC, PR AUC and F1
+# (implementation: distribution_testing/evaluation/bootstrap.py)
+from distribution_testing.evaluation import bootstrap_ci
+from .roc_auc_demo import train_demo_model
+
+
+def main():
+    X_train, X_test, y_train, y_test, y_pred_proba = train_demo_model()
+
+    # Confidence intervals for the model from roc_auc_demo.py
+    # (F1 at the optimal threshold found in f1_demo.py)
+    intervals = bootstrap_ci(y_test, y_pred_proba, threshold=0.3, n_boot=1000,
+                             method='poisson', n_jobs=4, seed=42)
+
+    print("Bootstrap 95% Confidence Intervals (1000 resamples)")
+    print(f"{'Metric':<10} {'Estimate':<10} {'95% CI'}")
+    print("-" * 40)
+    for name, (estimate, lower, upper) in intervals.items():
+        print(f"{name:<10} {estimate:<10.4f} [{lower:.4f}, {upper:.4f}]")
+
+
+if __name__ == "__main__":
+    main()
+
+"""
+Bootstrap 95% Confidence Intervals (1000 resamples)
+Metric     Estimate   95% CI
+----------------------------------------
+roc_auc    0.9068     [0.8693, 0.9420]
+pr_auc     0.8300     [0.7533, 0.8899]
+f1         0.7802     [0.7134, 0.8442]
+"""
\ No newline at end of file
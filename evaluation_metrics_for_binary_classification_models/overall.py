@@ -1,3 +1,8 @@
+import numpy as np
+from sklearn.metrics import precision_recall_curve, roc_auc_score, confusion_matrix
+from .roc_auc_demo import train_demo_model
+
+
 def comprehensive_evaluation(y_true, y_pred_proba, model_name="Model"):
     """Comprehensive model evaluation with multiple metrics"""
     
@@ -44,8 +49,16 @@ def comprehensive_evaluation(y_true, y_pred_proba, model_name="Model"):
         'f1_score': f1
     }
 
-# Run comprehensive evaluation
-results = comprehensive_evaluation(y_test, y_pred_proba, "Logistic Regression")
+
+def main():
+    X_train, X_test, y_train, y_test, y_pred_proba = train_demo_model()
+
+    # Run comprehensive evaluation
+    results = comprehensive_evaluation(y_test, y_pred_proba, "Logistic Regression")
+
+
+if __name__ == "__main__":
+    main()
 
 """
 
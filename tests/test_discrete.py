@@ -0,0 +1,64 @@
+import itertools
+
+import numpy as np
+import pytest
+from scipy.stats import ks_2samp
+
+from distribution_testing.discrete import discrete_counts, discrete_ks_2samp, exact_tied_p_value
+
+
+def _brute_force_p_value(x, y):
+    """P(D >= observed D) over every split of the pooled sample into len(x) + len(y) rows"""
+    pooled = np.r_[x, y]
+    observed = ks_2samp(x, y).statistic
+    hits = total = 0
+    for rows in itertools.combinations(range(len(pooled)), len(x)):
+        in_x = np.zeros(len(pooled), dtype=bool)
+        in_x[list(rows)] = True
+        hits += ks_2samp(pooled[in_x], pooled[~in_x]).statistic >= observed - 1e-12
+        total += 1
+    return hits / total
+
+
+@pytest.mark.parametrize('n1, n2', [(7, 9), (30, 20), (200, 150), (400, 400)])
+def test_exact_matches_ks_2samp_without_ties(n1, n2):
+    rng = np.random.default_rng(n1 + n2)
+    x, y = rng.normal(size=n1), rng.normal(0.2, size=n2)
+    order = np.argsort(np.r_[x, y])
+    counts1 = (order < n1).astype(np.float64)
+    statistic = ks_2samp(x, y).statistic
+    expected = ks_2samp(x, y, method='exact').pvalue
+    assert exact_tied_p_value(statistic, counts1, 1 - counts1) == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_exact_matches_enumeration_with_ties(seed):
+    rng = np.random.default_rng(seed)
+    x, y = rng.integers(0, 3, 6), rng.integers(0, 4, 7)
+    statistic, p_value = discrete_ks_2samp(x, y, method='exact')
+    assert statistic == pytest.approx(ks_2samp(x, y).statistic)
+    assert p_value == pytest.approx(_brute_force_p_value(x, y), rel=1e-9)
+
+
+def test_auto_method():
+    rng = np.random.default_rng(0)
+    # No ties: ks_2samp itself
+    pooled = rng.permutation(60)
+    x, y = pooled[:25], pooled[25:]
+    assert discrete_ks_2samp(x, y)[1] == pytest.approx(ks_2samp(x, y).pvalue)
+    # Few distinct values: exact up to EXACT_MAX_WORK, asymptotic beyond
+    x, y = rng.integers(0, 10, 200_000), rng.integers(0, 10, 150_000)
+    assert discrete_ks_2samp(x, y) == discrete_ks_2samp(x, y, method='exact')
+    x, y = rng.integers(0, 10, 2_000_000), rng.integers(0, 10, 1_500_000)
+    assert discrete_ks_2samp(x, y) == discrete_ks_2samp(x, y, method='asymp')
+    # Many distinct values: asymptotic
+    x, y = rng.integers(0, 5_000, 20_000), rng.integers(0, 5_000, 20_000)
+    assert discrete_ks_2samp(x, y) == discrete_ks_2samp(x, y, method='asymp')
+
+
+def test_discrete_counts_on_a_decimal_grid():
+    prices = np.round(np.random.default_rng(1).uniform(0, 5, 10_000), 2)
+    values, counts = discrete_counts(prices)
+    expected_values, expected_counts = np.unique(prices, return_counts=True)
+    np.testing.assert_array_equal(values, expected_values)
+    np.testing.assert_array_equal(counts, expected_counts)
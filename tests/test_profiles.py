@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from scipy.stats import ks_2samp
+
+from distribution_testing.profiles import batch_ks, build_profile, compare_windows
+
+
+def test_batch_ks_skips_empty_windows():
+    rng = np.random.default_rng(0)
+    ref = np.sort(rng.normal(size=500))
+    windows = [rng.normal(size=50), np.array([]), rng.normal(1, size=30), np.array([])]
+    statistic, p_value = batch_ks(ref, windows)
+    for i in (0, 2):
+        expected = ks_2samp(ref, windows[i], method='asymp')
+        assert statistic[i] == pytest.approx(expected.statistic)
+        assert p_value[i] == pytest.approx(expected.pvalue)
+    assert np.isnan(statistic[[1, 3]]).all() and np.isnan(p_value[[1, 3]]).all()
+
+
+def test_compare_windows_empty_window_is_nan_not_drift():
+    rng = np.random.default_rng(1)
+    profile = build_profile({'age': rng.normal(size=500), 'region': rng.choice(['n', 'e', 's'], 500)},
+                            ['continuous', 'categorical'])
+    reports = compare_windows(profile, [{'age': rng.normal(size=50), 'region': ['n', 'e']},
+                                        {'age': [], 'region': []}])
+    assert all(np.isfinite(row['p_value']) for row in reports[0])
+    for row in reports[1]:
+        assert np.isnan(row['statistic']) and np.isnan(row['p_value']) and not row['drift']
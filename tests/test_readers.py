@@ -0,0 +1,14 @@
+import numpy as np
+
+from distribution_testing.readers import iter_column_chunks
+
+
+def test_csv_quoted_newlines_stay_in_one_row(tmp_path):
+    path = tmp_path / 'notes.csv'
+    path.write_text('id,note,x\n1,"multi\nline",2.5\n2,plain,\n\n3,"a,b",4\n', encoding='utf-8')
+    for chunk_rows in (1, 2, 100):
+        chunks = list(iter_column_chunks(str(path), ['note', 'x'], [True, False], chunk_rows))
+        notes = np.concatenate([c['note'] for c in chunks])
+        values = np.concatenate([c['x'] for c in chunks])
+        assert notes.tolist() == ['multi\nline', 'plain', 'a,b']
+        assert values.tolist() == [2.5, 4.0]
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import numpy as np
+
+from distribution_testing.service import DriftService, serve
+
+
+async def _request(port, method, path, payload=None):
+    """Raw HTTP/1.1 request; returns (status, payload) once the server closes the connection"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    # Read until EOF: a connection held open by a worker process would time out here
+    response = await asyncio.wait_for(reader.read(), timeout=10)
+    writer.close()
+    head, _, data = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(data)
+
+
+def test_responses_end_with_eof_when_workers_start():
+    rng = np.random.default_rng(0)
+    service = DriftService(workers=2, batch_window=0.0)
+    service.add_reference('baseline', {'age': rng.normal(40, 10, 1000)}, ['continuous'])
+
+    async def scenario():
+        ready = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(serve(service, port=0, ready=ready.set_result))
+        port = int((await ready).rsplit(':', 1)[1])
+        try:
+            # The first drift request starts the worker processes
+            window = {'data': {'age': rng.normal(45, 10, 200).tolist()}}
+            status, payload = await _request(port, 'POST', '/drift/baseline', window)
+            assert status == 200 and payload['drift']
+            # A new reference restarts the pool; the next request starts its workers
+            status, _ = await _request(port, 'POST', '/references/today',
+                                       {'features': {'age': 'continuous'},
+                                        'data': {'age': rng.normal(40, 10, 500).tolist()}})
+            assert status == 201
+            status, payload = await _request(port, 'POST', '/drift/today', window)
+            assert status == 200
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+
+    asyncio.run(scenario())
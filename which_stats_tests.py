@@ -3,237 +3,355 @@
 # =============================================================================
 
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.stats import ks_2samp, chi2_contingency, ttest_ind, mannwhitneyu
-import seaborn as sns
-
-# Set style for better visuals
-plt.style.use('default')
-sns.set_palette("husl")
-
-print("=" * 70)
-print("STATISTICAL TESTS SIMPLE GUIDE")
-print("=" * 70)
-
-# =============================================================================
-# 1. T-TEST - The "Average" Test
-# =============================================================================
-print("\n1. T-TEST: Are the AVERAGES different?")
-print("   → Example: 'Does the new feature increase average revenue?'")
-
-# Generate more realistic data with some overlap
-np.random.seed(42)
-group_a = np.random.normal(100, 20, 200)  # Average revenue $100
-group_b = np.random.normal(108, 20, 200)  # Average revenue $108 (smaller difference)
-
-# Plot
-plt.figure(figsize=(12, 4))
-plt.subplot(1, 2, 1)
-plt.hist(group_a, alpha=0.7, label='Old Feature', bins=20)
-plt.hist(group_b, alpha=0.7, label='New Feature', bins=20)
-plt.xlabel('Revenue per User ($)')
-plt.legend()
-plt.title('T-Test: Compare AVERAGES')
-
-plt.subplot(1, 2, 2)
-means = [np.mean(group_a), np.mean(group_b)]
-errors = [np.std(group_a)/np.sqrt(len(group_a)), np.std(group_b)/np.sqrt(len(group_b))]
-plt.bar(['Old Feature', 'New Feature'], means, yerr=errors, capsize=10, alpha=0.7)
-plt.title('Average Revenue ± Standard Error')
-plt.ylabel('Dollars ($)')
-
-plt.tight_layout()
-plt.show()
-
-# Test
-t_stat, pval = ttest_ind(group_a, group_b)
-print(f"   Result: p-value = {pval:.6f}")
-print(f"   Old Feature: ${np.mean(group_a):.1f}, New Feature: ${np.mean(group_b):.1f}")
-if pval < 0.05:
-    print("   ✅ New feature significantly increases revenue!")
-else:
-    print("   ❌ No significant revenue difference")
-
-# =============================================================================
-# 2. CHI-SQUARE TEST - The "Preference" Test  
-# =============================================================================
-print("\n2. CHI-SQUARE TEST: Did PREFERENCES change?")
-print("   → Example: 'After marketing, did product choices change?'")
-
-# Generate more realistic data (smaller change)
-products = ['Product A', 'Product B', 'Product C']
-before = [300, 150, 50]   # 60% A, 30% B, 10% C
-after = [280, 160, 60]    # 56% A, 32% B, 12% C (smaller change)
-
-# Plot
-plt.figure(figsize=(10, 4))
-x_pos = np.arange(len(products))
-width = 0.35
-
-plt.bar(x_pos - width/2, before, width, label='Before Campaign', alpha=0.7)
-plt.bar(x_pos + width/2, after, width, label='After Campaign', alpha=0.7)
-plt.xticks(x_pos, products)
-plt.ylabel('Number of Customers')
-plt.title('Chi-Square: Did PREFERENCES change?')
-plt.legend()
-
-# Add percentage labels
-total_before = sum(before)
-total_after = sum(after)
-for i, (b, a) in enumerate(zip(before, after)):
-    plt.text(i - width/2, b + 5, f'{b/total_before*100:.0f}%', ha='center')
-    plt.text(i + width/2, a + 5, f'{a/total_after*100:.0f}%', ha='center')
-
-plt.show()
-
-# Test
-chi2, pval, _, _ = chi2_contingency([before, after])
-print(f"   Result: p-value = {pval:.6f}")
-if pval < 0.05:
-    print("   ✅ Campaign significantly changed preferences!")
-else:
-    print("   ❌ No significant preference change")
-    print("   (Small changes could be due to random variation)")
-
-# =============================================================================
-# 3. KOLMOGOROV-SMIRNOV TEST - The "Pattern" Test
-# =============================================================================
-print("\n3. KOLMOGOROV-SMIRNOV TEST: Did the PATTERN change?")
-print("   → Example: 'Did user behavior pattern change (not just average)?'")
-
-# Generate data with more subtle pattern difference
-np.random.seed(42)
-normal_users = np.random.normal(5, 1.5, 1000)  # Most spend medium time
-
-# Slightly bimodal distribution
-bimodal_users = np.concatenate([
-    np.random.normal(4, 1, 700),   # Regular users
-    np.random.normal(7, 1, 300)    # Power users
-])
-
-# Plot
-plt.figure(figsize=(12, 4))
-plt.subplot(1, 2, 1)
-plt.hist(normal_users, alpha=0.7, label='Most users similar', bins=30, density=True)
-plt.hist(bimodal_users, alpha=0.7, label='Two user types', bins=30, density=True)
-plt.xlabel('Time Spent (minutes)')
-plt.legend()
-plt.title('KS Test: Compare PATTERNS')
-
-plt.subplot(1, 2, 2)
-# ECDF plots
-def ecdf(data):
-    x = np.sort(data)
-    y = np.arange(1, len(data)+1) / len(data)
-    return x, y
-
-x1, y1 = ecdf(normal_users)
-x2, y2 = ecdf(bimodal_users)
-plt.plot(x1, y1, label='Most users similar')
-plt.plot(x2, y2, label='Two user types')
-plt.xlabel('Time Spent (minutes)')
-plt.ylabel('Proportion of Users')
-plt.title('Cumulative Distribution')
-plt.legend()
-
-plt.tight_layout()
-plt.show()
-
-# Test
-ks_stat, pval = ks_2samp(normal_users, bimodal_users)
-print(f"   Result: p-value = {pval:.6f}")
-print(f"   KS Statistic: {ks_stat:.4f}")
-if pval < 0.05:
-    print("   ✅ User behavior pattern significantly changed!")
-else:
-    print("   ❌ No significant pattern change")
-
-# =============================================================================
-# 4. MANN-WHITNEY U TEST - The "Generally Higher" Test
-# =============================================================================
-print("\n4. MANN-WHITNEY U TEST: Is one group GENERALLY higher?")
-print("   → Example: 'Do premium users have higher engagement?'")
-
-# Generate data with more overlap
-np.random.seed(42)
-free_users = np.random.exponential(3, 500)  # Most low engagement
-premium_users = np.random.exponential(4, 500)  # Generally higher but overlapping
-
-# Plot
-plt.figure(figsize=(12, 4))
-plt.subplot(1, 2, 1)
-plt.hist(free_users, alpha=0.7, label='Free Users', bins=30, density=True)
-plt.hist(premium_users, alpha=0.7, label='Premium Users', bins=30, density=True)
-plt.xlabel('Engagement Score')
-plt.legend()
-plt.title('Mann-Whitney: Compare RANKS')
-
-plt.subplot(1, 2, 2)
-plt.boxplot([free_users, premium_users], labels=['Free Users', 'Premium Users'])
-plt.ylabel('Engagement Score')
-plt.title('Distribution Comparison')
-
-plt.tight_layout()
-plt.show()
-
-# Test
-u_stat, pval = mannwhitneyu(free_users, premium_users)
-print(f"   Result: p-value = {pval:.6f}")
-print(f"   Median - Free: {np.median(free_users):.2f}, Premium: {np.median(premium_users):.2f}")
-if pval < 0.05:
-    print("   ✅ Premium users have significantly higher engagement!")
-else:
-    print("   ❌ No significant difference in engagement levels")
-
-# =============================================================================
-# 5. KL DIVERGENCE - The "Surprise" Measure
-# =============================================================================
-print("\n5. KL DIVERGENCE: How SURPRISED would we be?")
-print("   → Example: 'How different is actual behavior from expected?'")
-
-# Expected vs actual distributions (more realistic)
-expected = np.array([0.5, 0.3, 0.2])  # Expected: 50% low, 30% medium, 20% high usage
-actual = np.array([0.4, 0.35, 0.25])  # Actual: slightly different
-
-usage_levels = ['Low Usage', 'Medium Usage', 'High Usage']
-
-# Plot
-plt.figure(figsize=(10, 4))
-x_pos = np.arange(len(usage_levels))
-width = 0.35
-
-bars1 = plt.bar(x_pos - width/2, expected, width, label='Expected', alpha=0.7)
-bars2 = plt.bar(x_pos + width/2, actual, width, label='Actual', alpha=0.7)
-plt.xticks(x_pos, usage_levels)
-plt.ylabel('Proportion')
-plt.title('KL Divergence: How "surprised" are we?')
-plt.legend()
-
-# Add value labels
-for i, (exp, act) in enumerate(zip(expected, actual)):
-    plt.text(i - width/2, exp + 0.01, f'{exp:.0%}', ha='center')
-    plt.text(i + width/2, act + 0.01, f'{act:.0%}', ha='center')
-
-plt.show()
-
-# Calculate KL Divergence (add small value to avoid division by zero)
-kl = np.sum(actual * np.log(actual / (expected + 1e-10)))
-print(f"   Result: KL Divergence = {kl:.6f}")
-if kl > 0.1:
-    print("   🔥 Very surprised! Reality differs from expectations")
-elif kl > 0.01:
-    print("   ⚠️  Moderately surprised - noticeable differences")
-else:
-    print("   ✅ Little surprise - close to expectations")
-
-# =============================================================================
-# INTERPRETING P-VALUES
-# =============================================================================
-print("\n" + "=" * 70)
-print("UNDERSTANDING P-VALUES")
-print("=" * 70)
-
-print("""
+from distribution_testing import (SequentialMeanTest, SequentialProportionTest, anderson_ksamp,
+                                  chi2_ksample, ecdf, kruskal_wallis, permutation_ttest,
+                                  permutation_chi2_contingency, permutation_ks_2samp,
+                                  permutation_mannwhitneyu, spawn_rngs)
+from distribution_testing.plotting import pyplot
+
+
+def main():
+    plt = pyplot()
+    import seaborn as sns
+
+    # Set style for better visuals
+    plt.style.use('default')
+    sns.set_palette("husl")
+
+    # One independent random stream per example dataset
+    t_test_rng, ks_rng, mann_whitney_rng, regions_rng, sequential_rng = spawn_rngs(42, 5)
+
+    print("=" * 70)
+    print("STATISTICAL TESTS SIMPLE GUIDE")
+    print("=" * 70)
+
+    # =============================================================================
+    # 1. T-TEST - The "Average" Test
+    # =============================================================================
+    print("\n1. T-TEST: Are the AVERAGES different?")
+    print("   → Example: 'Does the new feature increase average revenue?'")
+
+    # Generate more realistic data with some overlap
+    group_a = t_test_rng.normal(100, 20, 200)  # Average revenue $100
+    group_b = t_test_rng.normal(108, 20, 200)  # Average revenue $108 (smaller difference)
+
+    # Plot
+    plt.figure(figsize=(12, 4))
+    plt.subplot(1, 2, 1)
+    plt.hist(group_a, alpha=0.7, label='Old Feature', bins=20)
+    plt.hist(group_b, alpha=0.7, label='New Feature', bins=20)
+    plt.xlabel('Revenue per User ($)')
+    plt.legend()
+    plt.title('T-Test: Compare AVERAGES')
+
+    plt.subplot(1, 2, 2)
+    means = [np.mean(group_a), np.mean(group_b)]
+    errors = [np.std(group_a)/np.sqrt(len(group_a)), np.std(group_b)/np.sqrt(len(group_b))]
+    plt.bar(['Old Feature', 'New Feature'], means, yerr=errors, capsize=10, alpha=0.7)
+    plt.title('Average Revenue ± Standard Error')
+    plt.ylabel('Dollars ($)')
+
+    plt.tight_layout()
+    plt.show()
+
+    # Test
+    t_stat, pval = ttest_ind(group_a, group_b)
+    print(f"   Result: p-value = {pval:.6f}")
+    print(f"   Old Feature: ${np.mean(group_a):.1f}, New Feature: ${np.mean(group_b):.1f}")
+    if pval < 0.05:
+        print("   ✅ New feature significantly increases revenue!")
+    else:
+        print("   ❌ No significant revenue difference")
+
+    # =============================================================================
+    # 2. CHI-SQUARE TEST - The "Preference" Test  
+    # =============================================================================
+    print("\n2. CHI-SQUARE TEST: Did PREFERENCES change?")
+    print("   → Example: 'After marketing, did product choices change?'")
+
+    # Generate more realistic data (smaller change)
+    products = ['Product A', 'Product B', 'Product C']
+    before = [300, 150, 50]   # 60% A, 30% B, 10% C
+    after = [280, 160, 60]    # 56% A, 32% B, 12% C (smaller change)
+
+    # Plot
+    plt.figure(figsize=(10, 4))
+    x_pos = np.arange(len(products))
+    width = 0.35
+
+    plt.bar(x_pos - width/2, before, width, label='Before Campaign', alpha=0.7)
+    plt.bar(x_pos + width/2, after, width, label='After Campaign', alpha=0.7)
+    plt.xticks(x_pos, products)
+    plt.ylabel('Number of Customers')
+    plt.title('Chi-Square: Did PREFERENCES change?')
+    plt.legend()
+
+    # Add percentage labels
+    total_before = sum(before)
+    total_after = sum(after)
+    for i, (b, a) in enumerate(zip(before, after)):
+        plt.text(i - width/2, b + 5, f'{b/total_before*100:.0f}%', ha='center')
+        plt.text(i + width/2, a + 5, f'{a/total_after*100:.0f}%', ha='center')
+
+    plt.show()
+
+    # Test
+    chi2, pval, _, _ = chi2_contingency([before, after])
+    print(f"   Result: p-value = {pval:.6f}")
+    if pval < 0.05:
+        print("   ✅ Campaign significantly changed preferences!")
+    else:
+        print("   ❌ No significant preference change")
+        print("   (Small changes could be due to random variation)")
+
+    # =============================================================================
+    # 3. KOLMOGOROV-SMIRNOV TEST - The "Pattern" Test
+    # =============================================================================
+    print("\n3. KOLMOGOROV-SMIRNOV TEST: Did the PATTERN change?")
+    print("   → Example: 'Did user behavior pattern change (not just average)?'")
+
+    # Generate data with more subtle pattern difference
+    normal_users = ks_rng.normal(5, 1.5, 1000)  # Most spend medium time
+
+    # Slightly bimodal distribution
+    bimodal_users = np.concatenate([
+        ks_rng.normal(4, 1, 700),   # Regular users
+        ks_rng.normal(7, 1, 300)    # Power users
+    ])
+
+    # Plot
+    plt.figure(figsize=(12, 4))
+    plt.subplot(1, 2, 1)
+    plt.hist(normal_users, alpha=0.7, label='Most users similar', bins=30, density=True)
+    plt.hist(bimodal_users, alpha=0.7, label='Two user types', bins=30, density=True)
+    plt.xlabel('Time Spent (minutes)')
+    plt.legend()
+    plt.title('KS Test: Compare PATTERNS')
+
+    plt.subplot(1, 2, 2)
+    # ECDF plots
+    x1, y1 = ecdf(normal_users)
+    x2, y2 = ecdf(bimodal_users)
+    plt.plot(x1, y1, label='Most users similar')
+    plt.plot(x2, y2, label='Two user types')
+    plt.xlabel('Time Spent (minutes)')
+    plt.ylabel('Proportion of Users')
+    plt.title('Cumulative Distribution')
+    plt.legend()
+
+    plt.tight_layout()
+    plt.show()
+
+    # Test
+    ks_stat, pval = ks_2samp(normal_users, bimodal_users)
+    print(f"   Result: p-value = {pval:.6f}")
+    print(f"   KS Statistic: {ks_stat:.4f}")
+    if pval < 0.05:
+        print("   ✅ User behavior pattern significantly changed!")
+    else:
+        print("   ❌ No significant pattern change")
+
+    # =============================================================================
+    # 4. MANN-WHITNEY U TEST - The "Generally Higher" Test
+    # =============================================================================
+    print("\n4. MANN-WHITNEY U TEST: Is one group GENERALLY higher?")
+    print("   → Example: 'Do premium users have higher engagement?'")
+
+    # Generate data with more overlap
+    free_users = mann_whitney_rng.exponential(3, 500)  # Most low engagement
+    premium_users = mann_whitney_rng.exponential(4, 500)  # Generally higher but overlapping
+
+    # Plot
+    plt.figure(figsize=(12, 4))
+    plt.subplot(1, 2, 1)
+    plt.hist(free_users, alpha=0.7, label='Free Users', bins=30, density=True)
+    plt.hist(premium_users, alpha=0.7, label='Premium Users', bins=30, density=True)
+    plt.xlabel('Engagement Score')
+    plt.legend()
+    plt.title('Mann-Whitney: Compare RANKS')
+
+    plt.subplot(1, 2, 2)
+    plt.boxplot([free_users, premium_users], labels=['Free Users', 'Premium Users'])
+    plt.ylabel('Engagement Score')
+    plt.title('Distribution Comparison')
+
+    plt.tight_layout()
+    plt.show()
+
+    # Test
+    u_stat, pval = mannwhitneyu(free_users, premium_users)
+    print(f"   Result: p-value = {pval:.6f}")
+    print(f"   Median - Free: {np.median(free_users):.2f}, Premium: {np.median(premium_users):.2f}")
+    if pval < 0.05:
+        print("   ✅ Premium users have significantly higher engagement!")
+    else:
+        print("   ❌ No significant difference in engagement levels")
+
+    # =============================================================================
+    # 5. KL DIVERGENCE - The "Surprise" Measure
+    # =============================================================================
+    print("\n5. KL DIVERGENCE: How SURPRISED would we be?")
+    print("   → Example: 'How different is actual behavior from expected?'")
+
+    # Expected vs actual distributions (more realistic)
+    expected = np.array([0.5, 0.3, 0.2])  # Expected: 50% low, 30% medium, 20% high usage
+    actual = np.array([0.4, 0.35, 0.25])  # Actual: slightly different
+
+    usage_levels = ['Low Usage', 'Medium Usage', 'High Usage']
+
+    # Plot
+    plt.figure(figsize=(10, 4))
+    x_pos = np.arange(len(usage_levels))
+    width = 0.35
+
+    bars1 = plt.bar(x_pos - width/2, expected, width, label='Expected', alpha=0.7)
+    bars2 = plt.bar(x_pos + width/2, actual, width, label='Actual', alpha=0.7)
+    plt.xticks(x_pos, usage_levels)
+    plt.ylabel('Proportion')
+    plt.title('KL Divergence: How "surprised" are we?')
+    plt.legend()
+
+    # Add value labels
+    for i, (exp, act) in enumerate(zip(expected, actual)):
+        plt.text(i - width/2, exp + 0.01, f'{exp:.0%}', ha='center')
+        plt.text(i + width/2, act + 0.01, f'{act:.0%}', ha='center')
+
+    plt.show()
+
+    # Calculate KL Divergence (add small value to avoid division by zero)
+    kl = np.sum(actual * np.log(actual / (expected + 1e-10)))
+    print(f"   Result: KL Divergence = {kl:.6f}")
+    if kl > 0.1:
+        print("   🔥 Very surprised! Reality differs from expectations")
+    elif kl > 0.01:
+        print("   ⚠️  Moderately surprised - noticeable differences")
+    else:
+        print("   ✅ Little surprise - close to expectations")
+
+    # =============================================================================
+    # 6. PERMUTATION P-VALUES - No large-sample approximation needed
+    # =============================================================================
+    print("\n6. PERMUTATION P-VALUES: Same tests, exact-style p-values")
+    print("   → Shuffle the group labels 9,999 times and count how often the")
+    print("     shuffled statistic is at least as extreme as the real one")
+
+    permutation_results = [
+        ("T-TEST", permutation_ttest(group_a, group_b), ttest_ind(group_a, group_b)[1]),
+        ("CHI-SQUARE", permutation_chi2_contingency(before, after), chi2_contingency([before, after])[1]),
+        ("KS TEST", permutation_ks_2samp(normal_users, bimodal_users), ks_2samp(normal_users, bimodal_users)[1]),
+        ("MANN-WHITNEY U", permutation_mannwhitneyu(free_users, premium_users), mannwhitneyu(free_users, premium_users)[1]),
+    ]
+
+    print(f"\n   {'Test':<16} {'Asymptotic p':<14} {'Permutation p':<15} {'Permutations'}")
+    for name, result, asymptotic_p in permutation_results:
+        stopped = " (stopped early)" if result['stopped_early'] else ""
+        print(f"   {name:<16} {asymptotic_p:<14.6f} {result['p_value']:<15.6f} {result['n_resamples']}{stopped}")
+
+    # =============================================================================
+    # 7. K-SAMPLE TESTS - One test for MANY groups
+    # =============================================================================
+    print("\n7. K-SAMPLE TESTS: Is ANY of many groups different?")
+    print("   → Example: 'Does session length or device mix differ across 50 regions?'")
+
+    # 50 regions; region 7 has 30% longer sessions and more tablet users
+    n_users, n_regions = 20_000, 50
+    region = regions_rng.integers(0, n_regions, n_users)
+    minutes = regions_rng.exponential(5, n_users) * np.where(region == 7, 1.3, 1.0)
+    tablet_share = np.where(region == 7, 0.3, 0.2)
+    device = np.where(regions_rng.random(n_users) < tablet_share, 'tablet',
+                      np.where(regions_rng.random(n_users) < 0.5, 'phone', 'desktop'))
+
+    # One pooled sort (or one 2-D bincount) instead of 49 pairwise tests
+    k_sample_results = [
+        ("KRUSKAL-WALLIS", kruskal_wallis(minutes, region)),
+        ("ANDERSON-DARLING", anderson_ksamp(minutes, region)),
+        ("CHI-SQUARE k x c", chi2_ksample(device, region)),
+    ]
+
+    # Plot each region's share of the Kruskal-Wallis statistic
+    plt.figure(figsize=(10, 4))
+    plt.bar(k_sample_results[0][1]['groups'], k_sample_results[0][1]['contributions'], alpha=0.7)
+    plt.xlabel('Region')
+    plt.ylabel('Contribution to H')
+    plt.title('Kruskal-Wallis: Which groups drive the difference?')
+    plt.show()
+
+    print(f"\n   {'Test':<18} {'Statistic':<11} {'p-value':<10} {'Largest contribution'}")
+    for name, result in k_sample_results:
+        top = int(np.argmax(result['contributions']))
+        print(f"   {name:<18} {result['statistic']:<11.3f} {result['p_value']:<10.6f} "
+              f"region {result['groups'][top]}")
+
+    # =============================================================================
+    # 8. SEQUENTIAL A/B TESTS - Look every day, stop as soon as it is clear
+    # =============================================================================
+    print("\n8. SEQUENTIAL A/B TESTS: Can we stop the experiment EARLY?")
+    print("   → Example: '30-day test planned; can we decide as soon as the effect is clear?'")
+
+    # Daily batches: revenue ($100 vs $104 per user) and conversion (10% vs 11.5%)
+    n_days, users_per_day = 30, 100
+    revenue_test = SequentialMeanTest(tau=5)            # expect effects of about $5
+    conversion_test = SequentialProportionTest(tau=0.02)  # ... and of about 2 points
+    revenue_days = conversion_days = None
+    bounds = []
+    for day in range(1, n_days + 1):
+        revenue = revenue_test.update(sequential_rng.normal(100, 20, users_per_day),
+                                      sequential_rng.normal(104, 20, users_per_day))
+        conversion = conversion_test.update(sequential_rng.binomial(5 * users_per_day, 0.10),
+                                            5 * users_per_day,
+                                            sequential_rng.binomial(5 * users_per_day, 0.115),
+                                            5 * users_per_day)
+        bounds.append((revenue['lower'], revenue['effect'], revenue['upper']))
+        revenue_days = revenue_days or (day if revenue['reject'] else None)
+        conversion_days = conversion_days or (day if conversion['reject'] else None)
+
+    for name, result, stop_day in (("Revenue", revenue, revenue_days),
+                                   ("Conversion", conversion, conversion_days)):
+        decision = f"stop on day {stop_day}" if stop_day else f"no decision after {n_days} days"
+        print(f"\n   {name}: always-valid p = {result['p_value']:.6f}, {decision}")
+        print(f"   Effect {result['effect']:.4f}, confidence sequence "
+              f"[{result['lower']:.4f}, {result['upper']:.4f}]")
+
+    # Why not just run a t-test every day? Peeking inflates false positives
+    n_experiments, peek_hits, sequential_hits = 200, 0, 0
+    for _ in range(n_experiments):
+        a_a_test = SequentialMeanTest(tau=5)
+        control, treatment = [], []
+        peeked = False
+        for day in range(n_days):
+            control.append(sequential_rng.normal(100, 20, users_per_day))
+            treatment.append(sequential_rng.normal(100, 20, users_per_day))
+            a_a_test.update(control[-1], treatment[-1])
+            peeked = peeked or ttest_ind(np.concatenate(control), np.concatenate(treatment))[1] < 0.05
+        peek_hits += peeked
+        sequential_hits += a_a_test.result()['reject']
+    print(f"\n   {n_experiments} A/A tests (no real effect), checked every day for {n_days} days:")
+    print(f"   Daily t-test: {peek_hits / n_experiments:.1%} false positives   "
+          f"mSPRT: {sequential_hits / n_experiments:.1%}")
+
+    # Plot the revenue confidence sequence shrinking day by day
+    lower, effect, upper = np.array(bounds).T
+    days = np.arange(1, n_days + 1)
+    plt.figure(figsize=(10, 4))
+    plt.fill_between(days, np.maximum(lower, -20), np.minimum(upper, 30), alpha=0.3,
+                     label='95% confidence sequence')
+    plt.plot(days, effect, 'o-', label='Estimated effect ($)')
+    plt.axhline(0, color='red', linestyle='--', label='No effect')
+    plt.xlabel('Day')
+    plt.ylabel('Revenue difference ($)')
+    plt.title('Sequential test: stop once the band excludes 0')
+    plt.legend()
+    plt.show()
+
+    # =============================================================================
+    # INTERPRETING P-VALUES
+    # =============================================================================
+    print("\n" + "=" * 70)
+    print("UNDERSTANDING P-VALUES")
+    print("=" * 70)
+
+    print("""
 P-VALUE GUIDE:
 • p < 0.05: Statistically significant - unlikely due to chance
 • p < 0.01: Highly significant - very unlikely due to chance  
@@ -244,14 +362,14 @@ Remember: Statistical significance ≠ Practical importance!
 A tiny difference can be 'significant' with large sample sizes.
 """)
 
-# =============================================================================
-# DECISION TREE - Which Test to Use?
-# =============================================================================
-print("\n" + "=" * 70)
-print("QUICK DECISION TREE")
-print("=" * 70)
+    # =============================================================================
+    # DECISION TREE - Which Test to Use?
+    # =============================================================================
+    print("\n" + "=" * 70)
+    print("QUICK DECISION TREE")
+    print("=" * 70)
 
-print("""
+    print("""
 ASK YOURSELF:
 
 1. Are you comparing CATEGORIES (like product choices)?
@@ -262,53 +380,69 @@ ASK YOURSELF:
    • "Is the overall PATTERN different?" → KOLMOGOROV-SMIRNOV  
    • "Is one group GENERALLY higher?" → MANN-WHITNEY U
 
-3. Do you want to measure "how surprised" you'd be?
+3. Are you comparing MANY groups at once (regions, segments)?
+   • Numbers → KRUSKAL-WALLIS or k-sample ANDERSON-DARLING
+   • Categories → CHI-SQUARE on the k x c table
+
+4. Do you want to measure "how surprised" you'd be?
    → USE KL DIVERGENCE
+
+5. Do you check a running A/B test every day and want to stop EARLY?
+   → USE A SEQUENTIAL TEST (mSPRT, always-valid p-values)
 """)
 
-# =============================================================================
-# REAL-WORLD SCENARIOS
-# =============================================================================
-print("\n" + "=" * 70)
-print("REAL-WORLD SCENARIOS")
-print("=" * 70)
-
-scenarios = [
-    {
-        "question": "Did the new website design change how long people stay?",
-        "test": "KS TEST",
-        "reason": "Looking at the entire pattern of user behavior"
-    },
-    {
-        "question": "After our ad campaign, did product preferences shift?",
-        "test": "CHI-SQUARE TEST", 
-        "reason": "Comparing category frequencies"
-    },
-    {
-        "question": "Does the new feature increase average revenue per user?",
-        "test": "T-TEST",
-        "reason": "Comparing average values"
-    },
-    {
-        "question": "Are customer satisfaction scores higher for paid users?",
-        "test": "MANN-WHITNEY U",
-        "reason": "Scores are usually skewed, not normal"
-    },
-    {
-        "question": "How different is current user behavior from our predictions?",
-        "test": "KL DIVERGENCE",
-        "reason": "Measuring 'surprise' between expected vs actual"
-    }
-]
-
-for i, scenario in enumerate(scenarios, 1):
-    print(f"\n{i}. {scenario['question']}")
-    print(f"   👉 USE: {scenario['test']}")
-    print(f"   💡 Why: {scenario['reason']}")
-
-print("\n" + "=" * 70)
-print("SUMMARY COMPLETED!")
-print("=" * 70)
+    # =============================================================================
+    # REAL-WORLD SCENARIOS
+    # =============================================================================
+    print("\n" + "=" * 70)
+    print("REAL-WORLD SCENARIOS")
+    print("=" * 70)
+
+    scenarios = [
+        {
+            "question": "Did the new website design change how long people stay?",
+            "test": "KS TEST",
+            "reason": "Looking at the entire pattern of user behavior"
+        },
+        {
+            "question": "After our ad campaign, did product preferences shift?",
+            "test": "CHI-SQUARE TEST", 
+            "reason": "Comparing category frequencies"
+        },
+        {
+            "question": "Does the new feature increase average revenue per user?",
+            "test": "T-TEST",
+            "reason": "Comparing average values"
+        },
+        {
+            "question": "Are customer satisfaction scores higher for paid users?",
+            "test": "MANN-WHITNEY U",
+            "reason": "Scores are usually skewed, not normal"
+        },
+        {
+            "question": "How different is current user behavior from our predictions?",
+            "test": "KL DIVERGENCE",
+            "reason": "Measuring 'surprise' between expected vs actual"
+        },
+        {
+            "question": "Can we end the checkout experiment as soon as the lift is clear?",
+            "test": "SEQUENTIAL TEST (mSPRT)",
+            "reason": "Always-valid p-values stay valid however often you look"
+        }
+    ]
+
+    for i, scenario in enumerate(scenarios, 1):
+        print(f"\n{i}. {scenario['question']}")
+        print(f"   👉 USE: {scenario['test']}")
+        print(f"   💡 Why: {scenario['reason']}")
+
+    print("\n" + "=" * 70)
+    print("SUMMARY COMPLETED!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
 
 """
 ======================================================================
@@ -318,8 +452,8 @@ STATISTICAL TESTS SIMPLE GUIDE
 1. T-TEST: Are the AVERAGES different?
    → Example: 'Does the new feature increase average revenue?'
 
-   Result: p-value = 0.000000
-   Old Feature: $99.2, New Feature: $109.7
+   Result: p-value = 0.000396
+   Old Feature: $100.9, New Feature: $107.9
    ✅ New feature significantly increases revenue!
 
 2. CHI-SQUARE TEST: Did PREFERENCES change?
@@ -332,8 +466,8 @@ STATISTICAL TESTS SIMPLE GUIDE
 3. KOLMOGOROV-SMIRNOV TEST: Did the PATTERN change?
    → Example: 'Did user behavior pattern change (not just average)?'
 
-   Result: p-value = 0.000004
-   KS Statistic: 0.1140
+   Result: p-value = 0.000000
+   KS Statistic: 0.1260
    ✅ User behavior pattern significantly changed!
 
 4. MANN-WHITNEY U TEST: Is one group GENERALLY higher?
@@ -341,8 +475,8 @@ STATISTICAL TESTS SIMPLE GUIDE
 /tmp/ipython-input-3644407060.py:172: MatplotlibDeprecationWarning: The 'labels' parameter of boxplot() has been renamed 'tick_labels' since Matplotlib 3.9; support for the old name will be dropped in 3.11.
   plt.boxplot([free_users, premium_users], labels=['Free Users', 'Premium Users'])
 
-   Result: p-value = 0.003316
-   Median - Free: 2.16, Premium: 2.55
+   Result: p-value = 0.001459
+   Median - Free: 2.17, Premium: 2.55
    ✅ Premium users have significantly higher engagement!
 
 5. KL DIVERGENCE: How SURPRISED would we be?
@@ -351,6 +485,36 @@ STATISTICAL TESTS SIMPLE GUIDE
    Result: KL Divergence = 0.020481
    ⚠️  Moderately surprised - noticeable differences
 
+6. PERMUTATION P-VALUES: Same tests, exact-style p-values
+   → Shuffle the group labels 9,999 times and count how often the
+     shuffled statistic is at least as extreme as the real one
+
+   Test             Asymptotic p   Permutation p   Permutations
+   T-TEST           0.000396       0.000300        9999
+   CHI-SQUARE       0.382639       0.395500        2000 (stopped early)
+   KS TEST          0.000000       0.000100        9999
+   MANN-WHITNEY U   0.001459       0.001800        9999
+
+7. K-SAMPLE TESTS: Is ANY of many groups different?
+   → Example: 'Does session length or device mix differ across 50 regions?'
+
+   Test               Statistic   p-value    Largest contribution
+   KRUSKAL-WALLIS     88.949      0.000419   region 7
+   ANDERSON-DARLING   3.488       0.001301   region 7
+   CHI-SQUARE k x c   144.790     0.001498   region 7
+
+8. SEQUENTIAL A/B TESTS: Can we stop the experiment EARLY?
+   → Example: '30-day test planned; can we decide as soon as the effect is clear?'
+
+   Revenue: always-valid p = 0.000000, stop on day 3
+   Effect 4.2634, confidence sequence [2.5849, 5.4352]
+
+   Conversion: always-valid p = 0.000821, stop on day 11
+   Effect 0.0141, confidence sequence [0.0048, 0.0252]
+
+   200 A/A tests (no real effect), checked every day for 30 days:
+   Daily t-test: 29.5% false positives   mSPRT: 1.0%
+
 ======================================================================
 UNDERSTANDING P-VALUES
 ======================================================================
@@ -379,9 +543,16 @@ ASK YOURSELF:
    • "Is the overall PATTERN different?" → KOLMOGOROV-SMIRNOV  
    • "Is one group GENERALLY higher?" → MANN-WHITNEY U
 
-3. Do you want to measure "how surprised" you'd be?
+3. Are you comparing MANY groups at once (regions, segments)?
+   • Numbers → KRUSKAL-WALLIS or k-sample ANDERSON-DARLING
+   • Categories → CHI-SQUARE on the k x c table
+
+4. Do you want to measure "how surprised" you'd be?
    → USE KL DIVERGENCE
 
+5. Do you check a running A/B test every day and want to stop EARLY?
+   → USE A SEQUENTIAL TEST (mSPRT, always-valid p-values)
+
 
 ======================================================================
 REAL-WORLD SCENARIOS
@@ -407,6 +578,10 @@ REAL-WORLD SCENARIOS
    👉 USE: KL DIVERGENCE
    💡 Why: Measuring 'surprise' between expected vs actual
 
+6. Can we end the checkout experiment as soon as the lift is clear?
+   👉 USE: SEQUENTIAL TEST (mSPRT)
+   💡 Why: Always-valid p-values stay valid however often you look
+
 ======================================================================
 SUMMARY COMPLETED!
 ======================================================================